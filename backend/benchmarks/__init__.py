@@ -0,0 +1,7 @@
+"""
+Performance benchmarks for the Bug Tracker backend.
+
+Run individual benchmarks from the ``backend`` directory, for example::
+
+    python -m benchmarks.sse_subscribers
+"""
@@ -0,0 +1,87 @@
+"""
+Latency of the bug report admin changelist on the local database.
+
+Renders the changelist with a few common requests (the first page, a deep
+page, a status filter, a search and a date drill-down) through the current
+``BugReportAdmin`` and through the previous configuration (exact counts,
+``icontains`` search, no date hierarchy)::
+
+    python manage.py seed_bugs --bugs 1000000
+    python -m benchmarks.admin --repeat 5 --output admin.json
+
+The views are called directly as a superuser named ``bench-admin``, created
+if missing.
+"""
+
+import argparse
+import time
+
+from .common import setup_django, summarize, write_results
+
+REQUESTS = {
+    'first_page': {},
+    'page_50': {'p': '50'},
+    'status_filter': {'status__exact': 'open'},
+    'search': {'q': 'login error'},
+    'year_drilldown': {'created_at__year': '2025'},
+}
+
+
+def legacy_admin():
+    from django.contrib import admin
+
+    class LegacyBugReportAdmin(admin.ModelAdmin):
+        list_display = ['title', 'severity', 'status', 'created_by', 'created_at', 'updated_at']
+        list_filter = ['severity', 'status', 'created_at']
+        search_fields = ['title', 'description', 'tags']
+        ordering = ['-created_at']
+
+    return LegacyBugReportAdmin
+
+
+def measure(model_admin, user, params, repeat):
+    from django.db import connection
+    from django.test import RequestFactory
+    from django.test.utils import CaptureQueriesContext
+
+    latencies = []
+    with CaptureQueriesContext(connection) as queries:
+        for _ in range(repeat):
+            request = RequestFactory().get('/admin/bugs/bugreport/', params)
+            request.user = user
+            started = time.perf_counter()
+            response = model_admin.changelist_view(request)
+            response.render()
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.status_code
+    return {**summarize(latencies), 'queries': len(queries) // repeat}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib import admin
+    from django.contrib.auth import get_user_model
+
+    from bugs.admin import BugReportAdmin
+    from bugs.models import BugReport
+
+    user, _ = get_user_model().objects.get_or_create(
+        username='bench-admin', defaults={'is_staff': True, 'is_superuser': True},
+    )
+
+    results = {}
+    for name, admin_class in (('current', BugReportAdmin), ('legacy', legacy_admin())):
+        model_admin = admin_class(BugReport, admin.site)
+        for request, params in REQUESTS.items():
+            results[f'{name}.{request}'] = measure(model_admin, user, params, args.repeat)
+            print(name, request, results[f'{name}.{request}'], flush=True)
+    write_results('admin', results, args.output, rows=BugReport.objects.count())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,312 @@
+"""
+Throughput and latency of the bug API against seeded data.
+
+Seed a dataset first, then run the scenarios in-process through Django's
+test client, or against a running server with ``--base-url``::
+
+    python manage.py seed_bugs --users 200 --bugs 2000000
+    python -m benchmarks.api --output before.json
+    python -m benchmarks.api --base-url http://localhost:8000 --concurrency 8
+
+Requests are made as the seeded user with the largest backlog. Bugs created
+by the ``create`` scenario are deleted again afterwards, so runs on the same
+dataset stay comparable. Compare two result files with ``benchmarks.compare``.
+"""
+
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from datetime import timedelta
+from urllib.parse import urlencode, urlsplit
+
+from .common import Timer, setup_django, summarize, write_results
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    def register(func):
+        SCENARIOS[name] = func
+        return func
+    return register
+
+
+def list_path(**params):
+    return '/api/bugs/' + (f'?{urlencode(params)}' if params else '')
+
+
+@scenario('list')
+def list_bugs(ctx):
+    return 'GET', list_path(), None
+
+
+@scenario('list_no_count')
+def list_no_count(ctx):
+    return 'GET', list_path(count='false'), None
+
+
+@scenario('list_deep_page')
+def list_deep_page(ctx):
+    return 'GET', list_path(page=ctx.rng.randint(40, 50)), None
+
+
+@scenario('filter_status')
+def filter_status(ctx):
+    return 'GET', list_path(status='open'), None
+
+
+@scenario('filter_severity_status')
+def filter_severity_status(ctx):
+    return 'GET', list_path(severity='critical', status='open'), None
+
+
+@scenario('filter_tag')
+def filter_tag(ctx):
+    return 'GET', list_path(tags=ctx.rng.choice(['payments', 'ui', 'crash', 'security'])), None
+
+
+@scenario('filter_created_after')
+def filter_created_after(ctx):
+    return 'GET', list_path(created_after=ctx.recent.isoformat()), None
+
+
+@scenario('search')
+def search(ctx):
+    return 'GET', list_path(search=ctx.rng.choice(['timeout', 'payment retry', 'stale cache'])), None
+
+
+@scenario('ordering_title')
+def ordering_title(ctx):
+    return 'GET', list_path(ordering='title'), None
+
+
+@scenario('ordering_severity')
+def ordering_severity(ctx):
+    return 'GET', list_path(ordering='-severity'), None
+
+
+@scenario('retrieve')
+def retrieve(ctx):
+    return 'GET', f'/api/bugs/{ctx.rng.choice(ctx.bug_ids)}/', None
+
+
+@scenario('batch_50')
+def batch(ctx):
+    # One request standing in for 50 `retrieve` calls.
+    ids = ctx.rng.sample(ctx.bug_ids, min(50, len(ctx.bug_ids)))
+    return 'GET', '/api/bugs/batch/?' + urlencode({'ids': ','.join(ids)}), None
+
+
+@scenario('create')
+def create(ctx):
+    return 'POST', '/api/bugs/', {
+        'title': f'Benchmark bug {ctx.rng.randrange(1_000_000)}',
+        'description': 'Created by the API benchmark. ' * ctx.rng.randint(1, 40),
+        'severity': ctx.rng.choice(['low', 'medium', 'high', 'critical']),
+        'tags': ctx.rng.sample(['ui', 'api', 'payments', 'crash', 'benchmark'], 2),
+    }
+
+
+@scenario('update')
+def update(ctx):
+    return 'PATCH', f'/api/bugs/{ctx.rng.choice(ctx.bug_ids)}/', {
+        'status': ctx.rng.choice(['open', 'in_progress', 'resolved']),
+    }
+
+
+@scenario('transition_50')
+def transition(ctx):
+    # One request standing in for 50 `update` calls.
+    return 'POST', '/api/bugs/transition/', {
+        'ids': ctx.rng.sample(ctx.bug_ids, min(50, len(ctx.bug_ids))),
+        'status': ctx.rng.choice(['open', 'in_progress']),
+    }
+
+
+class TestClientTransport:
+    """Requests through Django's test client, in this process."""
+
+    def __init__(self):
+        from rest_framework.test import APIClient
+        self.client = APIClient(HTTP_HOST='localhost')
+
+    def authenticate(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def request(self, method, path, body=None):
+        response = self.client.generic(
+            method, path,
+            json.dumps(body) if body is not None else '',
+            content_type='application/json',
+        )
+        content = b''.join(response.streaming_content) if response.streaming else response.content
+        return response.status_code, content
+
+    def clone(self):
+        return self
+
+
+class HttpTransport:
+    """Requests over a persistent HTTP/1.1 connection to a running server."""
+
+    def __init__(self, base_url, token=None):
+        self.base_url = base_url
+        parts = urlsplit(base_url)
+        connection_class = (
+            http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        )
+        self.connection = connection_class(parts.hostname, parts.port, timeout=60)
+        self.token = token
+
+    def authenticate(self, token):
+        self.token = token
+
+    def request(self, method, path, body=None):
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        payload = json.dumps(body) if body is not None else None
+        try:
+            self.connection.request(method, path, payload, headers)
+            response = self.connection.getresponse()
+            return response.status, response.read()
+        except (http.client.HTTPException, OSError):
+            self.connection.close()
+            raise
+
+    def clone(self):
+        return HttpTransport(self.base_url, self.token)
+
+
+class Context:
+    def __init__(self, seed, bug_ids, recent):
+        self.rng = random.Random(seed)
+        self.bug_ids = bug_ids
+        self.recent = recent
+
+
+def login(transport, username, password):
+    status, content = transport.request(
+        'POST', '/api/auth/token/', {'username': username, 'password': password}
+    )
+    if status != 200:
+        raise SystemExit(f'Login as {username} failed ({status}): {content[:200]!r}')
+    transport.authenticate(json.loads(content)['access'])
+
+
+def sample_bug_ids(transport, pages=5):
+    ids = []
+    for page in range(1, pages + 1):
+        status, content = transport.request('GET', list_path(page=page))
+        if status != 200:
+            break
+        ids.extend(bug['id'] for bug in json.loads(content)['results'])
+    if not ids:
+        raise SystemExit('The benchmark user has no bugs; run `manage.py seed_bugs` first.')
+    return ids
+
+
+def run_scenario(name, transport, ctx, requests, warmup, concurrency):
+    build = SCENARIOS[name]
+    created = []
+
+    def issue(client, worker_ctx, latencies, counter):
+        method, path, body = build(worker_ctx)
+        with Timer(latencies):
+            try:
+                status, content = client.request(method, path, body)
+            except (http.client.HTTPException, OSError):
+                status, content = 0, b''
+        if status >= 400 or status == 0:
+            counter['errors'] += 1
+        elif status == 201:
+            created.append(json.loads(content)['id'])
+
+    for _ in range(warmup):
+        issue(transport, ctx, [], {'errors': 0})
+
+    latencies = []
+    counter = {'errors': 0}
+    per_worker = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+
+    def worker(index):
+        client = transport.clone()
+        worker_ctx = Context(ctx.rng.random() + index, ctx.bug_ids, ctx.recent)
+        worker_latencies = []
+        worker_counter = {'errors': 0}
+        for _ in range(per_worker[index]):
+            issue(client, worker_ctx, worker_latencies, worker_counter)
+        with lock:
+            latencies.extend(worker_latencies)
+            counter['errors'] += worker_counter['errors']
+
+    lock = threading.Lock()
+    started = time.perf_counter()
+    if concurrency == 1:
+        worker(0)
+    else:
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - started
+
+    for bug_id in created:
+        transport.request('DELETE', f'/api/bugs/{bug_id}/')
+    return summarize(latencies, elapsed, counter['errors'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--base-url', help='Benchmark a running server instead of the test client.')
+    parser.add_argument('--username', default='bench_user_00000')
+    parser.add_argument('--password', default=None)
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.utils import timezone
+
+    from bugs.management.commands.seed_bugs import BENCHMARK_PASSWORD
+
+    if args.base_url:
+        transport = HttpTransport(args.base_url)
+    else:
+        if args.concurrency != 1:
+            parser.error('--concurrency requires --base-url; the test client runs in-process.')
+        transport = TestClientTransport()
+    login(transport, args.username, args.password or BENCHMARK_PASSWORD)
+
+    ctx = Context(args.seed, sample_bug_ids(transport), timezone.now() - timedelta(days=30))
+    status, content = transport.request('GET', list_path())
+    visible_bugs = json.loads(content).get('count')
+
+    results = {}
+    for name in args.scenarios:
+        results[name] = run_scenario(
+            name, transport, ctx, args.requests, args.warmup, args.concurrency
+        )
+        print(f"{name}: p50 {results[name]['p50_ms']} ms, "
+              f"{results[name]['throughput_rps']} req/s", flush=True)
+
+    write_results(
+        'api', results, args.output,
+        transport='http' if args.base_url else 'test_client',
+        base_url=args.base_url,
+        concurrency=args.concurrency,
+        username=args.username,
+        visible_bugs=visible_bugs,
+    )
+
+
+if __name__ == '__main__':
+    main()
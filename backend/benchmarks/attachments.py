@@ -0,0 +1,187 @@
+"""
+Peak memory and throughput of attachment uploads and downloads.
+
+Requests go straight to Django's WSGI handler with a multipart body that is
+generated while it is read, so the peak Python heap reported by
+``tracemalloc`` is what the server itself buffers, not the client::
+
+    python -m benchmarks.attachments --sizes 1 16 128 --output attachments.json
+
+Streaming keeps the peak flat as files grow; a server that buffered whole
+files would peak at one or more times the file size. Files are written to a
+temporary MEDIA_ROOT, and the user and bug report are removed afterwards.
+"""
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from .common import setup_django, write_results
+
+MB = 1024 * 1024
+CHUNK = 64 * 1024
+BOUNDARY = 'benchmark-boundary'
+
+
+class MultipartBody(io.RawIOBase):
+    """A multipart/form-data body with one ``file`` field of ``size`` generated bytes."""
+
+    def __init__(self, size, seed):
+        self.head = (
+            f'--{BOUNDARY}\r\n'
+            'Content-Disposition: form-data; name="file"; filename="bench.log"\r\n'
+            'Content-Type: application/octet-stream\r\n\r\n'
+        ).encode()
+        self.tail = f'\r\n--{BOUNDARY}--\r\n'.encode()
+        # Unique content per run, so deduplication does not skip the write.
+        self.block = seed.to_bytes(8, 'big') * (CHUNK // 8)
+        self.size = size
+        self.length = len(self.head) + size + len(self.tail)
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def _slice(self, start, count):
+        if start < len(self.head):
+            return self.head[start:start + count]
+        start -= len(self.head)
+        if start < self.size:
+            offset = start % CHUNK
+            return self.block[offset:offset + min(count, self.size - start, CHUNK - offset)]
+        start -= self.size
+        return self.tail[start:start + count]
+
+    def readinto(self, buffer):
+        data = self._slice(self.position, len(buffer))
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+
+def call(handler, method, path, token, body=None, content_type=''):
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'SCRIPT_NAME': '',
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'HTTP_AUTHORIZATION': f'Bearer {token}',
+        'CONTENT_TYPE': content_type,
+        'CONTENT_LENGTH': str(body.length if body else 0),
+        'wsgi.input': io.BufferedReader(body) if body else io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.url_scheme': 'http',
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    statuses = []
+    response = handler(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    received = 0
+    try:
+        for chunk in response:
+            received += len(chunk)
+    finally:
+        response.close()
+    return statuses[0], received
+
+
+def measure(func):
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    return result, elapsed, peak
+
+
+def bench_size(handler, bug, token, size_mb, seed):
+    from bugs.models import Attachment
+
+    size = size_mb * MB
+    body = MultipartBody(size, seed)
+    (status, _), upload_elapsed, upload_peak = measure(lambda: call(
+        handler, 'POST', f'/api/bugs/{bug.pk}/attachments/', token,
+        body, f'multipart/form-data; boundary={BOUNDARY}'
+    ))
+    assert status.startswith('201'), status
+    attachment = Attachment.objects.filter(bug=bug).latest('created_at')
+
+    (status, received), download_elapsed, download_peak = measure(lambda: call(
+        handler, 'GET', f'/api/bugs/{bug.pk}/attachments/{attachment.pk}/download/', token
+    ))
+    assert status.startswith('200') and received == size, (status, received)
+
+    return {
+        'upload': {
+            'peak_heap_mb': round(upload_peak / MB, 2),
+            'peak_to_size': round(upload_peak / size, 4),
+            'mb_per_s': round(size_mb / upload_elapsed, 1),
+        },
+        'download': {
+            'peak_heap_mb': round(download_peak / MB, 2),
+            'peak_to_size': round(download_peak / size, 4),
+            'mb_per_s': round(size_mb / download_elapsed, 1),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 16, 64],
+                        help='File sizes in megabytes.')
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import transaction
+    from django.test import override_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from bugs.attachments import purge_orphan_blobs
+    from bugs.models import BugReport
+
+    settings.QUERY_DETECTOR_ENABLED = False
+    User = get_user_model()
+    handler = WSGIHandler()
+    results = {}
+    with tempfile.TemporaryDirectory() as media_root, override_settings(
+        MEDIA_ROOT=media_root,
+        ATTACHMENT_MAX_SIZE=max(args.sizes) * MB,
+        REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_CLASSES': []},
+    ):
+        user = User.objects.create_user('bench_attachments', 'bench_attachments@example.com')
+        try:
+            bug = BugReport.objects.create(
+                title='Attachment benchmark', description='Holds benchmark uploads.', created_by=user
+            )
+            token = str(AccessToken.for_user(user))
+            tracemalloc.start()
+            # Warm up imports and caches so the first size is not charged for them.
+            bench_size(handler, bug, token, 1, os.getpid())
+            for size_mb in args.sizes:
+                seed = os.getpid() + size_mb + 1
+                results[f'{size_mb}mb'] = bench_size(handler, bug, token, size_mb, seed)
+                print(f"{size_mb} MB: {results[f'{size_mb}mb']}", flush=True)
+            tracemalloc.stop()
+        finally:
+            user.delete()
+            with transaction.atomic():
+                purge_orphan_blobs([{}])
+    write_results('attachments', results, args.output, sizes_mb=args.sizes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Authentication cost per core for each password hasher configuration.
+
+For every configuration this measures raw hash and verify time, then
+sequential ``/api/auth/token/`` and ``/api/auth/register/`` requests through
+the test client. One thread is one core, so requests per second here is
+requests per core::
+
+    python -m benchmarks.auth --requests 50 --output auth.json
+
+Temporary users are created in the configured database and removed again.
+"""
+
+import argparse
+import time
+
+from .common import Timer, setup_django, summarize, write_results
+
+PASSWORD = 'Correct-Horse-Battery-42'
+
+CONFIGURATIONS = {
+    'pbkdf2_default': {
+        'PASSWORD_HASHERS': ['django.contrib.auth.hashers.PBKDF2PasswordHasher'],
+    },
+    'scrypt_n14': {
+        'PASSWORD_HASHERS': ['bugs.hashers.TunableScryptPasswordHasher'],
+        'SCRYPT_WORK_FACTOR': 2 ** 14,
+    },
+    'scrypt_n15': {
+        'PASSWORD_HASHERS': ['bugs.hashers.TunableScryptPasswordHasher'],
+        'SCRYPT_WORK_FACTOR': 2 ** 15,
+    },
+    'argon2_owasp': {
+        'PASSWORD_HASHERS': ['bugs.hashers.TunableArgon2PasswordHasher'],
+        'ARGON2_TIME_COST': 2, 'ARGON2_MEMORY_COST': 19456, 'ARGON2_PARALLELISM': 1,
+    },
+    'argon2_django_default': {
+        'PASSWORD_HASHERS': ['bugs.hashers.TunableArgon2PasswordHasher'],
+        'ARGON2_TIME_COST': 2, 'ARGON2_MEMORY_COST': 102400, 'ARGON2_PARALLELISM': 8,
+    },
+}
+
+
+def bench_configuration(name, overrides, requests):
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import check_password, make_password
+    from django.test import override_settings
+    from rest_framework.test import APIClient
+
+    User = get_user_model()
+    prefix = f'bench_auth_{name}_'
+    with override_settings(**overrides):
+        hash_times, verify_times = [], []
+        for _ in range(max(5, requests // 5)):
+            with Timer(hash_times):
+                encoded = make_password(PASSWORD)
+            with Timer(verify_times):
+                check_password(PASSWORD, encoded)
+
+        client = APIClient(HTTP_HOST='localhost')
+        User.objects.create_user(f'{prefix}login', f'{prefix}login@example.com', PASSWORD)
+        try:
+            login_times = []
+            started = time.perf_counter()
+            for _ in range(requests):
+                with Timer(login_times):
+                    response = client.post(
+                        '/api/auth/token/', {'username': f'{prefix}login', 'password': PASSWORD}
+                    )
+                assert response.status_code == 200, response.content
+            login_elapsed = time.perf_counter() - started
+
+            register_times = []
+            started = time.perf_counter()
+            for n in range(requests):
+                with Timer(register_times):
+                    response = client.post('/api/auth/register/', {
+                        'username': f'{prefix}{n}',
+                        'email': f'{prefix}{n}@example.com',
+                        'password': PASSWORD,
+                        'password_confirm': PASSWORD,
+                    })
+                assert response.status_code == 201, response.content
+            register_elapsed = time.perf_counter() - started
+        finally:
+            User.objects.filter(username__startswith=prefix).delete()
+
+    return {
+        'hash_ms': summarize(hash_times)['p50_ms'],
+        'verify_ms': summarize(verify_times)['p50_ms'],
+        'token_obtain': summarize(login_times, login_elapsed),
+        'register': summarize(register_times, register_elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--configurations', nargs='+', choices=sorted(CONFIGURATIONS),
+                        default=list(CONFIGURATIONS))
+    parser.add_argument('--requests', type=int, default=30)
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    # Keep the query detector's warnings out of the measurements.
+    settings.QUERY_DETECTOR_ENABLED = False
+
+    results = {}
+    for name in args.configurations:
+        results[name] = bench_configuration(name, CONFIGURATIONS[name], args.requests)
+        print(f"{name}: verify {results[name]['verify_ms']} ms, "
+              f"{results[name]['token_obtain']['throughput_rps']} logins/s per core", flush=True)
+    write_results('auth', results, args.output, requests=args.requests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Helpers shared by the benchmarks: Django setup, statistics and JSON results."""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies, elapsed=None, errors=0):
+    """Summarise request latencies (seconds) as milliseconds and throughput."""
+    values = sorted(latencies)
+    total = len(values)
+    summary = {
+        'requests': total,
+        'errors': errors,
+        'mean_ms': round(statistics.fmean(values) * 1000, 3) if values else None,
+        'p50_ms': None,
+        'p95_ms': None,
+        'p99_ms': None,
+        'max_ms': round(values[-1] * 1000, 3) if values else None,
+    }
+    for name, fraction in (('p50_ms', 0.50), ('p95_ms', 0.95), ('p99_ms', 0.99)):
+        value = percentile(values, fraction)
+        summary[name] = round(value * 1000, 3) if value is not None else None
+    if elapsed:
+        summary['throughput_rps'] = round(total / elapsed, 1)
+    return summary
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(benchmark, results, output=None, **metadata):
+    """
+    Print results and optionally write them to a JSON file.
+
+    The file records the commit and machine, so ``benchmarks.compare`` can
+    diff two runs.
+    """
+    document = {
+        'benchmark': benchmark,
+        'commit': git_revision(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        **metadata,
+        'results': results,
+    }
+    text = json.dumps(document, indent=2, default=str)
+    if output:
+        Path(output).write_text(text + '\n')
+    print(text)
+    return document
+
+
+class Timer:
+    """Context manager collecting elapsed wall time into a list."""
+
+    def __init__(self, into):
+        self.into = into
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.into.append(time.perf_counter() - self.start)
+        return False
@@ -0,0 +1,64 @@
+"""
+Compare two benchmark result files and flag regressions.
+
+    python -m benchmarks.compare before.json after.json --threshold 10
+
+Exits with status 1 when a tracked metric got worse by more than the
+threshold (in percent).
+"""
+
+import argparse
+import json
+import sys
+
+# Metrics where a larger value is worse; throughput is the reverse.
+LOWER_IS_BETTER = ('mean_ms', 'p50_ms', 'p95_ms', 'p99_ms')
+HIGHER_IS_BETTER = ('throughput_rps',)
+
+
+def change(before, after):
+    if not before or after is None:
+        return None
+    return (after - before) / before * 100
+
+
+def compare(before, after, threshold):
+    rows = []
+    regressions = []
+    for name, old in before['results'].items():
+        new = after['results'].get(name)
+        if not isinstance(old, dict) or not isinstance(new, dict):
+            continue
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            delta = change(old.get(metric), new.get(metric))
+            if delta is None:
+                continue
+            worse = delta > threshold if metric in LOWER_IS_BETTER else delta < -threshold
+            rows.append((name, metric, old[metric], new[metric], delta, worse))
+            if worse:
+                regressions.append((name, metric, delta))
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=10.0)
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    rows, regressions = compare(before, after, args.threshold)
+    print(f"{before.get('commit')} -> {after.get('commit')}")
+    for name, metric, old, new, delta, worse in rows:
+        flag = '  REGRESSION' if worse else ''
+        print(f'{name:<28} {metric:<16} {old:>12} {new:>12} {delta:+8.1f}%{flag}')
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Bytes saved versus CPU time for each response encoding and level.
+
+Payloads are built from seeded bug reports in the shapes the API sends: a
+JSON list page, an NDJSON stream and a CSV export::
+
+    python manage.py seed_bugs --bugs 10000
+    python -m benchmarks.compression --rows 20 200 2000 --output compression.json
+
+Each payload is compressed whole, and NDJSON also row by row with a flush
+after every row, as ``CompressionMiddleware`` does for streaming responses.
+"""
+
+import argparse
+import csv
+import io
+import statistics
+import time
+
+from .common import setup_django, write_results
+
+LEVELS = {
+    'gzip': [1, 6, 9],
+    'br': [1, 4, 11],
+    'zstd': [1, 3, 19],
+}
+CSV_COLUMNS = ['id', 'title', 'severity', 'status', 'environment', 'tags', 'created_at']
+
+
+def build_payloads(rows):
+    from rest_framework.renderers import JSONRenderer
+
+    from bugs.models import BugReport
+    from bugs.serializers import BugReportSerializer
+
+    bugs = list(
+        BugReport.objects.select_related('created_by').prefetch_related('assignees', 'watchers')
+        .order_by('-created_at')[:rows]
+    )
+    if len(bugs) < rows:
+        raise SystemExit(f'Only {len(bugs)} bug reports found; run seed_bugs first.')
+    data = BugReportSerializer(bugs, many=True).data
+    renderer = JSONRenderer()
+
+    ndjson_rows = [renderer.render(row) + b'\n' for row in data]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for row in data:
+        writer.writerow([
+            ';'.join(row[column]) if column == 'tags' else row[column] for column in CSV_COLUMNS
+        ])
+    return {
+        'json_page': renderer.render({'count': rows, 'results': data}),
+        'ndjson': b''.join(ndjson_rows),
+        'csv': buffer.getvalue().encode(),
+    }, ndjson_rows
+
+
+def time_call(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return result, statistics.median(timings)
+
+
+def measure(payload, encoding, level, repeat):
+    from bugs.compression import compress
+
+    body, elapsed = time_call(lambda: compress(encoding, payload, level), repeat)
+    return {
+        'bytes': len(body),
+        'ratio': round(len(payload) / len(body), 2),
+        'saved_bytes': len(payload) - len(body),
+        'cpu_ms': round(elapsed * 1000, 3),
+        'mb_per_s': round(len(payload) / elapsed / 1e6, 1),
+    }
+
+
+def measure_streaming(rows, encoding, level, repeat):
+    from bugs.compression import ENCODERS, compress_stream
+
+    size = sum(len(row) for row in rows)
+    body, elapsed = time_call(
+        lambda: b''.join(compress_stream(iter(rows), ENCODERS[encoding](level))), repeat
+    )
+    return {
+        'bytes': len(body),
+        'ratio': round(size / len(body), 2),
+        'cpu_ms': round(elapsed * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[20, 200, 2000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    args = parser.parse_args()
+
+    setup_django()
+    from bugs.compression import ENCODERS
+
+    results = {}
+    for rows in args.rows:
+        payloads, ndjson_rows = build_payloads(rows)
+        for name, payload in payloads.items():
+            entry = results[f'{name}_{rows}'] = {'raw_bytes': len(payload)}
+            for encoding, levels in LEVELS.items():
+                if encoding not in ENCODERS:
+                    continue
+                for level in levels:
+                    entry[f'{encoding}_{level}'] = measure(payload, encoding, level, args.repeat)
+            if name == 'ndjson':
+                for encoding in ENCODERS:
+                    level = LEVELS[encoding][1]
+                    entry[f'{encoding}_{level}_streamed'] = measure_streaming(
+                        ndjson_rows, encoding, level, args.repeat
+                    )
+            print(f"{name} x{rows}: {len(payload)} bytes; " + ', '.join(
+                f"{key} {value['ratio']}x/{value['cpu_ms']}ms"
+                for key, value in entry.items() if isinstance(value, dict)
+            ), flush=True)
+    write_results('compression', results, args.output, rows=args.rows, available=list(ENCODERS))
+
+
+if __name__ == '__main__':
+    main()
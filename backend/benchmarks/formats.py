@@ -0,0 +1,82 @@
+"""
+Payload size and encode/decode time of JSON versus MessagePack.
+
+Serializes seeded bug reports as a ``/api/bugs/`` page would, then renders
+and parses the result with each format::
+
+    python manage.py seed_bugs --bugs 10000
+    python -m benchmarks.formats --rows 20 200 2000 --output formats.json
+
+``encode_ms`` covers serialization plus rendering, so it includes the time
+MessagePack saves by not formatting UUIDs and datetimes as strings.
+``decode_ms`` is what a client spends turning the bytes back into objects.
+"""
+
+import argparse
+import json
+import statistics
+import time
+import zlib
+
+from .common import setup_django, write_results
+
+
+def time_call(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return result, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[20, 200, 2000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.test import APIRequestFactory
+
+    from bugs.models import BugReport
+    from bugs.renderers import MessagePackRenderer, unpackb
+    from bugs.serializers import BugReportSerializer
+
+    formats = {
+        'json': (JSONRenderer(), json.loads),
+        'msgpack': (MessagePackRenderer(), unpackb),
+    }
+    results = {}
+    for rows in args.rows:
+        bugs = list(
+            BugReport.objects.select_related('created_by')
+            .prefetch_related('assignees', 'watchers')
+            .order_by('-created_at')[:rows]
+        )
+        if len(bugs) < rows:
+            raise SystemExit(f'Only {len(bugs)} bug reports found; run seed_bugs first.')
+        for name, (renderer, decode) in formats.items():
+            request = APIRequestFactory().get('/api/bugs/')
+            request.accepted_renderer = renderer
+
+            def encode():
+                data = BugReportSerializer(bugs, many=True, context={'request': request}).data
+                return renderer.render({'count': rows, 'results': data})
+
+            content, encode_time = time_call(encode, args.repeat)
+            _, decode_time = time_call(lambda: decode(content), args.repeat)
+            results[f'{name}_{rows}'] = {
+                'bytes': len(content),
+                'gzip_bytes': len(zlib.compress(content, 6)),
+                'encode_ms': round(encode_time * 1000, 3),
+                'decode_ms': round(decode_time * 1000, 3),
+            }
+            print(f"{name} x{rows}: {results[f'{name}_{rows}']}", flush=True)
+    write_results('formats', results, args.output, rows=args.rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,363 @@
+"""
+Load generator modelling real client traffic against a running stack.
+
+Each virtual user logs in through ``/api/auth/token/`` and then loops over a
+weighted mix of actions with randomised think time: polling the bug list,
+filtered searches, bursts of creates, updates and token refreshes. The
+client is a small keep-alive HTTP/1.1 implementation on asyncio streams, so
+the generator needs nothing beyond the standard library and never imports
+Django.
+
+Steady load for a fixed time::
+
+    python -m benchmarks.loadgen http://localhost:8000 --users 50 --duration 60
+
+Ramp until saturation (error rate, p99 or throughput stops growing)::
+
+    python -m benchmarks.loadgen http://localhost:8000 --ramp --start-users 10 --step 10
+
+Virtual users log in as the accounts created by ``manage.py seed_bugs``.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlencode, urlsplit
+
+from .common import summarize, write_results
+
+# Matches BENCHMARK_PASSWORD in the seed_bugs command.
+DEFAULT_PASSWORD = 'BenchmarkPass123!'
+
+SCENARIOS = {
+    # Dashboards left open in browser tabs.
+    'polling': {'poll_list': 85, 'filtered_search': 10, 'update': 5},
+    # People working a queue: searching, filtering and moving bugs along.
+    'triage': {'poll_list': 30, 'filtered_search': 40, 'update': 25, 'create_burst': 5},
+    # CI jobs and integrations filing bugs in bursts.
+    'reporter': {'poll_list': 20, 'create_burst': 60, 'update': 20},
+    # The blend we see in production.
+    'mixed': {'poll_list': 60, 'filtered_search': 20, 'update': 12, 'create_burst': 8},
+}
+
+SEARCH_TERMS = ['timeout', 'payment', 'login', 'stale cache', 'crash']
+FILTERS = [
+    {'status': 'open'},
+    {'severity': 'critical', 'status': 'open'},
+    {'tags': 'payments'},
+    {'status': 'in_progress', 'ordering': '-updated_at'},
+]
+
+
+class HTTPError(Exception):
+    pass
+
+
+class AsyncHTTPConnection:
+    """Minimal persistent HTTP/1.1 client connection."""
+
+    def __init__(self, host, port, timeout):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader = self.writer = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = self.writer = None
+
+    async def request(self, method, path, headers=None, body=None):
+        try:
+            return await asyncio.wait_for(
+                self._request(method, path, headers or {}, body), self.timeout
+            )
+        except BaseException:
+            await self.close()
+            raise
+
+    async def _request(self, method, path, headers, body):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        payload = body or b''
+        head = [f'{method} {path} HTTP/1.1', f'Host: {self.host}:{self.port}',
+                f'Content-Length: {len(payload)}', 'Connection: keep-alive']
+        head.extend(f'{name}: {value}' for name, value in headers.items())
+        self.writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + payload)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise HTTPError('Connection closed by server')
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            content = b''.join(chunks)
+        else:
+            content = await self.reader.readexactly(int(response_headers.get('content-length', 0)))
+
+        if response_headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, response_headers, content
+
+
+class Stats:
+    """Latencies and outcomes per action."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = Counter()
+        self.throttled = Counter()
+        self.started = time.perf_counter()
+
+    def record(self, action, latency, status):
+        self.latencies[action].append(latency)
+        if status == 429:
+            self.throttled[action] += 1
+        if status == 0 or status >= 400:
+            self.errors[action] += 1
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        every = [value for values in self.latencies.values() for value in values]
+        overall = summarize(every, elapsed, sum(self.errors.values()))
+        overall['error_rate'] = round(overall['errors'] / overall['requests'], 4) if every else 0.0
+        overall['throttled'] = sum(self.throttled.values())
+        overall['duration_s'] = round(elapsed, 1)
+        actions = {
+            action: summarize(values, elapsed, self.errors[action])
+            for action, values in sorted(self.latencies.items())
+        }
+        return {'overall': overall, 'actions': actions}
+
+
+class VirtualUser:
+    """One simulated client session."""
+
+    def __init__(self, base, username, password, mix, think_time, timeout, seed):
+        self.http = AsyncHTTPConnection(base.hostname, base.port or 80, timeout)
+        self.username = username
+        self.password = password
+        self.actions, self.weights = zip(*mix.items())
+        self.think_time = think_time
+        self.rng = random.Random(seed)
+        self.access = self.refresh_token = None
+        self.known_ids = []
+        self.stats = None
+
+    async def call(self, action, method, path, payload=None):
+        headers = {'Accept': 'application/json'}
+        body = None
+        if payload is not None:
+            body = json.dumps(payload).encode()
+            headers['Content-Type'] = 'application/json'
+        if self.access:
+            headers['Authorization'] = f'Bearer {self.access}'
+        start = time.perf_counter()
+        try:
+            status, _, content = await self.http.request(method, path, headers, body)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, HTTPError, ValueError):
+            status, content = 0, b''
+        self.stats.record(action, time.perf_counter() - start, status)
+        if status == 200 or status == 201:
+            return json.loads(content) if content else None
+        return None
+
+    async def login(self):
+        data = await self.call(
+            'login', 'POST', '/api/auth/token/',
+            {'username': self.username, 'password': self.password}
+        )
+        if data:
+            self.access, self.refresh_token = data['access'], data['refresh']
+        return data is not None
+
+    async def refresh(self):
+        data = await self.call('refresh', 'POST', '/api/auth/token/refresh/', {'refresh': self.refresh_token})
+        if data:
+            self.access = data['access']
+            self.refresh_token = data.get('refresh', self.refresh_token)
+
+    async def poll_list(self):
+        data = await self.call('poll_list', 'GET', '/api/bugs/')
+        if data:
+            self.known_ids = [bug['id'] for bug in data['results']] or self.known_ids
+
+    async def filtered_search(self):
+        params = dict(self.rng.choice(FILTERS))
+        if self.rng.random() < 0.5:
+            params['search'] = self.rng.choice(SEARCH_TERMS)
+        await self.call('filtered_search', 'GET', f'/api/bugs/?{urlencode(params)}')
+
+    async def create_burst(self):
+        for _ in range(self.rng.randint(1, 8)):
+            await self.call('create', 'POST', '/api/bugs/', {
+                'title': f'Load test bug {self.rng.randrange(10 ** 6)}',
+                'description': 'Filed by the load generator. ' * self.rng.randint(1, 20),
+                'severity': self.rng.choice(['low', 'medium', 'high', 'critical']),
+                'tags': ['loadtest'],
+            })
+
+    async def update(self):
+        if not self.known_ids:
+            return await self.poll_list()
+        await self.call(
+            'update', 'PATCH', f'/api/bugs/{self.rng.choice(self.known_ids)}/',
+            {'status': self.rng.choice(['open', 'in_progress', 'resolved'])}
+        )
+
+    async def run(self, stop, refresh_every):
+        if not await self.login():
+            return
+        iterations = 0
+        while not stop.is_set():
+            action = self.rng.choices(self.actions, self.weights)[0]
+            await getattr(self, action)()
+            iterations += 1
+            if iterations % refresh_every == 0:
+                await self.refresh()
+            if self.think_time:
+                try:
+                    await asyncio.wait_for(stop.wait(), self.rng.expovariate(1 / self.think_time))
+                except asyncio.TimeoutError:
+                    pass
+        await self.http.close()
+
+
+class LoadTest:
+    def __init__(self, args):
+        self.args = args
+        self.base = urlsplit(args.base_url)
+        self.mix = SCENARIOS[args.scenario]
+        self.stop = asyncio.Event()
+        self.tasks = []
+        self.users = []
+
+    def add_users(self, count, stats):
+        for _ in range(count):
+            index = len(self.users)
+            user = VirtualUser(
+                self.base,
+                f'{self.args.username_prefix}{index % self.args.accounts:05d}',
+                self.args.password, self.mix, self.args.think_time,
+                self.args.timeout, self.args.seed + index,
+            )
+            user.stats = stats
+            self.users.append(user)
+            self.tasks.append(asyncio.create_task(user.run(self.stop, self.args.refresh_every)))
+
+    def measure_with(self, stats):
+        for user in self.users:
+            user.stats = stats
+
+    async def finish(self):
+        self.stop.set()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    async def steady(self):
+        stats = Stats()
+        self.add_users(self.args.users, stats)
+        await asyncio.sleep(self.args.duration)
+        await self.finish()
+        return stats.summary()
+
+    async def ramp(self):
+        """Add users step by step until the stack stops keeping up."""
+        steps = []
+        users = self.args.start_users
+        self.add_users(users, Stats())
+        best_rps = 0.0
+        while users <= self.args.max_users:
+            stats = Stats()
+            self.measure_with(stats)
+            await asyncio.sleep(self.args.step_duration)
+            summary = stats.summary()
+            overall = summary['overall']
+            rps = overall.get('throughput_rps') or 0.0
+            steps.append({'users': users, **summary})
+            print(f"{users:>5} users: {rps:>8} req/s, p99 {overall['p99_ms']} ms, "
+                  f"errors {overall['error_rate']:.2%}", flush=True)
+
+            reason = None
+            if overall['error_rate'] > self.args.max_error_rate:
+                reason = 'error rate'
+            elif overall['p99_ms'] is not None and overall['p99_ms'] > self.args.max_p99_ms:
+                reason = 'p99 latency'
+            elif best_rps and rps < best_rps * (1 + self.args.min_gain):
+                reason = 'throughput plateau'
+            if reason:
+                steps[-1]['saturated'] = reason
+                break
+            best_rps = max(best_rps, rps)
+            self.add_users(self.args.step, stats)
+            users += self.args.step
+        await self.finish()
+        saturated = steps[-1] if steps and 'saturated' in steps[-1] else None
+        return {
+            'steps': steps,
+            'saturation': {
+                'users': saturated['users'],
+                'reason': saturated['saturated'],
+                'sustained_rps': best_rps,
+            } if saturated else None,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('base_url')
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='mixed')
+    parser.add_argument('--users', type=int, default=20, help='Virtual users for a steady run.')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds for a steady run.')
+    parser.add_argument('--think-time', type=float, default=1.0, help='Mean pause between actions.')
+    parser.add_argument('--refresh-every', type=int, default=50, help='Refresh the token every N actions.')
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--accounts', type=int, default=100, help='Seeded accounts to spread users over.')
+    parser.add_argument('--username-prefix', default='bench_user_')
+    parser.add_argument('--password', default=DEFAULT_PASSWORD)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--ramp', action='store_true', help='Ramp users until saturation.')
+    parser.add_argument('--start-users', type=int, default=10)
+    parser.add_argument('--step', type=int, default=10)
+    parser.add_argument('--step-duration', type=float, default=20)
+    parser.add_argument('--max-users', type=int, default=1000)
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--max-p99-ms', type=float, default=1000)
+    parser.add_argument('--min-gain', type=float, default=0.05,
+                        help='Stop when a step adds less than this share of throughput.')
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    args = parser.parse_args()
+
+    test = LoadTest(args)
+    results = asyncio.run(test.ramp() if args.ramp else test.steady())
+    write_results(
+        'loadgen', results, args.output,
+        base_url=args.base_url, scenario=args.scenario, mode='ramp' if args.ramp else 'steady',
+        think_time=args.think_time,
+    )
+
+
+if __name__ == '__main__':
+    main()
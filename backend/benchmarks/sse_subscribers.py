@@ -0,0 +1,87 @@
+"""
+Benchmark concurrent event-stream subscribers per process.
+
+Registers N subscriptions spread over users (several tabs each) on the
+in-process broker, publishes events from a separate thread the way request
+threads do, and measures fan-out latency and memory per subscriber.
+
+    python -m benchmarks.sse_subscribers --subscribers 1000 10000 --events 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+import tracemalloc
+
+from bugs.events import Broker
+
+from .common import write_results
+
+
+async def run_case(subscribers, tabs_per_user, events):
+    broker = Broker(queue_size=events)
+    users = max(1, subscribers // tabs_per_user)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    subscriptions = [broker.subscribe(i % users) for i in range(subscribers)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    memory = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+
+    latencies = []
+
+    async def consume(subscription):
+        # Events are published round-robin over users.
+        for _ in range(len(range(subscription.user_id, events, users))):
+            try:
+                message = await asyncio.wait_for(subscription.get(), 5)
+            except asyncio.TimeoutError:
+                return
+            latencies.append(time.perf_counter() - message['sent'])
+
+    consumers = [asyncio.create_task(consume(s)) for s in subscriptions]
+
+    def produce():
+        for n in range(events):
+            broker.publish(n % users, {'type': 'bug.updated', 'sent': time.perf_counter()})
+
+    started = time.perf_counter()
+    thread = threading.Thread(target=produce)
+    thread.start()
+    await asyncio.gather(*consumers)
+    thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'subscribers': subscribers,
+        'users': users,
+        'events': events,
+        'deliveries': len(latencies),
+        'deliveries_per_second': round(len(latencies) / elapsed),
+        'latency_ms_p50': round(statistics.median(latencies) * 1000, 3),
+        'latency_ms_p99': round(latencies[int(len(latencies) * 0.99)] * 1000, 3),
+        'memory_bytes_per_subscriber': round(memory / subscribers),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--subscribers', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--tabs-per-user', type=int, default=3)
+    parser.add_argument('--events', type=int, default=500)
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    args = parser.parse_args()
+
+    results = [
+        asyncio.run(run_case(n, args.tabs_per_user, args.events))
+        for n in args.subscribers
+    ]
+    write_results('sse_subscribers', results, args.output, tabs_per_user=args.tabs_per_user)
+
+
+if __name__ == '__main__':
+    main()
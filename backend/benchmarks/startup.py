@@ -0,0 +1,116 @@
+"""
+Cold-start time of each process role.
+
+Starts a fresh interpreter per run and boots Django the way the role's
+process does: the API roles load the WSGI application and resolve the
+URLconf (Django otherwise defers that to the first request), the worker
+sets Django up and loads ``run_worker``::
+
+    python -m benchmarks.startup --runs 10 --output startup.json
+
+Each role is compared with its cold-start target in milliseconds, and one
+extra run under ``python -X importtime`` lists the packages that cost the
+most to import. The exit status is 1 if any role misses its target.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from .common import write_results
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+BOOT = {
+    'api': (
+        'from config.wsgi import application\n'
+        'from django.urls import get_resolver\n'
+        'get_resolver().url_patterns\n'
+    ),
+    'worker': (
+        'import django\n'
+        'django.setup()\n'
+        'from django.core.management import load_command_class\n'
+        "load_command_class('bugs', 'run_worker')\n"
+    ),
+}
+BOOT['all'] = BOOT['schema'] = BOOT['api']
+
+# Median cold start in milliseconds. Before process roles, every process
+# loaded the full app (about 500ms API and 360ms worker on the reference box).
+TARGETS_MS = {
+    'all': 600,
+    'api': 550,
+    'schema': 600,
+    'worker': 325,
+}
+
+
+def run_boot(role, *python_args):
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'config.settings', 'DJANGO_PROCESS_ROLE': role}
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, *python_args, '-c', BOOT[role]],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return time.perf_counter() - started, completed.stderr
+
+
+def parse_importtime(report):
+    """Map each module in an ``-X importtime`` report to its own import time in microseconds."""
+    modules = {}
+    for line in report.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(self_us)
+    return modules
+
+
+def top_packages(modules, limit):
+    packages = Counter()
+    for name, self_us in modules.items():
+        parts = name.split('.')
+        # Split Django by subpackage, everything else by distribution.
+        packages['.'.join(parts[:3]) if parts[0] == 'django' else parts[0]] += self_us
+    return {name: round(us / 1000, 1) for name, us in packages.most_common(limit)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--roles', nargs='+', choices=sorted(BOOT), default=['all', 'api', 'schema', 'worker'])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--top', type=int, default=10, help='Packages to list per role.')
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    args = parser.parse_args()
+
+    results = {}
+    missed = []
+    for role in args.roles:
+        run_boot(role)  # warm the bytecode and filesystem caches
+        timings = sorted(run_boot(role)[0] for _ in range(args.runs))
+        modules = parse_importtime(run_boot(role, '-X', 'importtime')[1])
+        median_ms = round(statistics.median(timings) * 1000, 1)
+        results[role] = {
+            'median_ms': median_ms,
+            'min_ms': round(timings[0] * 1000, 1),
+            'target_ms': TARGETS_MS[role],
+            'modules': len(modules),
+            'import_ms': round(sum(modules.values()) / 1000, 1),
+            'top_packages_ms': top_packages(modules, args.top),
+        }
+        if median_ms > TARGETS_MS[role]:
+            missed.append(role)
+        print(f"{role}: {median_ms}ms (target {TARGETS_MS[role]}ms), {len(modules)} modules", flush=True)
+    write_results('startup', results, args.output, runs=args.runs)
+    if missed:
+        sys.exit(f"Cold start over target for: {', '.join(missed)}")
+
+
+if __name__ == '__main__':
+    main()
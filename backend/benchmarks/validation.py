@@ -0,0 +1,99 @@
+"""
+Per-row cost of validating bug reports.
+
+Compares three ways of validating the same synthetic rows: the shared
+``bugs.validation.clean_bug`` layer used by bulk paths, the previous
+per-call validators (choice lists rebuilt on every call, tags walked without
+de-duplication), and a full ``BugReportCreateUpdateSerializer`` round trip::
+
+    python -m benchmarks.validation --rows 20000 --output validation.json
+
+No database access is needed.
+"""
+
+import argparse
+import random
+import time
+
+from .common import setup_django, write_results
+
+TAGS = ['UI', ' api ', 'Payments', 'crash', 'ui', 'Regression', 'checkout', 'AUTH']
+
+
+def make_rows(count, seed):
+    rng = random.Random(seed)
+    return [
+        {
+            'title': f'Checkout fails for order {n}',
+            'description': 'The payment step times out after the retry. ' * rng.randint(1, 5),
+            'severity': rng.choice(['low', 'medium', 'high', 'critical']),
+            'status': rng.choice(['open', 'in_progress', 'resolved', 'closed']),
+            'tags': rng.sample(TAGS, rng.randint(0, 6)),
+        }
+        for n in range(count)
+    ]
+
+
+def legacy_validate(row):
+    """The validators as they were, before the shared layer."""
+    from bugs.models import Severity, Status
+
+    title = row['title']
+    if len(title) < 5 or len(title) > 255:
+        raise ValueError('title')
+    if len(row['description']) < 10:
+        raise ValueError('description')
+    if row['severity'] not in [choice[0] for choice in Severity.choices]:
+        raise ValueError('severity')
+    if row['status'] not in [choice[0] for choice in Status.choices]:
+        raise ValueError('status')
+    cleaned_tags = []
+    for tag in row['tags']:
+        if not isinstance(tag, str):
+            raise ValueError('tags')
+        tag = tag.strip().lower()
+        if len(tag) > 50:
+            raise ValueError('tags')
+        if tag:
+            cleaned_tags.append(tag)
+    return {**row, 'tags': cleaned_tags}
+
+
+def serializer_validate(row):
+    from bugs.serializers import BugReportCreateUpdateSerializer
+
+    serializer = BugReportCreateUpdateSerializer(data=row)
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data
+
+
+def per_row_us(func, rows):
+    started = time.perf_counter()
+    for row in rows:
+        func(row)
+    return round((time.perf_counter() - started) / len(rows) * 1e6, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    args = parser.parse_args()
+
+    setup_django()
+    from bugs.validation import clean_bug
+
+    rows = make_rows(args.rows, args.seed)
+    serializer_rows = rows[:max(1, args.rows // 20)]
+    results = {
+        'clean_bug_us': per_row_us(clean_bug, rows),
+        'legacy_validators_us': per_row_us(legacy_validate, rows),
+        'serializer_us': per_row_us(serializer_validate, serializer_rows),
+    }
+    print(results, flush=True)
+    write_results('validation', results, args.output, rows=args.rows)
+
+
+if __name__ == '__main__':
+    main()
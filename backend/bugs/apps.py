@@ -5,3 +5,8 @@ class BugsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bugs'
     verbose_name = 'Bug Tracking'
+
+    def ready(self):
+        # Register the background tasks defined outside bugs.tasks, and the
+        # custom lookups.
+        from . import attachments, buckets, lookups, saved_queries  # noqa: F401
@@ -0,0 +1,129 @@
+"""
+Content-addressed storage for bug report attachments.
+
+Uploads never sit in memory: ``HashingFileUploadHandler`` writes each chunk
+to a temporary file as it arrives and feeds it to SHA-256 on the way. The
+file is then moved (not copied) into storage as a ``Blob`` named after its
+digest, or discarded if a blob with the same content already exists, so
+identical logs and screenshots are stored once.
+
+Downloads are served with ``FileResponse``, which lets the WSGI server use
+``sendfile``. With ``ATTACHMENT_SENDFILE_HEADER`` set (``X-Accel-Redirect``
+for nginx, ``X-Sendfile`` for Apache) the front-end server sends the file
+and Django only returns headers.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from django.http import FileResponse, HttpResponse
+from django.utils.http import content_disposition_header
+
+from .models import Attachment, Blob
+from .tasks import task
+
+CHUNK_SIZE = 64 * 1024
+
+
+class HashingFileUploadHandler(TemporaryFileUploadHandler):
+    """Stream uploads to a temporary file, computing their SHA-256 as they arrive."""
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.hasher = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        upload = super().file_complete(file_size)
+        upload.sha256 = self.hasher.hexdigest()
+        return upload
+
+
+def content_hash(upload):
+    """The upload's SHA-256, computed while streaming if possible."""
+    digest = getattr(upload, 'sha256', None)
+    if digest is None:
+        hasher = hashlib.sha256()
+        for chunk in upload.chunks(CHUNK_SIZE):
+            hasher.update(chunk)
+        digest = hasher.hexdigest()
+        upload.seek(0)
+    return digest
+
+
+def _create_blob(digest, upload):
+    # Temporary uploads are renamed into place rather than copied.
+    name = default_storage.save(f'blobs/{digest[:2]}/{digest}', upload)
+    try:
+        with transaction.atomic():
+            return Blob.objects.create(sha256=digest, size=upload.size, file=name)
+    except IntegrityError:
+        # A concurrent upload of the same content won.
+        default_storage.delete(name)
+        return Blob.objects.select_for_update().get(pk=digest)
+
+
+def create_attachment(bug, upload, user):
+    """Attach an uploaded file to a bug report, reusing stored identical content."""
+    digest = content_hash(upload)
+    with transaction.atomic():
+        # The row lock keeps purge_orphan_blobs from removing a blob being reused.
+        blob = Blob.objects.select_for_update().filter(pk=digest).first()
+        if blob is None:
+            blob = _create_blob(digest, upload)
+        return Attachment.objects.create(
+            bug=bug,
+            blob=blob,
+            filename=upload.name,
+            content_type=upload.content_type or 'application/octet-stream',
+            uploaded_by=user,
+        )
+
+
+def serve_attachment(attachment):
+    """Return a response sending the attachment's content without reading it into Python."""
+    blob = attachment.blob
+    header = settings.ATTACHMENT_SENDFILE_HEADER
+    if header:
+        response = HttpResponse(content_type=attachment.content_type)
+        response[header] = settings.ATTACHMENT_SENDFILE_PREFIX + blob.file.name
+        response['Content-Disposition'] = content_disposition_header(True, attachment.filename)
+    else:
+        response = FileResponse(
+            blob.file.open('rb'),
+            as_attachment=True,
+            filename=attachment.filename,
+            content_type=attachment.content_type,
+        )
+    # Content never changes for a digest, so the digest is a strong validator.
+    response['ETag'] = f'"{blob.sha256}"'
+    response['Cache-Control'] = 'private, max-age=86400'
+    return response
+
+
+@task('bugs.purge_orphan_blobs', batch=True)
+def purge_orphan_blobs(payloads):
+    """Delete blobs that no attachment refers to any more, and their files."""
+    with transaction.atomic():
+        orphans = list(
+            Blob.objects
+            .select_for_update(skip_locked=True)
+            .filter(~Exists(Attachment.objects.filter(blob=OuterRef('pk'))))
+        )
+        if not orphans:
+            return
+        Blob.objects.filter(pk__in=[blob.pk for blob in orphans]).delete()
+        names = [blob.file.name for blob in orphans]
+
+        def delete_files():
+            for name in names:
+                default_storage.delete(name)
+
+        transaction.on_commit(delete_files)
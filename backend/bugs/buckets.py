@@ -0,0 +1,57 @@
+"""
+Upkeep for the ``bugs_throttlebucket`` table.
+
+A bucket that has refilled to capacity behaves exactly like a missing one,
+so it can be deleted; without that the table keeps a row for every user and
+client IP ever seen. The ``bugs.purge_throttle_buckets`` task deletes full
+buckets every ``THROTTLE_PURGE_INTERVAL`` seconds.
+
+Kept apart from ``bugs.throttling`` so workers can run it without loading
+Django REST framework.
+"""
+
+import logging
+
+from django.conf import settings
+from django.db import connection
+
+from .models import ThrottleBucket
+from .tasks import task
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """Return ``(capacity, tokens per second)`` for a rate like ``'100/min'``."""
+    if rate is None:
+        return None, None
+    count, period = rate.split('/')
+    capacity = int(count)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+def purge_full_buckets():
+    """Delete database buckets that have refilled to capacity; return how many."""
+    rates = settings.REST_FRAMEWORK.get('DEFAULT_THROTTLE_RATES', {})
+    scopes = [(scope, *parse_rate(rate)) for scope, rate in rates.items() if rate]
+    if not scopes:
+        return 0
+    values = ', '.join(['(%s, %s::float8, %s::float8)'] * len(scopes))
+    sql = f"""
+        DELETE FROM {ThrottleBucket._meta.db_table} AS b
+        USING (VALUES {values}) AS r (scope, capacity, rate)
+        WHERE b.key LIKE r.scope || ':%%'
+          AND b.updated_at <= clock_timestamp()
+              - make_interval(secs => (r.capacity - b.tokens) / r.rate)
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [value for scope in scopes for value in scope])
+        return cursor.rowcount
+
+
+@task('bugs.purge_throttle_buckets', batch=True, interval=settings.THROTTLE_PURGE_INTERVAL)
+def purge_throttle_buckets(payloads):
+    deleted = purge_full_buckets()
+    logger.info('Purged %s full throttle buckets.', deleted)
@@ -0,0 +1,204 @@
+"""
+HTTP response compression with ``Accept-Encoding`` negotiation.
+
+``CompressionMiddleware`` compresses the content types listed in
+``COMPRESSION_CONTENT_TYPES`` (JSON, CSV and NDJSON by default) with the
+best encoding the client accepts, in ``COMPRESSION_ENCODINGS`` preference
+order. gzip is always available; zstd and brotli need the optional
+``zstandard`` and ``brotli`` packages. Bodies below
+``COMPRESSION_MIN_SIZE`` bytes are sent as they are, since framing overhead
+eats most of the savings.
+
+Streaming responses are compressed chunk by chunk and flushed after every
+chunk, so clients still receive rows as soon as they are produced.
+
+Responses that are served many times with the same body can skip the work:
+set ``response.precompressed = precompress(content)`` and the middleware
+sends the matching variant, compressed once at the highest level.
+"""
+
+import re
+import zlib
+
+from django.conf import settings
+from django.http import FileResponse
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+Q_VALUE = re.compile(r'(?:^|;)\s*q\s*=\s*([0-9.]+)')
+
+
+class GzipEncoder:
+    max_level = 9
+
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    max_level = 11
+
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    max_level = 19
+
+    def __init__(self, level):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+ENCODERS = {'gzip': GzipEncoder}
+if brotli is not None:
+    ENCODERS['br'] = BrotliEncoder
+if zstandard is not None:
+    ENCODERS['zstd'] = ZstdEncoder
+
+
+def available_encodings():
+    """Configured encodings that can be used here, most preferred first."""
+    return [name for name in settings.COMPRESSION_ENCODINGS if name in ENCODERS]
+
+
+def compress(encoding, data, level=None):
+    """Compress a whole body; ``level`` defaults to ``COMPRESSION_LEVELS``."""
+    if level is None:
+        level = settings.COMPRESSION_LEVELS[encoding]
+    encoder = ENCODERS[encoding](level)
+    return encoder.compress(data) + encoder.finish()
+
+
+def precompress(content, encodings=None):
+    """Compress a body once with every available encoding at its highest level."""
+    return {
+        name: compress(name, content, ENCODERS[name].max_level)
+        for name in encodings or available_encodings()
+    }
+
+
+def parse_accept_encoding(header):
+    """Map each coding in an ``Accept-Encoding`` header to its q-value."""
+    accepted = {}
+    for part in header.split(','):
+        coding, _, params = part.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        match = Q_VALUE.search(params)
+        try:
+            accepted[coding] = float(match.group(1)) if match else 1.0
+        except ValueError:
+            accepted[coding] = 0.0
+    return accepted
+
+
+def choose_encoding(header, encodings):
+    """The acceptable encoding with the highest q-value; ties go to server preference."""
+    accepted = parse_accept_encoding(header)
+    default = accepted.get('*', 0.0)
+    best, best_q = None, 0.0
+    for name in encodings:
+        q = accepted.get(name, default)
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def compress_stream(chunks, encoder):
+    for chunk in chunks:
+        data = encoder.compress(chunk) + encoder.flush()
+        if data:
+            yield data
+    yield encoder.finish()
+
+
+async def compress_async_stream(chunks, encoder):
+    async for chunk in chunks:
+        data = encoder.compress(chunk) + encoder.flush()
+        if data:
+            yield data
+    yield encoder.finish()
+
+
+def is_compressible(response, content_types):
+    if response.has_header('Content-Encoding') or response.status_code in (204, 304):
+        return False
+    # FileResponse keeps its file object so servers can use sendfile.
+    if isinstance(response, FileResponse):
+        return False
+    if 'no-transform' in response.get('Cache-Control', ''):
+        return False
+    content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+    return content_type in content_types
+
+
+def compress_response(request, response, encodings, content_types, min_size):
+    """Compress ``response`` in place for ``request`` if it is worth it."""
+    if not is_compressible(response, content_types):
+        return response
+    if not response.streaming and len(response.content) < min_size:
+        return response
+
+    patch_vary_headers(response, ('Accept-Encoding',))
+    encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), encodings)
+    if encoding is None:
+        return response
+
+    if response.streaming:
+        encoder = ENCODERS[encoding](settings.COMPRESSION_LEVELS[encoding])
+        if response.is_async:
+            response.streaming_content = compress_async_stream(response.streaming_content, encoder)
+        else:
+            response.streaming_content = compress_stream(response.streaming_content, encoder)
+        del response['Content-Length']
+    else:
+        precompressed = getattr(response, 'precompressed', None) or {}
+        body = precompressed.get(encoding) or compress(encoding, response.content)
+        if len(body) >= len(response.content):
+            return response
+        response.content = body
+        response['Content-Length'] = str(len(body))
+
+    # The compressed body is no longer byte-for-byte the entity a strong ETag names.
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+    response['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,217 @@
+"""
+Push notifications for bug report changes.
+
+``BugReportViewSet`` publishes an event whenever it creates, updates or
+deletes a report. Events are fanned out to the open Server-Sent Events
+streams of everyone who can see the report (its owner, assignees, watchers
+and project members) by an in-process broker. With ``BUG_EVENTS_BACKEND`` set to
+``'postgres'`` events travel through ``pg_notify`` instead, and every process
+relays the notifications it receives to its own subscribers, so several
+workers can share one channel without an external message broker.
+"""
+
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = 'bug_events'
+
+
+class Subscription:
+    """A single connected client, bound to the event loop that serves it."""
+
+    def __init__(self, user_id, loop, maxsize):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def push(self, message):
+        """Queue a message, dropping the oldest one if the client is slow."""
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class Broker:
+    """
+    In-process fan-out of event messages to subscribers, keyed by user id.
+
+    ``publish`` may be called from any thread; delivery is scheduled on the
+    event loop that owns each subscription.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        """Register a subscription on the running event loop."""
+        subscription = Subscription(
+            user_id, asyncio.get_running_loop(), self.queue_size
+        )
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def publish(self, user_id, message):
+        """Deliver a message to every subscription of the given user."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.push, message)
+            except RuntimeError:
+                # The loop serving this client has already shut down.
+                self.unsubscribe(subscription)
+        return len(subscriptions)
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subs) for subs in self._subscriptions.values())
+
+
+broker = Broker()
+
+
+class PostgresListener(threading.Thread):
+    """
+    Relay ``NOTIFY`` messages from Postgres to the in-process broker.
+
+    One daemon thread per process holds a dedicated connection that
+    ``LISTEN``s on the events channel.
+    """
+
+    daemon = True
+
+    def __init__(self, target_broker, alias='default', poll_interval=5.0):
+        super().__init__(name='bug-events-listener')
+        self.broker = target_broker
+        self.alias = alias
+        self.poll_interval = poll_interval
+
+    def _connect(self):
+        wrapper = connections[self.alias]
+        conn = wrapper.get_new_connection(wrapper.get_connection_params())
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f'LISTEN {NOTIFY_CHANNEL}')
+        return conn
+
+    def run(self):
+        while True:
+            try:
+                conn = self._connect()
+                while True:
+                    if select.select([conn], [], [], self.poll_interval) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        payload = json.loads(notify.payload)
+                        self.broker.publish(payload.pop('user'), payload)
+            except Exception:
+                logger.exception('Bug events listener failed, reconnecting.')
+                threading.Event().wait(self.poll_interval)
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def ensure_listener():
+    """Start the Postgres listener thread once per process, if configured."""
+    global _listener
+    if getattr(settings, 'BUG_EVENTS_BACKEND', 'local') != 'postgres':
+        return
+    with _listener_lock:
+        if _listener is None:
+            _listener = PostgresListener(broker)
+            _listener.start()
+
+
+def _send(messages):
+    """Send (user id, message) pairs; through Postgres, all in one statement."""
+    if getattr(settings, 'BUG_EVENTS_BACKEND', 'local') == 'postgres':
+        payloads = [json.dumps({'user': user_id, **message}) for user_id, message in messages]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload',
+                [NOTIFY_CHANNEL, payloads]
+            )
+    else:
+        for user_id, message in messages:
+            broker.publish(user_id, message)
+
+
+def bug_audiences(bug_ids):
+    """
+    The ids of the users who can see each bug report, as {bug id: {user ids}}.
+
+    One query covers any number of bug reports: the owners, assignees,
+    watchers, and direct and team members of their projects.
+    """
+    from .models import BugReport, ProjectMembership, TeamMembership
+
+    bug_ids = list(bug_ids)
+    owners = BugReport.objects.filter(pk__any=bug_ids).order_by().values_list('pk', 'created_by_id')
+    people = [
+        relation.through.objects.filter(bugreport__id__any=bug_ids).values_list('bugreport_id', 'user_id')
+        for relation in (BugReport.assignees, BugReport.watchers)
+    ]
+    members = ProjectMembership.objects.filter(project__bug_reports__id__any=bug_ids).values_list(
+        'project__bug_reports__id', 'user_id'
+    )
+    team_members = TeamMembership.objects.filter(team__projects__bug_reports__id__any=bug_ids).values_list(
+        'team__projects__bug_reports__id', 'user_id'
+    )
+    audiences = defaultdict(set)
+    for bug_id, user_id in owners.union(*people, members, team_members, all=True):
+        audiences[bug_id].add(user_id)
+    return audiences
+
+
+def publish_bug_event(event_type, bug_id, audiences=None):
+    """
+    Notify the connected clients of everyone who can see a bug report.
+
+    The audience is looked up straight away, so pass ``audiences`` from
+    ``bug_audiences`` taken before a delete. The message is sent once the
+    surrounding transaction commits, so clients never refetch a row that is
+    not visible yet.
+    """
+    publish_bug_events(event_type, [bug_id], audiences)
+
+
+def publish_bug_events(event_type, bug_ids, audiences=None):
+    """``publish_bug_event`` for many bug reports, looked up and sent together."""
+    if not bug_ids:
+        return
+    if audiences is None:
+        audiences = bug_audiences(bug_ids)
+    messages = [
+        (user_id, {'type': event_type, 'id': str(bug_id)})
+        for bug_id in bug_ids
+        for user_id in sorted(audiences.get(bug_id, ()))
+    ]
+    if messages:
+        transaction.on_commit(lambda: _send(messages))
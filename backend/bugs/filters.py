@@ -1,7 +1,13 @@
 import django_filters
+from django.db.models import Exists, OuterRef
 
 from .models import BugReport
 
+# Fields /api/bugs/ searches with ?search= and may be sorted by with ?ordering=.
+SEARCH_FIELDS = ['title', 'description']
+ORDERING_FIELDS = ['created_at', 'updated_at', 'severity', 'status', 'title']
+DEFAULT_ORDERING = '-created_at'
+
 
 class BugReportFilter(django_filters.FilterSet):
     """Filter for BugReport queryset."""
@@ -17,13 +23,29 @@ class BugReportFilter(django_filters.FilterSet):
         lookup_expr='lte'
     )
     tags = django_filters.CharFilter(method='filter_tags')
+    project = django_filters.NumberFilter(field_name='project_id')
+    assignee = django_filters.CharFilter(method='filter_user', field_name='assignees')
+    watched_by = django_filters.CharFilter(method='filter_user', field_name='watchers')
 
     class Meta:
         model = BugReport
-        fields = ['severity', 'status']
+        fields = ['severity', 'status', 'project']
 
     def filter_tags(self, queryset, name, value):
         """Filter by tag (checks if tag is in the tags array)."""
         if value:
             return queryset.filter(tags__contains=[value.lower()])
         return queryset
+
+    def filter_user(self, queryset, name, value):
+        """Filter by assignee or watcher id; ``me`` means the requesting user."""
+        if value == 'me':
+            user_id = self.request.user.pk
+        elif value.isascii() and value.isdecimal():
+            user_id = int(value)
+        else:
+            return queryset.none()
+        through = getattr(BugReport, name).through
+        return queryset.filter(
+            Exists(through.objects.filter(user_id=user_id, bugreport=OuterRef('pk')))
+        )
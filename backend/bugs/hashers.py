@@ -0,0 +1,31 @@
+"""
+Password hashers with costs taken from settings.
+
+Both hashers keep Django's algorithm names, so hashes made with other costs
+still verify. ``must_update`` compares the stored parameters with the
+configured ones, which makes Django rehash the password on the next
+successful login after the costs change.
+"""
+
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, ScryptPasswordHasher
+
+
+class TunableArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2id with ``ARGON2_TIME_COST``, ``ARGON2_MEMORY_COST`` (KiB) and ``ARGON2_PARALLELISM``."""
+
+    def __init__(self):
+        self.time_cost = settings.ARGON2_TIME_COST
+        self.memory_cost = settings.ARGON2_MEMORY_COST
+        self.parallelism = settings.ARGON2_PARALLELISM
+
+
+class TunableScryptPasswordHasher(ScryptPasswordHasher):
+    """scrypt with ``SCRYPT_WORK_FACTOR``, ``SCRYPT_BLOCK_SIZE`` and ``SCRYPT_PARALLELISM``."""
+
+    def __init__(self):
+        self.work_factor = settings.SCRYPT_WORK_FACTOR
+        self.block_size = settings.SCRYPT_BLOCK_SIZE
+        self.parallelism = settings.SCRYPT_PARALLELISM
+        # scrypt needs 128 * N * r bytes; OpenSSL refuses more than 32 MiB by default.
+        self.maxmem = 256 * self.work_factor * self.block_size
@@ -0,0 +1,22 @@
+from django.db.models import Field, Lookup
+
+
+@Field.register_lookup
+class AnyLookup(Lookup):
+    """
+    ``field__any=[...]`` compiles to ``field = ANY(%s)`` with one array parameter.
+
+    Unlike ``__in``, the SQL is the same for any number of values, so the
+    statement shape stays stable and Postgres plans it once.
+    """
+    lookup_name = 'any'
+    prepare_rhs = False
+
+    def get_db_prep_lookup(self, value, connection):
+        field = self.lhs.output_field
+        return '%s', [[field.get_db_prep_value(item, connection, prepared=False) for item in value]]
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} = ANY({rhs})', (*lhs_params, *rhs_params)
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from bugs.schema import default_artefact_path, schema_version, write_artefact
+
+
+class Command(BaseCommand):
+    help = 'Generate the OpenAPI schema and write it to a versioned JSON file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            help='Where to write the schema (default: OPENAPI_SCHEMA_FILE, or '
+                 'build/openapi-<version>.json).'
+        )
+
+    def handle(self, *args, **options):
+        if not settings.SERVES_SCHEMA:
+            raise CommandError(
+                f'The {settings.PROCESS_ROLE!r} process role does not load drf-spectacular; '
+                'run build_schema with DJANGO_PROCESS_ROLE=all or schema.'
+            )
+        path = options['output'] or settings.OPENAPI_SCHEMA_FILE or default_artefact_path()
+        schema = write_artefact(path)
+        self.stdout.write(
+            f"Wrote OpenAPI schema {schema_version()} ({len(schema['paths'])} paths) to {path}"
+        )
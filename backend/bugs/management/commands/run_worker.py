@@ -0,0 +1,62 @@
+import select
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from bugs import tasks
+
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--poll-interval', type=float, default=5.0,
+            help='Seconds to wait for a notification before polling for due retries.'
+        )
+        parser.add_argument('--once', action='store_true', help='Exit when no tasks are due.')
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        if not options['once']:
+            self.listen()
+        next_schedule = time.monotonic()
+        total = 0
+        while not self.stopping:
+            # Periodic tasks that failed for good are queued again here.
+            if not options['once'] and time.monotonic() >= next_schedule:
+                tasks.schedule_periodic()
+                next_schedule = time.monotonic() + settings.TASK_SCHEDULE_INTERVAL
+            claimed = tasks.run_pending(options['batch_size'])
+            total += claimed
+            if claimed:
+                continue
+            if options['once']:
+                break
+            self.wait(options['poll_interval'])
+        self.stdout.write(f'Worker stopped after {total} tasks.')
+
+    def stop(self, signum, frame):
+        self.stopping = True
+
+    def listen(self):
+        connection.ensure_connection()
+        with connection.cursor() as cursor:
+            cursor.execute(f'LISTEN {tasks.NOTIFY_CHANNEL}')
+
+    def wait(self, timeout):
+        """Sleep until a task is enqueued or the poll interval passes."""
+        raw = connection.connection
+        try:
+            select.select([raw], [], [], timeout)
+        except InterruptedError:
+            return
+        raw.poll()
+        raw.notifies.clear()
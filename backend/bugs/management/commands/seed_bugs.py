@@ -0,0 +1,198 @@
+import csv
+import io
+import random
+import uuid
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from bugs.models import BugReport, Project, ProjectMembership, Severity, Status
+
+User = get_user_model()
+
+BENCHMARK_PASSWORD = 'BenchmarkPass123!'
+USERNAME_PREFIX = 'bench_user_'
+
+STATUS_WEIGHTS = {
+    Status.OPEN: 35,
+    Status.IN_PROGRESS: 15,
+    Status.RESOLVED: 20,
+    Status.CLOSED: 30,
+}
+SEVERITY_WEIGHTS = {
+    Severity.LOW: 30,
+    Severity.MEDIUM: 40,
+    Severity.HIGH: 22,
+    Severity.CRITICAL: 8,
+}
+TAGS_PER_BUG_WEIGHTS = [15, 30, 25, 15, 10, 5]
+COMMON_TAGS = [
+    'ui', 'backend', 'api', 'payments', 'auth', 'performance', 'mobile', 'crash',
+    'regression', 'security', 'database', 'search', 'login', 'checkout', 'email',
+    'notifications', 'accessibility', 'i18n', 'flaky', 'infra',
+]
+ENVIRONMENTS = [
+    'Windows 11 / Chrome 121', 'macOS 14 / Safari 17', 'Ubuntu 22.04 / Firefox 122',
+    'iOS 17 / Safari', 'Android 14 / Chrome', 'Production', 'Staging', '',
+]
+WORDS = (
+    'the request fails when user clicks button after login page loads error '
+    'stack trace timeout null value expected result actual behaviour screen '
+    'cannot save form field shows wrong total payment retry server returns '
+    'response slow query cache stale token refresh mobile layout broken'
+).split()
+
+COPY_COLUMNS = [
+    'id', 'title', 'description', 'steps_to_reproduce', 'expected_result',
+    'actual_result', 'severity', 'status', 'environment', 'tags',
+    'created_by_id', 'project_id', 'created_at', 'updated_at',
+]
+
+
+def zipf_cum_weights(n, exponent):
+    """Cumulative Zipf weights, so a few ranks dominate the draws."""
+    return list(accumulate(1 / (rank + 1) ** exponent for rank in range(n)))
+
+
+class Command(BaseCommand):
+    help = 'Seed synthetic users and bug reports with realistic, skewed distributions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--bugs', type=int, default=100_000)
+        parser.add_argument('--batch-size', type=int, default=20_000)
+        parser.add_argument('--tags', type=int, default=200, help='Size of the tag vocabulary.')
+        parser.add_argument('--days', type=int, default=730, help='Spread created_at over this many days.')
+        parser.add_argument(
+            '--large-description-rate', type=float, default=0.01,
+            help='Share of bugs carrying a 16-64 KB description (logs, stack traces).'
+        )
+        parser.add_argument(
+            '--projects', type=int, default=0,
+            help='Create this many shared projects and file most bugs under them.'
+        )
+        parser.add_argument(
+            '--projects-per-user', type=int, default=20,
+            help='Project memberships per user when --projects is set.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        user_ids = self.create_users(options['users'])
+        user_projects = self.create_projects(rng, user_ids, options)
+        tags = COMMON_TAGS + [
+            f'component-{n:03d}' for n in range(max(0, options['tags'] - len(COMMON_TAGS)))
+        ]
+        corpus = ' '.join(rng.choice(WORDS) for _ in range(20_000))
+
+        generator = self.rows(rng, user_ids, user_projects, tags[:options['tags']], corpus, options)
+        remaining = options['bugs']
+        while remaining > 0:
+            size = min(options['batch_size'], remaining)
+            self.copy_rows([next(generator) for _ in range(size)])
+            remaining -= size
+            self.stdout.write(f"Inserted {options['bugs'] - remaining}/{options['bugs']} bug reports")
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {BugReport._meta.db_table}')
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {options['bugs']} bug reports for {len(user_ids)} users "
+            f"(password '{BENCHMARK_PASSWORD}')."
+        ))
+
+    def create_users(self, count):
+        """Create benchmark users, sharing one precomputed password hash."""
+        password = make_password(BENCHMARK_PASSWORD)
+        usernames = [f'{USERNAME_PREFIX}{n:05d}' for n in range(count)]
+        User.objects.bulk_create(
+            [
+                User(username=name, email=f'{name}@example.com', password=password)
+                for name in usernames
+            ],
+            ignore_conflicts=True,
+        )
+        ids = dict(User.objects.filter(username__in=usernames).values_list('username', 'id'))
+        # Ordered by rank: the first user gets the largest backlog.
+        return [ids[name] for name in usernames]
+
+    def create_projects(self, rng, user_ids, options):
+        """Create projects with random members; return each user's project ids."""
+        user_projects = {user_id: [] for user_id in user_ids}
+        if not options['projects']:
+            return user_projects
+        projects = Project.objects.bulk_create(
+            [Project(name=f'Bench project {n:04d}') for n in range(options['projects'])]
+        )
+        per_user = min(options['projects_per_user'], len(projects))
+        memberships = []
+        for user_id in user_ids:
+            for project in rng.sample(projects, per_user):
+                user_projects[user_id].append(project.pk)
+                memberships.append(ProjectMembership(project=project, user_id=user_id))
+        ProjectMembership.objects.bulk_create(memberships, batch_size=10_000, ignore_conflicts=True)
+        return user_projects
+
+    def rows(self, rng, user_ids, user_projects, tags, corpus, options):
+        owner_weights = zipf_cum_weights(len(user_ids), 1.1)
+        tag_weights = zipf_cum_weights(len(tags), 1.2)
+        statuses, status_weights = zip(*STATUS_WEIGHTS.items())
+        severities, severity_weights = zip(*SEVERITY_WEIGHTS.items())
+        now = timezone.now()
+        span = timedelta(days=options['days']).total_seconds()
+
+        def text(length):
+            if length >= len(corpus):
+                return (corpus * (length // len(corpus) + 1))[:length]
+            start = rng.randrange(len(corpus) - length + 1)
+            return corpus[start:start + length]
+
+        while True:
+            if rng.random() < options['large_description_rate']:
+                description_length = rng.randint(16_384, 65_536)
+            else:
+                description_length = min(8_000, max(10, int(rng.lognormvariate(5.5, 1.0))))
+            tag_count = rng.choices(range(len(TAGS_PER_BUG_WEIGHTS)), TAGS_PER_BUG_WEIGHTS)[0]
+            bug_tags = sorted(set(rng.choices(tags, cum_weights=tag_weights, k=tag_count)))
+            # Squaring skews creation dates towards the recent past.
+            created_at = now - timedelta(seconds=span * rng.random() ** 2)
+            updated_at = created_at + (now - created_at) * rng.random() ** 4
+            owner_id = rng.choices(user_ids, cum_weights=owner_weights)[0]
+            # A few bugs stay private to their owner; empty loads as NULL.
+            projects = user_projects[owner_id]
+            project_id = rng.choice(projects) if projects and rng.random() < 0.9 else ''
+            yield [
+                uuid.uuid4(),
+                text(rng.randint(20, 120)).strip().capitalize() or 'Untitled bug',
+                text(description_length),
+                text(rng.randint(0, 400)),
+                text(rng.randint(0, 120)),
+                text(rng.randint(0, 120)),
+                rng.choices(severities, severity_weights)[0],
+                rng.choices(statuses, status_weights)[0],
+                rng.choice(ENVIRONMENTS),
+                '{' + ','.join(bug_tags) + '}',
+                owner_id,
+                project_id,
+                created_at.isoformat(),
+                updated_at.isoformat(),
+            ]
+
+    def copy_rows(self, rows):
+        """Load a batch with COPY, which is far faster than INSERTs for millions of rows."""
+        buffer = io.StringIO()
+        # Quoting every value keeps empty strings from loading as NULL.
+        csv.writer(buffer, quoting=csv.QUOTE_ALL).writerows(rows)
+        buffer.seek(0)
+        columns = ', '.join(COPY_COLUMNS)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {BugReport._meta.db_table} ({columns}) '
+                'FROM STDIN WITH (FORMAT csv, FORCE_NULL (project_id))',
+                buffer
+            )
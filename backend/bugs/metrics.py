@@ -0,0 +1,193 @@
+"""
+Per-request performance metrics.
+
+``RequestMetricsMiddleware`` collects wall time, database query count and
+time, serializer time and response size for every request, labelled by
+endpoint and viewset action. The numbers are returned to the client in a
+``Server-Timing`` header and aggregated into histograms that ``metrics_view``
+exposes in the Prometheus text format.
+
+Histograms live in process memory, so each worker process reports its own
+series; scrape every process (or put them behind a single-process server).
+"""
+
+import bisect
+import hmac
+import math
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class Histogram:
+    """A labelled histogram with fixed buckets, safe to observe from any thread."""
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (plus +Inf), then sum and count.
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} histogram',
+        ]
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            label_text = ','.join(
+                f'{name}="{value}"' for name, value in zip(self.labelnames, labels)
+            )
+            prefix = f'{label_text},' if label_text else ''
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series):
+                cumulative += count
+                le = '+Inf' if bound is math.inf else repr(bound)
+                lines.append(f'{self.name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {series[-2]}')
+            lines.append(f'{self.name}_count{{{label_text}}} {series[-1]}')
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+REQUEST_LABELS = ('endpoint', 'action', 'method', 'status')
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'Wall time spent handling the request.',
+    REQUEST_LABELS, LATENCY_BUCKETS,
+)
+DB_DURATION = Histogram(
+    'http_request_db_duration_seconds',
+    'Time spent executing database queries per request.',
+    REQUEST_LABELS, LATENCY_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    'http_request_db_queries',
+    'Number of database queries per request.',
+    REQUEST_LABELS, QUERY_COUNT_BUCKETS,
+)
+SERIALIZER_DURATION = Histogram(
+    'http_request_serializer_duration_seconds',
+    'Time spent serializing model instances per request.',
+    REQUEST_LABELS, LATENCY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes',
+    'Size of non-streaming response bodies.',
+    REQUEST_LABELS, SIZE_BUCKETS,
+)
+
+HISTOGRAMS = [REQUEST_DURATION, DB_DURATION, DB_QUERIES, SERIALIZER_DURATION, RESPONSE_SIZE]
+
+
+class RequestMetrics:
+    """
+    Measurements for the request being handled.
+
+    Instances double as ``connection.execute_wrapper`` callables, so every
+    query run while the request is active is counted and timed.
+    """
+
+    __slots__ = ('endpoint', 'action', 'db_queries', 'db_time', 'serializer_time')
+
+    def __init__(self):
+        self.endpoint = 'unmatched'
+        self.action = ''
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.db_queries += 1
+
+
+current_metrics = ContextVar('current_metrics', default=None)
+
+
+class TimedRepresentationMixin:
+    """Add serializer ``to_representation`` time to the current request's metrics."""
+
+    def to_representation(self, instance):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return super().to_representation(instance)
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serializer_time += time.perf_counter() - start
+
+
+def record(metrics, method, status_code, duration, size):
+    """Add one finished request to the histograms."""
+    labels = (metrics.endpoint, metrics.action, method, str(status_code))
+    REQUEST_DURATION.observe(labels, duration)
+    DB_DURATION.observe(labels, metrics.db_time)
+    DB_QUERIES.observe(labels, metrics.db_queries)
+    SERIALIZER_DURATION.observe(labels, metrics.serializer_time)
+    if size is not None:
+        RESPONSE_SIZE.observe(labels, size)
+
+
+def server_timing(metrics, duration):
+    """Format the ``Server-Timing`` header value for a request."""
+    return (
+        f'total;dur={duration * 1000:.2f}, '
+        f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.db_queries} queries", '
+        f'ser;dur={metrics.serializer_time * 1000:.2f}'
+    )
+
+
+def may_scrape(request):
+    """Whether the request comes from an allowed address or carries the metrics token."""
+    if request.META.get('REMOTE_ADDR') in settings.REQUEST_METRICS_ALLOWED_IPS:
+        return True
+    token = settings.REQUEST_METRICS_TOKEN
+    return bool(token) and hmac.compare_digest(
+        request.headers.get('Authorization', ''), f'Bearer {token}'
+    )
+
+
+def metrics_view(request):
+    """Expose the collected histograms in the Prometheus text format."""
+    if not settings.REQUEST_METRICS_ENABLED:
+        raise Http404
+    if not may_scrape(request):
+        return HttpResponseForbidden()
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return HttpResponse(
+        '\n'.join(lines) + '\n',
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -0,0 +1,139 @@
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import JsonResponse
+
+from .compression import available_encodings, compress_response
+from .metrics import RequestMetrics, current_metrics, record, server_timing
+from .query_detector import QueryDetector
+
+
+@contextmanager
+def execute_wrapper_everywhere(wrapper):
+    """Install ``wrapper`` on every database connection, replicas included."""
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(wrapper))
+        yield
+
+
+class RequestMetricsMiddleware:
+    """
+    Record per-request timings for the Prometheus histograms.
+
+    Removes itself from the stack when ``REQUEST_METRICS_ENABLED`` is off, so
+    a disabled deployment pays nothing beyond a context variable lookup in
+    the serializers.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            with execute_wrapper_everywhere(metrics):
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        duration = time.perf_counter() - start
+
+        size = None if response.streaming else len(response.content)
+        record(metrics, request.method, response.status_code, duration, size)
+        if settings.REQUEST_METRICS_SERVER_TIMING:
+            response['Server-Timing'] = server_timing(metrics, duration)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = current_metrics.get()
+        metrics.endpoint = request.resolver_match.view_name or request.resolver_match.route
+        # Viewsets map HTTP methods to actions such as 'list' or 'partial_update'.
+        actions = getattr(view_func, 'actions', None)
+        if actions:
+            metrics.action = actions.get(request.method.lower(), '')
+        return None
+
+
+class QueryDetectorMiddleware:
+    """Check every request for repeated query shapes and slow queries."""
+
+    def __init__(self, get_response):
+        if not settings.QUERY_DETECTOR_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        detector = QueryDetector.from_settings()
+        with execute_wrapper_everywhere(detector):
+            response = self.get_response(request)
+        detector.check(f'{request.method} {request.path}')
+        return response
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    Shed load once too many requests are in flight in this process.
+
+    Excess requests get an immediate 429 with ``Retry-After`` rather than
+    queueing behind a saturated worker pool.
+    """
+
+    exempt_paths = ('/metrics',)
+
+    def __init__(self, get_response):
+        if not settings.MAX_CONCURRENT_REQUESTS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.limit = settings.MAX_CONCURRENT_REQUESTS
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, request):
+        if request.path in self.exempt_paths:
+            return self.get_response(request)
+        with self._lock:
+            admitted = self.in_flight < self.limit
+            if admitted:
+                self.in_flight += 1
+        if not admitted:
+            response = JsonResponse(
+                {'detail': 'Server is busy, please retry shortly.'},
+                status=429
+            )
+            response['Retry-After'] = str(settings.LOAD_SHED_RETRY_AFTER)
+            return response
+        try:
+            return self.get_response(request)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class CompressionMiddleware:
+    """
+    Compress API responses with the best encoding the client accepts.
+
+    See ``bugs.compression``. Removes itself from the stack when
+    ``COMPRESSION_ENABLED`` is off.
+    """
+
+    def __init__(self, get_response):
+        if not settings.COMPRESSION_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.encodings = available_encodings()
+        self.content_types = frozenset(settings.COMPRESSION_CONTENT_TYPES)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return compress_response(
+            request, response, self.encodings, self.content_types, settings.COMPRESSION_MIN_SIZE
+        )
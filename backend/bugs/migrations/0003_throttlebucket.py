@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bugs', '0002_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ThrottleBucket',
+            fields=[
+                ('key', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('tokens', models.FloatField()),
+                ('allowed', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.RunSQL(
+            'ALTER TABLE bugs_throttlebucket SET UNLOGGED',
+            reverse_sql='ALTER TABLE bugs_throttlebucket SET LOGGED',
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bugs', '0004_projects'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bugreport',
+            name='assignees',
+            field=models.ManyToManyField(blank=True, help_text='Users working on this bug report', related_name='assigned_bugs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='bugreport',
+            name='watchers',
+            field=models.ManyToManyField(blank=True, help_text='Users following this bug report', related_name='watched_bugs', to=settings.AUTH_USER_MODEL),
+        ),
+        # "Bugs assigned to / watched by X" lookups become index-only scans.
+        migrations.RunSQL(
+            'CREATE INDEX bugs_bug_assignees_user_bug_idx '
+            'ON bugs_bugreport_assignees (user_id, bugreport_id)',
+            reverse_sql='DROP INDEX bugs_bug_assignees_user_bug_idx',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX bugs_bug_watchers_user_bug_idx '
+            'ON bugs_bugreport_watchers (user_id, bugreport_id)',
+            reverse_sql='DROP INDEX bugs_bug_watchers_user_bug_idx',
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:08
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without locking bugreport against writes.
+    atomic = False
+
+    dependencies = [
+        ('bugs', '0006_comments_attachments'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name='bugreport',
+            index=models.Index(fields=['-created_at', '-id'], name='bugs_bug_created_idx'),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name='bugreport',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('title', django.db.models.functions.text.Left('description', 10000), config='simple'), name='bugs_bug_search_idx'),
+        ),
+        django.contrib.postgres.operations.AddIndexConcurrently(
+            model_name='bugreport',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tags'], name='bugs_bug_tags_idx'),
+        ),
+    ]
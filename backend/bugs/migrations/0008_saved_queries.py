@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bugs', '0007_bug_admin_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('result_count', models.PositiveIntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True)),
+                ('refresh_requested_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_queries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'saved queries',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SavedQueryResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('bug', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_query_results', to='bugs.bugreport')),
+                ('saved_query', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='bugs.savedquery')),
+            ],
+            options={
+                'ordering': ['saved_query', 'position'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='savedquery',
+            constraint=models.UniqueConstraint(fields=('owner', 'name'), name='bugs_savedquery_owner_name_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='savedqueryresult',
+            constraint=models.UniqueConstraint(fields=('saved_query', 'position'), name='bugs_savedresult_query_position_unique'),
+        ),
+    ]
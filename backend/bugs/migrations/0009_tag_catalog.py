@@ -0,0 +1,122 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Each trigger turns a statement's transition tables into per-owner tag
+# deltas ({changes} selects owner_id, bug id, tag and a +1 or -1 change),
+# adds the positive ones and subtracts the negative ones in one statement,
+# then drops tags whose count reached zero. One aggregated upsert per
+# statement keeps bulk inserts and COPY cheap.
+APPLY_CHANGES = """
+    CREATE FUNCTION {function}() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        WITH delta AS (
+            SELECT owner_id, tag AS name, sum(change) AS delta FROM ({changes}) AS changes
+            GROUP BY owner_id, tag
+            HAVING sum(change) <> 0
+        ), added AS (
+            INSERT INTO bugs_tag (owner_id, name, bug_count)
+            SELECT owner_id, name, delta FROM delta WHERE delta > 0
+            ORDER BY owner_id, name
+            ON CONFLICT (owner_id, name) DO UPDATE
+            SET bug_count = bugs_tag.bug_count + EXCLUDED.bug_count
+        )
+        UPDATE bugs_tag SET bug_count = GREATEST(bugs_tag.bug_count + delta.delta, 0)
+        FROM delta
+        WHERE delta.delta < 0 AND bugs_tag.owner_id = delta.owner_id AND bugs_tag.name = delta.name;
+        {cleanup}
+        RETURN NULL;
+    END
+    $$;
+"""
+REMOVE_UNUSED = (
+    'DELETE FROM bugs_tag WHERE bug_count = 0 '
+    'AND owner_id IN (SELECT DISTINCT created_by_id FROM old_rows);'
+)
+
+# Tags of each changed bug report, once per bug even if repeated in the array.
+ROW_TAGS = "SELECT DISTINCT r.id, r.created_by_id AS owner_id, tag, {change} AS change " \
+           "FROM {rows} r, unnest(r.tags) AS tag"
+
+INSERTED = ROW_TAGS.format(rows='new_rows', change=1)
+DELETED = ROW_TAGS.format(rows='old_rows', change=-1)
+# Only rows whose tags or owner changed; status and text edits cancel out anyway.
+UPDATED = (
+    ROW_TAGS.format(rows='(SELECT n.* FROM new_rows n JOIN old_rows o USING (id) '
+                         'WHERE n.tags IS DISTINCT FROM o.tags '
+                         'OR n.created_by_id <> o.created_by_id)', change=1)
+    + ' UNION ALL '
+    + ROW_TAGS.format(rows='(SELECT o.* FROM old_rows o JOIN new_rows n USING (id) '
+                         'WHERE n.tags IS DISTINCT FROM o.tags '
+                         'OR n.created_by_id <> o.created_by_id)', change=-1)
+)
+
+TRIGGERS = """
+    {inserted}
+    {updated}
+    {deleted}
+    CREATE TRIGGER bugs_tag_counts_insert AFTER INSERT ON bugs_bugreport
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION bugs_tag_counts_insert();
+    CREATE TRIGGER bugs_tag_counts_update AFTER UPDATE ON bugs_bugreport
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION bugs_tag_counts_update();
+    CREATE TRIGGER bugs_tag_counts_delete AFTER DELETE ON bugs_bugreport
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION bugs_tag_counts_delete();
+""".format(
+    inserted=APPLY_CHANGES.format(function='bugs_tag_counts_insert', changes=INSERTED, cleanup=''),
+    updated=APPLY_CHANGES.format(
+        function='bugs_tag_counts_update', changes=UPDATED, cleanup=REMOVE_UNUSED
+    ),
+    deleted=APPLY_CHANGES.format(
+        function='bugs_tag_counts_delete', changes=DELETED, cleanup=REMOVE_UNUSED
+    ),
+)
+
+DROP_TRIGGERS = """
+    DROP TRIGGER bugs_tag_counts_insert ON bugs_bugreport;
+    DROP TRIGGER bugs_tag_counts_update ON bugs_bugreport;
+    DROP TRIGGER bugs_tag_counts_delete ON bugs_bugreport;
+    DROP FUNCTION bugs_tag_counts_insert();
+    DROP FUNCTION bugs_tag_counts_update();
+    DROP FUNCTION bugs_tag_counts_delete();
+"""
+
+BACKFILL = """
+    INSERT INTO bugs_tag (owner_id, name, bug_count)
+    SELECT owner_id, tag, count(*)
+    FROM (SELECT DISTINCT id, created_by_id AS owner_id, tag FROM bugs_bugreport, unnest(tags) AS tag) AS tags
+    GROUP BY owner_id, tag
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bugs', '0008_saved_queries'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('bug_count', models.PositiveIntegerField(default=0)),
+                ('owner', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='tags', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-bug_count', 'name'],
+                'indexes': [models.Index(fields=['owner', 'name'], name='bugs_tag_owner_prefix_idx', opclasses=['int4_ops', 'varchar_pattern_ops'])],
+                'constraints': [models.UniqueConstraint(fields=('owner', 'name'), name='bugs_tag_owner_name_unique')],
+            },
+        ),
+        # Lock out writers so no bug report changes between the backfill and the triggers.
+        migrations.RunSQL('LOCK TABLE bugs_bugreport IN SHARE ROW EXCLUSIVE MODE', migrations.RunSQL.noop),
+        migrations.RunSQL(BACKFILL, migrations.RunSQL.noop),
+        migrations.RunSQL(TRIGGERS, DROP_TRIGGERS),
+    ]
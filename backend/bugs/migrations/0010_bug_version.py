@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:20
+
+from django.db import migrations, models
+
+# Every UPDATE raises the version, whatever issued it (the API, the admin,
+# QuerySet.update, scripts), so a version is never reused for different
+# contents. The API's compare-and-set matches on the old version and knows
+# the new one is one higher without reading it back.
+BUMP_VERSION = """
+    CREATE FUNCTION bugs_bugreport_bump_version() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.version := OLD.version + 1;
+        RETURN NEW;
+    END
+    $$;
+    CREATE TRIGGER bugs_bugreport_version BEFORE UPDATE ON bugs_bugreport
+        FOR EACH ROW EXECUTE FUNCTION bugs_bugreport_bump_version();
+"""
+DROP_BUMP_VERSION = """
+    DROP TRIGGER bugs_bugreport_version ON bugs_bugreport;
+    DROP FUNCTION bugs_bugreport_bump_version();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bugs', '0009_tag_catalog'),
+    ]
+
+    operations = [
+        # A constant default without a CHECK constraint is added without
+        # rewriting or scanning the table.
+        migrations.AddField(
+            model_name='bugreport',
+            name='version',
+            field=models.IntegerField(db_default=1, editable=False, help_text='Raised by the database on every update; the API serves it as the ETag'),
+        ),
+        migrations.RunSQL(BUMP_VERSION, DROP_BUMP_VERSION),
+    ]
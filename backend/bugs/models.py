@@ -2,7 +2,11 @@ import uuid
 
 from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
 from django.db import models
+from django.db.models.functions import Left
+from django.utils import timezone
 
 
 class Severity(models.TextChoices):
@@ -19,6 +23,100 @@ class Status(models.TextChoices):
     CLOSED = 'closed', 'Closed'
 
 
+class Team(models.Model):
+    """A group of users; every member can see the team's projects."""
+
+    name = models.CharField(max_length=100, unique=True)
+    members = models.ManyToManyField(
+        settings.AUTH_USER_MODEL,
+        through='TeamMembership',
+        related_name='teams'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class TeamMembership(models.Model):
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='memberships')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='team_memberships'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'team'], name='bugs_teammembership_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} in {self.team}"
+
+
+class Project(models.Model):
+    """
+    A shared space for bug reports.
+
+    Bugs filed under a project are visible to its direct members and to the
+    members of the team that owns it.
+    """
+
+    name = models.CharField(max_length=100)
+    team = models.ForeignKey(
+        Team,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='projects'
+    )
+    members = models.ManyToManyField(
+        settings.AUTH_USER_MODEL,
+        through='ProjectMembership',
+        related_name='projects'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class ProjectMembership(models.Model):
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='memberships')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='project_memberships'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'project'], name='bugs_projectmembership_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} in {self.project}"
+
+
+# Descriptions are searched up to this length, so pasted logs cannot push a
+# document past PostgreSQL's tsvector size limit.
+SEARCH_DESCRIPTION_CHARS = 10_000
+
+
+def search_document():
+    """The text search document of a bug report; BugReport.Meta indexes the same expression."""
+    return SearchVector('title', Left('description', SEARCH_DESCRIPTION_CHARS), config='simple')
+
+
 class BugReport(models.Model):
     """Model representing a bug report."""
     
@@ -79,13 +177,264 @@ class BugReport(models.Model):
         related_name='bug_reports',
         help_text="User who created this bug report"
     )
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='bug_reports',
+        help_text="Project whose members can also see this bug report"
+    )
+    assignees = models.ManyToManyField(
+        settings.AUTH_USER_MODEL,
+        blank=True,
+        related_name='assigned_bugs',
+        help_text="Users working on this bug report"
+    )
+    watchers = models.ManyToManyField(
+        settings.AUTH_USER_MODEL,
+        blank=True,
+        related_name='watched_bugs',
+        help_text="Users following this bug report"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    version = models.IntegerField(
+        db_default=1,
+        editable=False,
+        help_text="Raised by the database on every update; the API serves it as the ETag"
+    )
 
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Bug Report'
         verbose_name_plural = 'Bug Reports'
+        indexes = [
+            # Serve "my bugs" and "bugs in my projects", newest first, from the index.
+            models.Index(fields=['created_by', '-created_at'], name='bugs_bug_owner_created_idx'),
+            models.Index(fields=['project', '-created_at'], name='bugs_bug_project_created_idx'),
+            # The admin changelist: newest first, date drill-down and search.
+            models.Index(fields=['-created_at', '-id'], name='bugs_bug_created_idx'),
+            GinIndex(search_document(), name='bugs_bug_search_idx'),
+            GinIndex(fields=['tags'], name='bugs_bug_tags_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.get_severity_display()} - {self.get_status_display()})"
+
+
+class Tag(models.Model):
+    """
+    A tag used in one user's bug reports, with how many of them carry it.
+
+    ``BugReport.tags`` stays the source of truth. Statement-level triggers on
+    ``bugs_bugreport`` (see migration 0009) keep the counts in step with every
+    insert, update and delete, bulk writes and ``COPY`` included, and remove
+    tags that no bug report uses any more.
+    """
+
+    # Lookups by owner use the unique (owner, name) index.
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='tags',
+        db_index=False
+    )
+    name = models.CharField(max_length=50)
+    bug_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-bug_count', 'name']
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'name'], name='bugs_tag_owner_name_unique'),
+        ]
+        indexes = [
+            # Autocomplete: name LIKE 'prefix%' within one owner's tags.
+            models.Index(
+                fields=['owner', 'name'],
+                opclasses=['int4_ops', 'varchar_pattern_ops'],
+                name='bugs_tag_owner_prefix_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class Comment(models.Model):
+    """A comment on a bug report."""
+
+    bug = models.ForeignKey(BugReport, on_delete=models.CASCADE, related_name='comments')
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='bug_comments'
+    )
+    body = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            # Keyset pagination walks this index from the cursor position.
+            models.Index(fields=['bug', 'created_at', 'id'], name='bugs_comment_bug_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Comment by {self.author} on {self.bug_id}"
+
+
+class Blob(models.Model):
+    """
+    File content stored once per SHA-256 digest.
+
+    Attachments with identical content share a blob; blobs no attachment
+    refers to are removed by the ``bugs.purge_orphan_blobs`` task.
+    """
+
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    size = models.BigIntegerField()
+    file = models.FileField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256} ({self.size} bytes)"
+
+
+class Attachment(models.Model):
+    """A file (log, screenshot, ...) attached to a bug report."""
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    bug = models.ForeignKey(BugReport, on_delete=models.CASCADE, related_name='attachments')
+    blob = models.ForeignKey(Blob, on_delete=models.PROTECT, related_name='attachments')
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, default='application/octet-stream')
+    uploaded_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='bug_attachments'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['bug', 'created_at'], name='bugs_attach_bug_created_idx'),
+        ]
+
+    def __str__(self):
+        return self.filename
+
+
+class SavedQuery(models.Model):
+    """
+    A bug report list query a user runs often, with its results kept ready.
+
+    ``params`` holds ``/api/bugs/`` query parameters (filters, ``search`` and
+    ``ordering``). The matching bug ids are stored in ``SavedQueryResult`` and
+    refreshed by the ``bugs.refresh_saved_queries`` task.
+    """
+
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='saved_queries'
+    )
+    name = models.CharField(max_length=100)
+    params = models.JSONField(default=dict, blank=True)
+    result_count = models.PositiveIntegerField(default=0)
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+    refresh_requested_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+        verbose_name_plural = 'saved queries'
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'name'], name='bugs_savedquery_owner_name_unique'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class SavedQueryResult(models.Model):
+    """One bug report in a saved query's results, at its place in the query's order."""
+
+    saved_query = models.ForeignKey(SavedQuery, on_delete=models.CASCADE, related_name='results')
+    position = models.PositiveIntegerField()
+    bug = models.ForeignKey(BugReport, on_delete=models.CASCADE, related_name='saved_query_results')
+
+    class Meta:
+        ordering = ['saved_query', 'position']
+        constraints = [
+            # Also the index results are read from, in order.
+            models.UniqueConstraint(
+                fields=['saved_query', 'position'], name='bugs_savedresult_query_position_unique'
+            ),
+        ]
+
+
+class TaskStatus(models.TextChoices):
+    PENDING = 'pending', 'Pending'
+    FAILED = 'failed', 'Failed'
+
+
+class Task(models.Model):
+    """
+    A unit of deferred work for the background worker.
+
+    Pending rows are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED``,
+    which leases them by pushing ``run_after`` out, and deleted once they
+    succeed; rows that run out of attempts are kept as ``failed`` for
+    inspection.
+    """
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=TaskStatus.choices,
+        default=TaskStatus.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['run_after']
+        indexes = [
+            models.Index(
+                fields=['run_after'],
+                condition=models.Q(status='pending'),
+                name='bugs_task_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()}, attempt {self.attempts})"
+
+
+class ThrottleBucket(models.Model):
+    """
+    Token bucket state shared by every API process.
+
+    Buckets are updated with a single atomic upsert per request (see
+    ``bugs.throttling``). The table is unlogged: losing it in a crash only
+    resets rate limits.
+    """
+
+    key = models.CharField(max_length=255, primary_key=True)
+    tokens = models.FloatField()
+    allowed = models.BooleanField(default=True)
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.key}: {self.tokens:.1f} tokens"
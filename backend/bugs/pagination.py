@@ -0,0 +1,218 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, InvalidPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+
+class CreatedCursorPagination(CursorPagination):
+    """
+    Keyset pagination in creation order.
+
+    Each page continues from the last row's ``created_at`` instead of an
+    OFFSET, so deep pages cost the same as the first and rows added while a
+    client pages through are neither skipped nor repeated.
+    """
+    ordering = ('created_at', 'id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+def table_estimate(model, using='default'):
+    """The planner's row count for ``model``'s table, or None if it was never analysed."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    # reltuples is -1 until the first VACUUM or ANALYZE.
+    return int(row[0]) if row and row[0] >= 0 else None
+
+
+def planner_estimate(queryset):
+    """The planner's row estimate for ``queryset``, from EXPLAIN."""
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def row_estimate(queryset):
+    """
+    The table's ``pg_class`` row count if ``queryset`` is unfiltered, else the planner's estimate.
+
+    None for an unfiltered queryset on a table that was never analysed.
+    """
+    query = queryset.query
+    if not query.where and not query.distinct:
+        return table_estimate(queryset.model, queryset.db)
+    return planner_estimate(queryset)
+
+
+def capped_count(queryset, limit):
+    """Count the rows of ``queryset``, stopping after ``limit + 1``."""
+    counted = queryset.order_by()
+    if not queryset.query.distinct:
+        counted = counted.values('pk')
+    return counted[:limit + 1].count()
+
+
+def estimated_count(queryset, exact_limit):
+    """
+    The row count of ``queryset``, estimated first and counted only when small.
+
+    Rows are counted, at most ``exact_limit + 1`` of them, only when the
+    estimate is within ``exact_limit``, in case the planner was wrong. This
+    suits full-text search, whose index scans cannot stop early. Returns the
+    count and whether it is exact.
+    """
+    estimate = row_estimate(queryset)
+    if estimate is not None and estimate > exact_limit:
+        return estimate, False
+    count = capped_count(queryset, exact_limit)
+    if count <= exact_limit:
+        return count, True
+    return max(count, estimate or 0), False
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    A Django paginator that does not count large tables row by row.
+
+    Counts up to ``exact_count_limit`` are exact; above that the page count is
+    an estimate, so the last page may be short or empty.
+    """
+    exact_count_limit = 10_000
+
+    @cached_property
+    def count(self):
+        count, _ = estimated_count(self.object_list, self.exact_count_limit)
+        return count
+
+
+def count_cache_key(queryset):
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.sha256(repr((queryset.db, sql, params)).encode()).hexdigest()
+    return f'pagination:count:{digest}'
+
+
+class ProbedPage(Page):
+    def has_next(self):
+        return self.paginator.has_more
+
+
+class ApproximateCountPaginator(Paginator):
+    """
+    A paginator that finds the next page by reading one row past the current one.
+
+    Pages do not depend on the count, so the count is only worked out when
+    asked for. Up to ``APPROXIMATE_COUNT_THRESHOLD`` rows are counted; past
+    that the count is the planner's estimate, cached for
+    ``APPROXIMATE_COUNT_CACHE_SECONDS`` so that paging through the same
+    results neither counts nor estimates again.
+    """
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages['no_results'])
+        self.has_more = len(rows) > self.per_page
+        return ProbedPage(rows[:self.per_page], number, self)
+
+    @cached_property
+    def counted(self):
+        """The count and whether it is exact."""
+        if self.object_list.query.is_empty():
+            # Filters that can match nothing leave a query with no SQL to key on.
+            return 0, True
+        key = count_cache_key(self.object_list)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached, False
+        threshold = settings.APPROXIMATE_COUNT_THRESHOLD
+        count = capped_count(self.object_list, threshold)
+        if count <= threshold:
+            return count, True
+        count = max(count, row_estimate(self.object_list) or 0)
+        cache.set(key, count, settings.APPROXIMATE_COUNT_CACHE_SECONDS)
+        return count, False
+
+    @property
+    def count(self):
+        return self.counted[0]
+
+
+class ApproximateCountPagination(PageNumberPagination):
+    """
+    Page numbers with a count that stays cheap for large results.
+
+    The response carries ``approximate: true`` when ``count`` is an estimate.
+    ``?count=false`` leaves out the count altogether; ``next`` and
+    ``previous`` work either way. ``?page=last`` is not supported, as the
+    last page is not known exactly.
+    """
+    django_paginator_class = ApproximateCountPaginator
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        self.request = request
+        self.include_count = request.query_params.get(self.count_query_param, '').lower() not in (
+            'false', '0', 'no',
+        )
+        paginator = self.django_paginator_class(queryset, page_size)
+        page_number = request.query_params.get(self.page_query_param) or 1
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            message = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(message)
+        self.display_page_controls = self.template is not None and (
+            self.page.has_next() or self.page.has_previous()
+        )
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        body = {}
+        if self.include_count:
+            count, exact = self.page.paginator.counted
+            body.update(count=count, approximate=not exact)
+        body.update(next=self.get_next_link(), previous=self.get_previous_link(), results=data)
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['required'].remove('count')
+        response_schema['properties']['approximate'] = {
+            'type': 'boolean',
+            'description': 'Whether `count` is an estimate. Left out with `count=false`.',
+        }
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        return [*super().get_schema_operation_parameters(view), {
+            'name': self.count_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Set to false to leave out the count.',
+            'schema': {'type': 'boolean'},
+        }]
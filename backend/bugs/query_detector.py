@@ -0,0 +1,114 @@
+"""
+Detection of N+1 query patterns and slow queries.
+
+``QueryDetectorMiddleware`` installs a ``QueryDetector`` as a
+``connection.execute_wrapper`` for each request. The detector groups queries
+by shape (the SQL text with its placeholders, so the same query with
+different parameters counts as one shape) and reports a shape that repeats
+more than ``QUERY_DETECTOR_REPEAT_THRESHOLD`` times, as well as queries
+slower than ``QUERY_DETECTOR_SLOW_MS``. A sample of slow ``SELECT``s is run
+through ``EXPLAIN`` and the plan is logged.
+
+Problems are logged by default. With ``QUERY_DETECTOR_RAISE`` on, as in the
+test suite, the request fails with ``QueryBudgetExceeded`` instead.
+"""
+
+import logging
+import random
+import re
+import time
+from collections import Counter
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+_PLACEHOLDER_LIST = re.compile(r'\((?:%s, )+%s\)')
+
+
+@lru_cache(maxsize=1024)
+def query_shape(sql):
+    """Normalise SQL so queries differing only in parameters compare equal."""
+    return _PLACEHOLDER_LIST.sub('(...)', _WHITESPACE.sub(' ', sql).strip())
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode when a request breaks its query budget."""
+
+
+class QueryDetector:
+    """Per-request ``execute_wrapper`` that collects query budget problems."""
+
+    def __init__(self, repeat_threshold, slow_ms, explain_rate=0.0, max_queries=None):
+        self.repeat_threshold = repeat_threshold
+        self.slow_ms = slow_ms
+        self.explain_rate = explain_rate
+        self.max_queries = max_queries
+        self.shapes = Counter()
+        self.problems = []
+        self._explaining = False
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            repeat_threshold=settings.QUERY_DETECTOR_REPEAT_THRESHOLD,
+            slow_ms=settings.QUERY_DETECTOR_SLOW_MS,
+            explain_rate=settings.QUERY_DETECTOR_EXPLAIN_RATE,
+            max_queries=settings.QUERY_DETECTOR_MAX_QUERIES,
+        )
+
+    @property
+    def query_count(self):
+        return sum(self.shapes.values())
+
+    def __call__(self, execute, sql, params, many, context):
+        if self._explaining:
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        shape = query_shape(sql)
+        self.shapes[shape] += 1
+        if self.shapes[shape] == self.repeat_threshold + 1:
+            self.problems.append(
+                f'Possible N+1: query repeated more than {self.repeat_threshold} times: {shape}'
+            )
+        if elapsed_ms >= self.slow_ms:
+            self.problems.append(f'Slow query ({elapsed_ms:.1f} ms): {shape}')
+            if (
+                not many
+                and shape.upper().startswith('SELECT')
+                and random.random() < self.explain_rate
+            ):
+                self.explain(context['connection'], sql, params)
+        return result
+
+    def explain(self, connection, sql, params):
+        """Log the planner's plan for a query without executing it again."""
+        self._explaining = True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN {sql}', params)
+                plan = '\n'.join(row[0] for row in cursor.fetchall())
+            logger.warning('Plan for slow query %s\n%s', query_shape(sql), plan)
+        except DatabaseError:
+            logger.exception('Could not explain slow query.')
+        finally:
+            self._explaining = False
+
+    def check(self, label):
+        """Log the collected problems, raising in strict mode."""
+        problems = list(self.problems)
+        if self.max_queries is not None and self.query_count > self.max_queries:
+            problems.append(
+                f'{self.query_count} queries exceed the budget of {self.max_queries}'
+            )
+        for problem in problems:
+            logger.warning('%s: %s', label, problem)
+        if problems and settings.QUERY_DETECTOR_RAISE:
+            raise QueryBudgetExceeded(f'{label}: ' + '; '.join(problems))
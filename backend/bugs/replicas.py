@@ -0,0 +1,153 @@
+"""
+Routing of safe reads to read replicas.
+
+Replicas are database aliases listed in ``READ_REPLICAS``. Nothing is sent
+to them implicitly: views that opt in with ``ReplicaReadMixin`` route the
+reads of their safe actions (``list``, ``retrieve`` and the like) to a
+replica for the rest of the request, and everything else, including all
+writes, authentication and throttling, stays on the primary.
+
+Two rules keep replica reads from looking stale:
+
+* Read-your-writes: after a successful write, a user's reads go to the
+  primary for ``REPLICA_STICKY_SECONDS``. The marker is kept in the default
+  cache, so several processes need a shared cache backend to honour it.
+* Lag: each process checks a replica's replay lag at most every
+  ``REPLICA_LAG_CHECK_INTERVAL`` seconds and skips it while the lag exceeds
+  ``REPLICA_MAX_LAG_SECONDS`` or it cannot be reached. With no healthy
+  replica, reads fall back to the primary.
+"""
+
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+# Kept local so the router does not import DRF into worker processes.
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# The alias safe reads go to for the current request, if any.
+read_alias = ContextVar('read_alias', default=None)
+
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+
+class ReplicaRouter:
+    """Send reads to the replica chosen for the request, and everything else to the primary."""
+
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the primary's data, so objects from either may be related.
+        databases = {'default', *settings.READ_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+def replica_lag(alias):
+    """Replay lag of ``alias`` in seconds; None if unknown (e.g. nothing replayed yet)."""
+    with connections[alias].cursor() as cursor:
+        cursor.execute(LAG_SQL)
+        lag = cursor.fetchone()[0]
+    return None if lag is None else float(lag)
+
+
+_health = {}
+_health_lock = threading.Lock()
+
+
+def is_healthy(alias):
+    """Whether ``alias`` is reachable and within the lag limit, checked at most once per interval."""
+    now = time.monotonic()
+    checked_at, healthy = _health.get(alias, (None, False))
+    if checked_at is not None and now - checked_at < settings.REPLICA_LAG_CHECK_INTERVAL:
+        return healthy
+    try:
+        lag = replica_lag(alias)
+    except DatabaseError:
+        logger.warning('Read replica %s is unreachable; reading from the primary.', alias)
+        lag = None
+    healthy = lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS
+    if lag is not None and not healthy:
+        logger.warning('Read replica %s is %.1fs behind; reading from the primary.', alias, lag)
+    with _health_lock:
+        _health[alias] = (now, healthy)
+    return healthy
+
+
+def reset_health():
+    """Forget the cached health checks."""
+    with _health_lock:
+        _health.clear()
+
+
+def choose_replica():
+    """A random healthy replica, or None to read from the primary."""
+    replicas = [alias for alias in settings.READ_REPLICAS if is_healthy(alias)]
+    return random.choice(replicas) if replicas else None
+
+
+def sticky_key(user_id):
+    return f'replicas:sticky:{user_id}'
+
+
+def pin_to_primary(user):
+    """Send ``user``'s reads to the primary while replicas catch up with their write."""
+    if settings.READ_REPLICAS and user.is_authenticated:
+        cache.set(sticky_key(user.pk), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def is_pinned(user):
+    return user.is_authenticated and cache.get(sticky_key(user.pk)) is not None
+
+
+class ReplicaReadMixin:
+    """
+    Read from a replica during the view's safe actions.
+
+    The replica is chosen after authentication, permission and throttle
+    checks, which stay on the primary. Successful writes pin the user to
+    the primary.
+    """
+
+    replica_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            settings.READ_REPLICAS
+            and request.method in SAFE_METHODS
+            and self.action in self.replica_actions
+            and not is_pinned(request.user)
+        ):
+            self._read_alias_token = read_alias.set(choose_replica())
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_read_alias_token', None)
+        if token is not None:
+            read_alias.reset(token)
+            self._read_alias_token = None
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
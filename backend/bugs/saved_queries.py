@@ -0,0 +1,97 @@
+"""
+Saved bug report queries, served from stored results.
+
+A saved query keeps a set of ``/api/bugs/`` parameters (filters, ``search``
+and ``ordering``). Running them can mean scanning much of the table, so the
+first ``SAVED_QUERY_MAX_RESULTS`` matches are stored in order as
+``SavedQueryResult`` rows, and ``/api/bugs/saved/{id}/`` reads those through
+their index instead of running the query.
+
+Results are computed when a query is saved. After that, a read that finds
+them older than ``SAVED_QUERY_REFRESH_SECONDS`` queues one
+``bugs.refresh_saved_queries`` task and is answered from the stored results,
+so queries nobody reads are never refreshed.
+"""
+
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import SavedQuery, SavedQueryResult
+from .tasks import task
+
+
+def search_terms(value):
+    """Split ``?search=`` into terms, on whitespace and commas like DRF's ``SearchFilter``."""
+    return [term for term in re.split(r'[\s,]+', value.replace('\x00', '')) if term]
+
+
+def matching_bugs(saved_query):
+    """The bug reports the saved query matches for its owner, in its order."""
+    # Imported here: worker processes load this module for the task, not django-filter.
+    from .filters import DEFAULT_ORDERING, SEARCH_FIELDS, BugReportFilter
+    from .permissions import bugs_visible_to, project_ids_for
+
+    owner = saved_query.owner
+    params = saved_query.params
+    filterset = BugReportFilter(data=params, queryset=bugs_visible_to(owner, project_ids_for(owner)))
+    if not filterset.is_valid():
+        raise ValueError(f'Saved query {saved_query.pk} has invalid filters: {filterset.errors}')
+    queryset = filterset.qs
+    for term in search_terms(params.get('search', '')):
+        condition = Q()
+        for field in SEARCH_FIELDS:
+            condition |= Q(**{f'{field}__icontains': term})
+        queryset = queryset.filter(condition)
+    ordering = params.get('ordering') or DEFAULT_ORDERING
+    return queryset.order_by(*ordering.split(','), 'pk')
+
+
+def refresh(saved_query):
+    """Recompute and store the saved query's results."""
+    with transaction.atomic():
+        # Serialise refreshes of one query so their results do not interleave.
+        SavedQuery.objects.select_for_update().filter(pk=saved_query.pk).exists()
+        bug_ids = list(
+            matching_bugs(saved_query).values_list('pk', flat=True)[:settings.SAVED_QUERY_MAX_RESULTS]
+        )
+        SavedQueryResult.objects.filter(saved_query=saved_query).delete()
+        SavedQueryResult.objects.bulk_create(
+            SavedQueryResult(saved_query=saved_query, position=position, bug_id=bug_id)
+            for position, bug_id in enumerate(bug_ids)
+        )
+        saved_query.result_count = len(bug_ids)
+        saved_query.refreshed_at = timezone.now()
+        saved_query.refresh_requested_at = None
+        saved_query.save(update_fields=['result_count', 'refreshed_at', 'refresh_requested_at'])
+
+
+@task('bugs.refresh_saved_queries', batch=True)
+def refresh_saved_queries(payloads):
+    ids = {payload['id'] for payload in payloads}
+    for saved_query in SavedQuery.objects.filter(pk__in=ids).select_related('owner'):
+        refresh(saved_query)
+
+
+def refresh_if_stale(saved_query):
+    """
+    Queue a refresh if the results are older than ``SAVED_QUERY_REFRESH_SECONDS``.
+
+    The conditional update lets one request queue it; a request that is
+    itself older than the interval is taken to have failed, and is repeated.
+    Returns whether a refresh was queued.
+    """
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=settings.SAVED_QUERY_REFRESH_SECONDS)
+    if saved_query.refreshed_at and saved_query.refreshed_at >= stale_before:
+        return False
+    queued = SavedQuery.objects.filter(pk=saved_query.pk).filter(
+        Q(refresh_requested_at__isnull=True) | Q(refresh_requested_at__lt=stale_before)
+    ).update(refresh_requested_at=now)
+    if queued:
+        refresh_saved_queries.enqueue({'id': saved_query.pk})
+    return bool(queued)
@@ -0,0 +1,162 @@
+"""
+The OpenAPI schema, generated once and served from memory.
+
+Generating the schema introspects every view and serializer. ``manage.py
+build_schema`` does that at build time and writes a versioned JSON file;
+with ``OPENAPI_SCHEMA_FILE`` pointing at it, processes load the file at
+startup instead. Without the file the schema is generated on the first
+request. Either way each process renders the YAML and JSON bodies once and
+keeps them in memory with their ETags and precompressed variants, so
+``/api/schema/`` never touches a view, a serializer or the database.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import condition, require_safe
+
+from .compression import precompress
+
+logger = logging.getLogger(__name__)
+
+# Media types accepted by /api/schema/, most preferred first; YAML is the
+# default, as it was with drf-spectacular's view.
+MEDIA_TYPES = {
+    'application/vnd.oai.openapi': 'yaml',
+    'application/yaml': 'yaml',
+    'application/vnd.oai.openapi+json': 'json',
+    'application/json': 'json',
+}
+CONTENT_TYPES = {
+    'yaml': 'application/vnd.oai.openapi',
+    'json': 'application/vnd.oai.openapi+json',
+}
+
+
+def schema_version():
+    return settings.SPECTACULAR_SETTINGS['VERSION']
+
+
+def default_artefact_path():
+    return settings.BASE_DIR / 'build' / f'openapi-{schema_version()}.json'
+
+
+def generate_schema():
+    """Introspect the API; this is the expensive step."""
+    from drf_spectacular.settings import spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    return generator.get_schema(request=None, public=True)
+
+
+def render_schema(schema, fmt):
+    from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+
+    renderer = OpenApiJsonRenderer() if fmt == 'json' else OpenApiYamlRenderer()
+    return renderer.render(schema, renderer_context={})
+
+
+def write_artefact(path):
+    """Generate the schema and write it to ``path`` as JSON; returns the schema."""
+    schema = generate_schema()
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(render_schema(schema, 'json'))
+    return schema
+
+
+def read_artefact(path):
+    """The schema in ``path``, or None if it is missing or built for another API version."""
+    try:
+        schema = json.loads(Path(path).read_bytes())
+    except FileNotFoundError:
+        logger.warning('OpenAPI schema file %s not found; generating the schema.', path)
+        return None
+    version = schema.get('info', {}).get('version')
+    if version != schema_version():
+        logger.warning(
+            'OpenAPI schema file %s is for version %s, not %s; generating the schema.',
+            path, version, schema_version(),
+        )
+        return None
+    return schema
+
+
+class SchemaDocument:
+    """The rendered schema bodies and their ETags, one per format."""
+
+    def __init__(self, schema):
+        self.bodies = {fmt: render_schema(schema, fmt) for fmt in CONTENT_TYPES}
+        self.etags = {
+            fmt: f'"{hashlib.sha256(body).hexdigest()[:32]}"' for fmt, body in self.bodies.items()
+        }
+        self._precompressed = {}
+
+    def precompressed(self, fmt):
+        """Compressed variants of a body, built on first use at the highest levels."""
+        if fmt not in self._precompressed:
+            self._precompressed[fmt] = precompress(self.bodies[fmt])
+        return self._precompressed[fmt]
+
+
+_document = None
+_document_lock = threading.Lock()
+
+
+def get_document():
+    global _document
+    if _document is None:
+        with _document_lock:
+            if _document is None:
+                schema = None
+                if settings.OPENAPI_SCHEMA_FILE:
+                    schema = read_artefact(settings.OPENAPI_SCHEMA_FILE)
+                _document = SchemaDocument(schema or generate_schema())
+    return _document
+
+
+def reset_document():
+    """Forget the loaded schema; the next request loads it again."""
+    global _document
+    _document = None
+
+
+def preload_schema():
+    """Load the schema and compress every variant before workers fork."""
+    document = get_document()
+    for fmt in CONTENT_TYPES:
+        document.precompressed(fmt)
+
+
+def requested_format(request):
+    fmt = request.GET.get('format')
+    if fmt in CONTENT_TYPES:
+        return fmt
+    return MEDIA_TYPES.get(request.get_preferred_type(list(MEDIA_TYPES)))
+
+
+def schema_etag(request):
+    fmt = requested_format(request)
+    return get_document().etags[fmt] if fmt else None
+
+
+@require_safe
+@condition(etag_func=schema_etag)
+def schema_view(request):
+    """OpenAPI schema as YAML or JSON, by ``?format=`` or the Accept header."""
+    fmt = requested_format(request)
+    if fmt is None:
+        return HttpResponse(status=406)
+    document = get_document()
+    response = HttpResponse(document.bodies[fmt], content_type=CONTENT_TYPES[fmt])
+    title = settings.SPECTACULAR_SETTINGS['TITLE']
+    response['Content-Disposition'] = f'inline; filename="{title} ({schema_version()}).{fmt}"'
+    # Clients keep the schema and revalidate it with If-None-Match.
+    response['Cache-Control'] = 'no-cache'
+    response.precompressed = document.precompressed(fmt)
+    return response
@@ -1,8 +1,18 @@
+from contextlib import nullcontext
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from django.conf import settings
+from django.db import models, transaction
+from django.urls import reverse
+from django.utils import timezone
 from rest_framework import serializers
 
-from .models import BugReport, Severity, Status
+from .filters import ORDERING_FIELDS, BugReportFilter
+from .metrics import TimedRepresentationMixin
+from .models import Attachment, BugReport, Comment, Project, SavedQuery, Status, Tag
+from .permissions import project_member_ids, visible_project_ids
+from .validation import BugReportValidationMixin
 
 User = get_user_model()
 
@@ -55,10 +65,58 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class BugReportSerializer(serializers.ModelSerializer):
+class ProjectSerializer(serializers.ModelSerializer):
+    """Serializer for projects the user can see."""
+
+    class Meta:
+        model = Project
+        fields = ['id', 'name', 'team', 'created_at']
+        read_only_fields = fields
+
+
+def wants_native_values(context):
+    """Whether the negotiated renderer encodes UUIDs and datetimes itself."""
+    renderer = getattr(context.get('request'), 'accepted_renderer', None)
+    return getattr(renderer, 'native_values', False)
+
+
+class NativeDateTimeField(serializers.DateTimeField):
+    def to_representation(self, value):
+        if value and wants_native_values(self.context):
+            return self.enforce_timezone(value)
+        return super().to_representation(value)
+
+
+class NativeUUIDField(serializers.UUIDField):
+    def to_representation(self, value):
+        if wants_native_values(self.context):
+            return value
+        return super().to_representation(value)
+
+
+class NativeValuesMixin:
+    """
+    Leave UUIDs and datetimes unformatted for renderers that encode them
+    natively (MessagePack); other renderers still get strings.
+    """
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.DateTimeField: NativeDateTimeField,
+        models.UUIDField: NativeUUIDField,
+    }
+
+
+class BugReportSerializer(
+    BugReportValidationMixin,
+    NativeValuesMixin,
+    TimedRepresentationMixin,
+    serializers.ModelSerializer
+):
     """Serializer for BugReport model."""
     
     created_by = UserSerializer(read_only=True)
+    assignees = UserSerializer(many=True, read_only=True)
+    watchers = UserSerializer(many=True, read_only=True)
     severity_display = serializers.CharField(
         source='get_severity_display',
         read_only=True
@@ -83,65 +141,124 @@ class BugReportSerializer(serializers.ModelSerializer):
             'status_display',
             'environment',
             'tags',
+            'project',
+            'assignees',
+            'watchers',
             'created_by',
             'created_at',
             'updated_at',
+            'version',
         ]
-        read_only_fields = ['id', 'created_by', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_by', 'created_at', 'updated_at', 'version']
 
-    def validate_title(self, value):
-        if len(value) < 5:
-            raise serializers.ValidationError(
-                "Title must be at least 5 characters long."
-            )
-        if len(value) > 255:
-            raise serializers.ValidationError(
-                "Title must not exceed 255 characters."
-            )
-        return value
 
-    def validate_description(self, value):
-        if len(value) < 10:
-            raise serializers.ValidationError(
-                "Description must be at least 10 characters long."
-            )
-        return value
+class BugBatchSerializer(serializers.Serializer):
+    """Validates the ids of a batch retrieve."""
 
-    def validate_severity(self, value):
-        valid_choices = [choice[0] for choice in Severity.choices]
-        if value not in valid_choices:
-            raise serializers.ValidationError(
-                f"Invalid severity. Choose from: {', '.join(valid_choices)}"
-            )
-        return value
+    ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False)
+
+    def validate_ids(self, value):
+        limit = settings.BUG_BATCH_MAX_IDS
+        if len(value) > limit:
+            raise serializers.ValidationError(f"Request at most {limit} ids at a time.")
+        # Drop repeats but keep the requested order.
+        return list(dict.fromkeys(value))
 
-    def validate_status(self, value):
-        valid_choices = [choice[0] for choice in Status.choices]
-        if value not in valid_choices:
+
+class BugTransitionSerializer(serializers.Serializer):
+    """Validates a bulk status change: the target status and either ids or filters."""
+
+    status = serializers.ChoiceField(choices=Status.choices)
+    ids = serializers.ListField(child=serializers.UUIDField(), required=False, allow_empty=False)
+    filters = serializers.JSONField(required=False)
+
+    def validate_ids(self, value):
+        limit = settings.BUG_TRANSITION_MAX_IDS
+        if len(value) > limit:
             raise serializers.ValidationError(
-                f"Invalid status. Choose from: {', '.join(valid_choices)}"
+                f"Send at most {limit} ids at a time, or select the bug reports with filters."
             )
-        return value
+        return list(dict.fromkeys(value))
+
+    def validate_filters(self, value):
+        params = clean_query_params(value, set(BugReportFilter.base_filters), self.context['request'].user)
+        if not params:
+            raise serializers.ValidationError("Give at least one filter.")
+        return params
+
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filters' in attrs):
+            raise serializers.ValidationError("Send either ids or filters.")
+        return attrs
+
+
+class TagSerializer(serializers.ModelSerializer):
+    """A tag and how many of the user's bug reports carry it."""
+
+    class Meta:
+        model = Tag
+        fields = ['name', 'bug_count']
+        read_only_fields = fields
+
+
+def clean_query_params(value, allowed, user):
+    """
+    Check an object of ``/api/bugs/`` query parameters: known names and string
+    values only. Empty values are dropped and ``me`` becomes ``user``'s id.
+    """
+    if not isinstance(value, dict):
+        raise serializers.ValidationError("Expected an object of query parameters.")
+    unknown = sorted(set(value) - allowed)
+    if unknown:
+        raise serializers.ValidationError(f"Unknown parameters: {', '.join(unknown)}.")
+    if not all(isinstance(param, str) for param in value.values()):
+        raise serializers.ValidationError("Parameter values must be strings.")
+    params = {name: param for name, param in value.items() if param}
+    for name in ('assignee', 'watched_by'):
+        if params.get(name) == 'me':
+            params[name] = str(user.pk)
+    filterset = BugReportFilter(data=params, queryset=BugReport.objects.none())
+    if not filterset.is_valid():
+        raise serializers.ValidationError(filterset.errors)
+    return params
 
-    def validate_tags(self, value):
-        if value:
-            # Ensure all tags are strings and not too long
-            cleaned_tags = []
-            for tag in value:
-                if not isinstance(tag, str):
-                    raise serializers.ValidationError("All tags must be strings.")
-                tag = tag.strip().lower()
-                if len(tag) > 50:
-                    raise serializers.ValidationError(
-                        f"Tag '{tag[:20]}...' exceeds 50 characters."
-                    )
-                if tag:
-                    cleaned_tags.append(tag)
-            return cleaned_tags
+
+class SavedQuerySerializer(serializers.ModelSerializer):
+    """A saved query: ``/api/bugs/`` parameters under a name."""
+
+    class Meta:
+        model = SavedQuery
+        fields = ['id', 'name', 'params', 'result_count', 'refreshed_at', 'created_at']
+        read_only_fields = ['id', 'result_count', 'refreshed_at', 'created_at']
+
+    def validate_name(self, value):
+        others = SavedQuery.objects.filter(owner=self.context['request'].user, name=value)
+        if self.instance is not None:
+            others = others.exclude(pk=self.instance.pk)
+        if others.exists():
+            raise serializers.ValidationError("You already have a saved query with this name.")
         return value
 
+    def validate_params(self, value):
+        # Results are computed outside the request, so 'me' is stored as the user's id.
+        params = clean_query_params(
+            value, {*BugReportFilter.base_filters, 'search', 'ordering'}, self.context['request'].user
+        )
+        # Stored normalised: the refresh orders by these names as they are.
+        ordering = [field.strip() for field in params.pop('ordering', '').split(',') if field.strip()]
+        for field in ordering:
+            if field.lstrip('-') not in ORDERING_FIELDS:
+                raise serializers.ValidationError(f"Cannot order by '{field}'.")
+        if ordering:
+            params['ordering'] = ','.join(ordering)
+        return params
+
+
+class VersionConflict(Exception):
+    """The bug report was updated by someone else since it was read."""
+
 
-class BugReportCreateUpdateSerializer(serializers.ModelSerializer):
+class BugReportCreateUpdateSerializer(BugReportValidationMixin, serializers.ModelSerializer):
     """Serializer for creating and updating BugReport."""
     
     class Meta:
@@ -156,54 +273,128 @@ class BugReportCreateUpdateSerializer(serializers.ModelSerializer):
             'status',
             'environment',
             'tags',
+            'project',
+            'assignees',
+            'watchers',
         ]
 
-    def validate_title(self, value):
-        if len(value) < 5:
-            raise serializers.ValidationError(
-                "Title must be at least 5 characters long."
-            )
-        if len(value) > 255:
-            raise serializers.ValidationError(
-                "Title must not exceed 255 characters."
-            )
-        return value
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        instance = self.instance
+        if instance is None or instance.created_by_id == self.context['request'].user.pk:
+            return attrs
+        # Anyone but the owner may only add people who can already see the bug
+        # report through its project, so an edit never widens who can read it.
+        added = {
+            name: {u.pk for u in attrs[name]} - {u.pk for u in getattr(instance, name).all()}
+            for name in ('assignees', 'watchers') if name in attrs
+        }
+        if any(added.values()):
+            project_id = getattr(attrs['project'], 'pk', None) if 'project' in attrs else instance.project_id
+            allowed = project_member_ids(project_id) if project_id is not None else frozenset()
+            errors = {
+                name: "Only the owner can add people outside the bug report's project."
+                for name, user_ids in added.items() if user_ids - allowed
+            }
+            if errors:
+                raise serializers.ValidationError(errors)
+        return attrs
 
-    def validate_description(self, value):
-        if len(value) < 10:
-            raise serializers.ValidationError(
-                "Description must be at least 10 characters long."
-            )
+    def validate_project(self, value):
+        request = self.context['request']
+        if value is not None and value.pk not in visible_project_ids(request):
+            raise serializers.ValidationError("You are not a member of this project.")
+        # The project decides who else can read the bug report, so only its
+        # owner may change it: moving in would share it, moving out hide it.
+        instance = self.instance
+        if (instance is not None and instance.project_id != getattr(value, 'pk', None)
+                and instance.created_by_id != request.user.pk):
+            raise serializers.ValidationError("Only the owner can change a bug report's project.")
         return value
 
-    def validate_severity(self, value):
-        valid_choices = [choice[0] for choice in Severity.choices]
-        if value not in valid_choices:
-            raise serializers.ValidationError(
-                f"Invalid severity. Choose from: {', '.join(valid_choices)}"
-            )
-        return value
+    def update(self, instance, validated_data):
+        """
+        Write only the fields that changed, and only if the bug report is still
+        at the version it was read at.
+
+        The write is a single ``UPDATE ... WHERE version = n``: no row lock is
+        taken, and a bug report changed by someone else in the meantime raises
+        ``VersionConflict`` without writing anything. ``instance`` is updated in
+        place, including its new version, so it need not be read back.
+        """
+        relations = {}
+        for name in ('assignees', 'watchers'):
+            users = validated_data.pop(name, None)
+            if users is not None and {u.pk for u in users} != {u.pk for u in getattr(instance, name).all()}:
+                relations[name] = users
+        # Related objects (project) are compared by primary key.
+        changes = {
+            name: value for name, value in validated_data.items()
+            if getattr(instance, BugReport._meta.get_field(name).attname) != getattr(value, 'pk', value)
+        }
+        if not changes and not relations:
+            return instance
+        changes['updated_at'] = timezone.now()
+        # The UPDATE alone is atomic; a transaction is only needed to set relations with it.
+        with transaction.atomic() if relations else nullcontext():
+            current = BugReport.objects.filter(pk=instance.pk, version=instance.version)
+            if not current.update(**changes):
+                raise VersionConflict(instance.pk)
+            for name, users in relations.items():
+                getattr(instance, name).set(users)
+        for name, value in changes.items():
+            setattr(instance, name, value)
+        # The database raises the version on every update.
+        instance.version += 1
+        return instance
+
+
+class CommentSerializer(serializers.ModelSerializer):
+    """Serializer for comments on a bug report."""
 
-    def validate_status(self, value):
-        valid_choices = [choice[0] for choice in Status.choices]
-        if value not in valid_choices:
+    author = UserSerializer(read_only=True)
+
+    class Meta:
+        model = Comment
+        fields = ['id', 'author', 'body', 'created_at']
+        read_only_fields = ['id', 'author', 'created_at']
+
+    def validate_body(self, value):
+        if not value.strip():
+            raise serializers.ValidationError("Comment must not be empty.")
+        if len(value) > 10000:
             raise serializers.ValidationError(
-                f"Invalid status. Choose from: {', '.join(valid_choices)}"
+                "Comment must not exceed 10000 characters."
             )
         return value
 
-    def validate_tags(self, value):
-        if value:
-            cleaned_tags = []
-            for tag in value:
-                if not isinstance(tag, str):
-                    raise serializers.ValidationError("All tags must be strings.")
-                tag = tag.strip().lower()
-                if len(tag) > 50:
-                    raise serializers.ValidationError(
-                        f"Tag '{tag[:20]}...' exceeds 50 characters."
-                    )
-                if tag:
-                    cleaned_tags.append(tag)
-            return cleaned_tags
-        return value
+
+class AttachmentSerializer(serializers.ModelSerializer):
+    """Serializer for attachment metadata; the content is uploaded as ``file``."""
+
+    file = serializers.FileField(write_only=True)
+    size = serializers.IntegerField(source='blob.size', read_only=True)
+    sha256 = serializers.CharField(source='blob_id', read_only=True)
+    uploaded_by = UserSerializer(read_only=True)
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Attachment
+        fields = [
+            'id',
+            'file',
+            'filename',
+            'content_type',
+            'size',
+            'sha256',
+            'uploaded_by',
+            'download_url',
+            'created_at',
+        ]
+        read_only_fields = ['id', 'filename', 'content_type', 'uploaded_by', 'created_at']
+
+    def get_download_url(self, obj) -> str:
+        return reverse(
+            'bug-attachment-download',
+            kwargs={'bug_pk': obj.bug_id, 'pk': obj.pk}
+        )
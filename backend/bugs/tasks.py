@@ -0,0 +1,207 @@
+"""
+Background task queue backed by the ``bugs_task`` table.
+
+Work that can happen after a response is sent (indexing, duplicate
+detection, counters, notifications) is registered with ``@task`` and queued
+with ``enqueue``. The row is inserted once the surrounding transaction
+commits, so rolled-back writes never leave work behind, and a ``NOTIFY``
+wakes idle workers immediately.
+
+``manage.py run_worker`` claims due tasks in batches with
+``SELECT ... FOR UPDATE SKIP LOCKED``, so any number of workers can share
+the table without an external broker. Claiming is a short transaction that
+counts the attempt and leases the task for ``TASK_CLAIM_TIMEOUT`` seconds;
+handlers run after it commits, so no row lock or transaction is held while
+they work. A worker that dies leaves its tasks to be claimed again once the
+lease runs out. Failed tasks are retried with exponential backoff until
+``max_attempts`` is reached.
+
+Tasks registered with an ``interval`` are periodic: each successful run
+queues the next one ``interval`` seconds later, and long-running workers
+queue any that have no pending run (say, after running out of attempts)
+when they start and every ``TASK_SCHEDULE_INTERVAL`` seconds.
+"""
+
+import logging
+import random
+import traceback
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Task, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = 'bug_tasks'
+
+registry = {}
+
+
+class TaskHandler:
+    def __init__(self, func, name, batch, max_attempts, interval=None):
+        self.func = func
+        self.name = name
+        self.batch = batch
+        self.max_attempts = max_attempts
+        self.interval = interval
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, payload=None, delay=None):
+        return enqueue(self.name, payload, delay)
+
+
+def task(name=None, batch=False, max_attempts=5, interval=None):
+    """
+    Register a function as a background task.
+
+    Batch tasks are called once per claimed batch with the list of payloads,
+    which lets them merge duplicate work; other tasks are called with each
+    payload as keyword arguments. Handlers run in autocommit mode and open
+    their own transactions where they need one. With ``interval`` (seconds)
+    the task repeats on its own; see ``schedule_periodic``.
+    """
+    def register(func):
+        handler = TaskHandler(
+            func, name or f'{func.__module__}.{func.__name__}', batch, max_attempts, interval
+        )
+        registry[handler.name] = handler
+        return handler
+    return register
+
+
+def enqueue(name, payload=None, delay=None):
+    """Queue a registered task with a ``payload`` dict, to run after the current transaction commits."""
+    if name not in registry:
+        raise ValueError(f"Unknown task '{name}'.")
+    handler = registry[name]
+
+    def insert():
+        Task.objects.create(
+            name=name,
+            payload=payload or {},
+            max_attempts=handler.max_attempts,
+            run_after=timezone.now() + (delay or timedelta()),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'NOTIFY {NOTIFY_CHANNEL}')
+
+    transaction.on_commit(insert)
+
+
+def schedule_periodic():
+    """Queue every periodic task that has no pending run; return their names."""
+    periodic = [handler for handler in registry.values() if handler.interval]
+    with transaction.atomic():
+        # Serialise workers starting together so each task is queued once.
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', [NOTIFY_CHANNEL])
+        pending = set(
+            Task.objects
+            .filter(status=TaskStatus.PENDING, name__in=[handler.name for handler in periodic])
+            .values_list('name', flat=True)
+        )
+        missing = [handler for handler in periodic if handler.name not in pending]
+        Task.objects.bulk_create(
+            Task(name=handler.name, max_attempts=handler.max_attempts) for handler in missing
+        )
+    return [handler.name for handler in missing]
+
+
+def retry_delay(attempts, base=2.0, cap=3600.0):
+    """Exponential backoff with jitter, in seconds."""
+    return min(cap, base ** attempts) * random.uniform(0.5, 1.0)
+
+
+def _record_failure(tasks, error):
+    """Reschedule tasks whose attempt failed, or give up on those out of attempts."""
+    now = timezone.now()
+    for item in tasks:
+        item.last_error = error
+        if item.attempts >= item.max_attempts:
+            item.status = TaskStatus.FAILED
+            logger.error('Task %s (%s) failed permanently: %s', item.pk, item.name, error)
+        else:
+            item.run_after = now + timedelta(seconds=retry_delay(item.attempts))
+    Task.objects.bulk_update(tasks, ['last_error', 'status', 'run_after'])
+
+
+def _run(handler, tasks):
+    """Run claimed tasks; return those that succeeded and reschedule the others."""
+    if handler.batch:
+        try:
+            handler([item.payload for item in tasks])
+        except Exception:
+            _record_failure(tasks, traceback.format_exc())
+            return []
+        return tasks
+    succeeded = []
+    for item in tasks:
+        try:
+            handler(**item.payload)
+        except Exception:
+            _record_failure([item], traceback.format_exc())
+        else:
+            succeeded.append(item)
+    return succeeded
+
+
+def claim(batch_size):
+    """
+    Claim a batch of due tasks in a short transaction.
+
+    Each claimed task has its attempt counted and its ``run_after`` pushed
+    out by ``TASK_CLAIM_TIMEOUT``, which keeps other workers off it while it
+    runs. Tasks whose lease ran out on their last attempt (their worker died)
+    are marked failed instead of returned.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        claimed = list(
+            Task.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=TaskStatus.PENDING, run_after__lte=now)
+            .order_by('run_after')[:batch_size]
+        )
+        lost = [item for item in claimed if item.attempts >= item.max_attempts]
+        runnable = [item for item in claimed if item.attempts < item.max_attempts]
+        if lost:
+            Task.objects.filter(pk__in=[item.pk for item in lost]).update(
+                status=TaskStatus.FAILED, last_error='The worker running the task was lost.'
+            )
+        lease_until = now + timedelta(seconds=settings.TASK_CLAIM_TIMEOUT)
+        Task.objects.filter(pk__in=[item.pk for item in runnable]).update(
+            attempts=F('attempts') + 1, claimed_at=now, run_after=lease_until
+        )
+    for item in runnable:
+        item.attempts += 1
+        item.claimed_at = now
+        item.run_after = lease_until
+    return claimed, runnable
+
+
+def run_pending(batch_size=100):
+    """Claim and run one batch of due tasks; return how many were claimed."""
+    claimed, runnable = claim(batch_size)
+    by_name = defaultdict(list)
+    for item in runnable:
+        by_name[item.name].append(item)
+
+    done = []
+    for name, tasks in by_name.items():
+        handler = registry.get(name)
+        if handler is None:
+            _record_failure(tasks, f"Unknown task '{name}'.")
+            continue
+        succeeded = _run(handler, tasks)
+        done.extend(succeeded)
+        if succeeded and handler.interval:
+            handler.enqueue(delay=timedelta(seconds=handler.interval))
+    Task.objects.filter(pk__in=[item.pk for item in done]).delete()
+    return len(claimed)
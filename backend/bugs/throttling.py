@@ -0,0 +1,167 @@
+"""
+Token bucket throttling for the API.
+
+Each identity (a user, or a client IP) has one bucket per rate in
+``REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']``: ``'600/min'`` means a burst
+capacity of 600 tokens refilled at 10 tokens per second. Requests draw tokens
+according to their scope, so expensive requests drain the same budget faster;
+``THROTTLE_COSTS`` maps scopes such as ``bugs_search`` to their cost.
+
+Bucket state lives in the ``bugs_throttlebucket`` table by default and is
+updated with one atomic upsert, so every process enforces the same limits.
+``THROTTLE_STORE = 'local'`` keeps buckets in process memory instead, up to
+``THROTTLE_LOCAL_MAX_BUCKETS`` of them; the least recently used are dropped
+first. Full database buckets are purged by a periodic task (``bugs.buckets``).
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connection
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .buckets import parse_rate
+from .models import ThrottleBucket
+
+KEY_LENGTH = ThrottleBucket._meta.get_field('key').max_length
+
+
+class LocalBucketStore:
+    """Buckets in process memory; limits apply per process."""
+
+    def __init__(self, max_buckets=None):
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_buckets = max_buckets or settings.THROTTLE_LOCAL_MAX_BUCKETS
+
+    def consume(self, key, capacity, refill_rate, cost):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        return allowed, tokens
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class DatabaseBucketStore:
+    """Buckets in Postgres, refilled and drawn down in one atomic statement."""
+
+    def consume(self, key, capacity, refill_rate, cost):
+        table = ThrottleBucket._meta.db_table
+        refilled = (
+            'LEAST(%(capacity)s, b.tokens + '
+            'EXTRACT(EPOCH FROM clock_timestamp() - b.updated_at) * %(rate)s)'
+        )
+        sql = f"""
+            INSERT INTO {table} AS b (key, tokens, allowed, updated_at)
+            VALUES (%(key)s, %(capacity)s - %(cost)s, %(capacity)s >= %(cost)s, clock_timestamp())
+            ON CONFLICT (key) DO UPDATE SET
+                tokens = CASE WHEN {refilled} >= %(cost)s
+                    THEN {refilled} - %(cost)s ELSE {refilled} END,
+                allowed = {refilled} >= %(cost)s,
+                updated_at = clock_timestamp()
+            RETURNING allowed, tokens
+        """
+        params = {'key': key, 'capacity': capacity, 'rate': refill_rate, 'cost': cost}
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            allowed, tokens = cursor.fetchone()
+        if not allowed and tokens < 0:
+            # A first request costing more than the capacity.
+            tokens = 0.0
+        return allowed, tokens
+
+
+local_store = LocalBucketStore()
+database_store = DatabaseBucketStore()
+
+
+def bucket_key(scope, ident):
+    """The bucket key for ``ident`` in ``scope``, hashed if it would not fit the table."""
+    key = f'{scope}:{ident}'
+    if len(key) > KEY_LENGTH:
+        key = f'{scope}:{hashlib.sha256(str(ident).encode()).hexdigest()}'
+    return key
+
+
+def get_store():
+    return local_store if settings.THROTTLE_STORE == 'local' else database_store
+
+
+def get_throttle_scope(request, view):
+    """The view's scope for this request, which determines its cost."""
+    if hasattr(view, 'get_throttle_scope'):
+        return view.get_throttle_scope(request)
+    return getattr(view, 'throttle_scope', None)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Base class; subclasses choose the rate scope and bucket identity."""
+
+    scope = None
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_bucket_key(self, request, view):
+        raise NotImplementedError('.get_bucket_key() must be overridden')
+
+    def get_cost(self, request, view):
+        return settings.THROTTLE_COSTS.get(get_throttle_scope(request, view), 1)
+
+    def allow_request(self, request, view):
+        capacity, refill_rate = parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(self.scope))
+        if capacity is None:
+            return True
+        key = self.get_bucket_key(request, view)
+        if key is None:
+            return True
+
+        cost = self.get_cost(request, view)
+        allowed, tokens = get_store().consume(bucket_key(self.scope, key), capacity, refill_rate, cost)
+        if not allowed:
+            self.wait_seconds = max(0.0, (min(cost, capacity) - tokens) / refill_rate)
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Budget per authenticated user."""
+
+    scope = 'user'
+
+    def get_bucket_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return str(request.user.pk)
+        return None
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """Budget per client IP, shared by every account behind it."""
+
+    scope = 'ip'
+
+    def get_bucket_key(self, request, view):
+        return self.get_ident(request)
+
+
+class AuthTokenBucketThrottle(IPTokenBucketThrottle):
+    """Tighter per-IP budget for login, refresh and registration."""
+
+    scope = 'auth'
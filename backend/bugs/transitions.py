@@ -0,0 +1,51 @@
+"""
+Status changes for many bug reports at once.
+
+``POST /api/bugs/transition/`` moves every matching bug report to a new
+status with a single ``UPDATE``, instead of loading, validating and saving
+each one. Only bug reports the user may edit and whose status may move to
+the target under ``STATUS_TRANSITIONS`` change; the rest are left alone.
+"""
+
+from django.db import connection
+from django.utils import timezone
+
+from .models import BugReport, Status
+
+# The statuses a bug report may move to from each status. Closed bug reports
+# can only be reopened.
+STATUS_TRANSITIONS = {
+    Status.OPEN: {Status.IN_PROGRESS, Status.RESOLVED, Status.CLOSED},
+    Status.IN_PROGRESS: {Status.OPEN, Status.RESOLVED, Status.CLOSED},
+    Status.RESOLVED: {Status.OPEN, Status.CLOSED},
+    Status.CLOSED: {Status.OPEN},
+}
+
+
+def source_statuses(target):
+    """The statuses from which a bug report may move to ``target``."""
+    return sorted(status for status, targets in STATUS_TRANSITIONS.items() if target in targets)
+
+
+def apply_transition(queryset, target):
+    """
+    Move the bug reports in ``queryset`` whose status allows it to ``target``.
+
+    Returns the ids of the bug reports that changed. Selecting
+    and updating is one statement. The status is checked again on the row
+    being updated, so a concurrent change cannot slip a bug report into a
+    transition it no longer allows.
+    """
+    if queryset.query.is_empty():
+        return []
+    sources = source_statuses(target)
+    matching = queryset.filter(status__in=sources).order_by().values('pk')
+    matching_sql, params = matching.query.get_compiler(using=queryset.db).as_sql()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {BugReport._meta.db_table} SET status = %s, updated_at = %s '
+            f'WHERE status = ANY(%s) AND id IN ({matching_sql}) '
+            'RETURNING id',
+            [target, timezone.now(), sources, *params]
+        )
+        return [bug_id for bug_id, in cursor.fetchall()]
@@ -2,16 +2,43 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
-from .views import BugReportViewSet, UserRegistrationView
+from .throttling import AuthTokenBucketThrottle
+from .views import (
+    AttachmentViewSet,
+    BugReportViewSet,
+    CommentViewSet,
+    ProjectViewSet,
+    SavedQueryViewSet,
+    TagViewSet,
+    UserRegistrationView,
+    bug_event_stream,
+)
 
 router = DefaultRouter()
+# Before bugs/, whose detail route would otherwise take 'saved' for an id.
+router.register(r'bugs/saved', SavedQueryViewSet, basename='saved-query')
 router.register(r'bugs', BugReportViewSet, basename='bug')
+router.register(r'bugs/(?P<bug_pk>[0-9a-f-]{36})/comments', CommentViewSet, basename='bug-comment')
+router.register(
+    r'bugs/(?P<bug_pk>[0-9a-f-]{36})/attachments', AttachmentViewSet, basename='bug-attachment'
+)
+router.register(r'projects', ProjectViewSet, basename='project')
+router.register(r'tags', TagViewSet, basename='tag')
 
 urlpatterns = [
     # Authentication endpoints
     path('auth/register/', UserRegistrationView.as_view(), name='auth-register'),
-    path('auth/token/', TokenObtainPairView.as_view(), name='token-obtain-pair'),
-    path('auth/token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
+    path(
+        'auth/token/',
+        TokenObtainPairView.as_view(throttle_classes=[AuthTokenBucketThrottle]),
+        name='token-obtain-pair'
+    ),
+    path(
+        'auth/token/refresh/',
+        TokenRefreshView.as_view(throttle_classes=[AuthTokenBucketThrottle]),
+        name='token-refresh'
+    ),
     # Bug report endpoints
+    path('bugs/events/', bug_event_stream, name='bug-events'),
     path('', include(router.urls)),
 ]
@@ -0,0 +1,122 @@
+"""
+Field validation for bug reports.
+
+The API serializers delegate to these functions, and bulk paths (imports,
+batch updates, seeding) can call them directly without building DRF
+serializers. Choices are frozensets and error messages are built once at
+import time, so validating a row only does the work the row needs.
+
+Each ``clean_*`` function returns the cleaned value or raises Django's
+``ValidationError``, which DRF reports against the field being validated.
+"""
+
+from django.core.exceptions import ValidationError
+
+from .models import Severity, Status
+
+TITLE_MIN_LENGTH = 5
+TITLE_MAX_LENGTH = 255
+DESCRIPTION_MIN_LENGTH = 10
+TAG_MAX_LENGTH = 50
+
+SEVERITIES = frozenset(Severity.values)
+STATUSES = frozenset(Status.values)
+
+INVALID_SEVERITY = f"Invalid severity. Choose from: {', '.join(Severity.values)}"
+INVALID_STATUS = f"Invalid status. Choose from: {', '.join(Status.values)}"
+
+
+def clean_title(value):
+    if len(value) < TITLE_MIN_LENGTH:
+        raise ValidationError(f"Title must be at least {TITLE_MIN_LENGTH} characters long.")
+    if len(value) > TITLE_MAX_LENGTH:
+        raise ValidationError(f"Title must not exceed {TITLE_MAX_LENGTH} characters.")
+    return value
+
+
+def clean_description(value):
+    if len(value) < DESCRIPTION_MIN_LENGTH:
+        raise ValidationError(
+            f"Description must be at least {DESCRIPTION_MIN_LENGTH} characters long."
+        )
+    return value
+
+
+def clean_severity(value):
+    if value not in SEVERITIES:
+        raise ValidationError(INVALID_SEVERITY)
+    return value
+
+
+def clean_status(value):
+    if value not in STATUSES:
+        raise ValidationError(INVALID_STATUS)
+    return value
+
+
+def clean_tags(value):
+    """Strip, lowercase and de-duplicate tags in one pass, keeping their order."""
+    if not value:
+        return value
+    cleaned = {}
+    for tag in value:
+        if not isinstance(tag, str):
+            raise ValidationError("All tags must be strings.")
+        tag = tag.strip().lower()
+        if len(tag) > TAG_MAX_LENGTH:
+            raise ValidationError(f"Tag '{tag[:20]}...' exceeds {TAG_MAX_LENGTH} characters.")
+        if tag:
+            cleaned[tag] = None
+    return list(cleaned)
+
+
+FIELD_CLEANERS = {
+    'title': clean_title,
+    'description': clean_description,
+    'severity': clean_severity,
+    'status': clean_status,
+    'tags': clean_tags,
+}
+REQUIRED_FIELDS = ('title', 'description')
+
+
+def clean_bug(data):
+    """
+    Validate one bug report given as a plain dict.
+
+    Returns a cleaned copy; raises ``ValidationError`` with a message list
+    per field, covering every invalid field rather than only the first.
+    """
+    cleaned = dict(data)
+    errors = {}
+    for field in REQUIRED_FIELDS:
+        if not data.get(field):
+            errors[field] = ["This field is required."]
+    for field, clean in FIELD_CLEANERS.items():
+        if field in data and field not in errors:
+            try:
+                cleaned[field] = clean(data[field])
+            except ValidationError as exc:
+                errors[field] = exc.messages
+    if errors:
+        raise ValidationError(errors)
+    return cleaned
+
+
+class BugReportValidationMixin:
+    """Field-level validation shared by the bug report serializers."""
+
+    def validate_title(self, value):
+        return clean_title(value)
+
+    def validate_description(self, value):
+        return clean_description(value)
+
+    def validate_severity(self, value):
+        return clean_severity(value)
+
+    def validate_status(self, value):
+        return clean_status(value)
+
+    def validate_tags(self, value):
+        return clean_tags(value)
@@ -1,19 +1,55 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from drf_spectacular.utils import extend_schema, extend_schema_view
-from rest_framework import generics, status, viewsets
+from django.db.models import Prefetch
+from django.http import HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.http import http_date, parse_etags
+from django_filters.rest_framework import DjangoFilterBackend
+from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view, inline_serializer
+from rest_framework import generics, mixins, serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
 
-from .filters import BugReportFilter
-from .models import BugReport
-from .permissions import IsOwner
+from .attachments import create_attachment, purge_orphan_blobs, serve_attachment
+from .events import broker, bug_audiences, ensure_listener, publish_bug_event, publish_bug_events
+from .filters import DEFAULT_ORDERING, ORDERING_FIELDS, SEARCH_FIELDS, BugReportFilter
+from .models import Attachment, BugReport, Comment, Project, SavedQuery, Tag
+from .pagination import ApproximateCountPagination, CreatedCursorPagination
+from .permissions import (
+    IsAuthorOrReadOnly,
+    IsOwnerOrCollaborator,
+    IsUploaderOrBugOwner,
+    editable_bugs,
+    visible_bugs,
+    visible_project_ids,
+)
+from .replicas import ReplicaReadMixin
+from .saved_queries import refresh, refresh_if_stale
 from .serializers import (
+    AttachmentSerializer,
+    BugBatchSerializer,
     BugReportCreateUpdateSerializer,
     BugReportSerializer,
+    BugTransitionSerializer,
+    CommentSerializer,
+    ProjectSerializer,
+    SavedQuerySerializer,
+    TagSerializer,
     UserRegistrationSerializer,
     UserSerializer,
+    VersionConflict,
 )
+from .throttling import AuthTokenBucketThrottle
+from .transitions import apply_transition
 
 User = get_user_model()
 
@@ -26,6 +62,7 @@ class UserRegistrationView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserRegistrationSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [AuthTokenBucketThrottle]
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -40,11 +77,55 @@ class UserRegistrationView(generics.CreateAPIView):
         )
 
 
+def with_serialized_relations(queryset):
+    """Load the users BugReportSerializer shows: one query per relation for the whole page."""
+    users = User.objects.only('id', 'username', 'email')
+    return queryset.select_related('created_by').prefetch_related(
+        Prefetch('assignees', queryset=users),
+        Prefetch('watchers', queryset=users),
+    )
+
+
+def bug_etag(bug):
+    """The bug report's ETag; its version changes on every update."""
+    return f'"{bug.version}"'
+
+
+def etag_matches(header, bug):
+    """
+    Whether an If-Match header names the bug report's current ETag.
+
+    The version names the bug report's state, not the response bytes, so the
+    ``W/`` that ``CompressionMiddleware`` adds to compressed reads is ignored.
+    """
+    etags = [etag.removeprefix('W/') for etag in parse_etags(header)]
+    return etags == ['*'] or bug_etag(bug) in etags
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The bug report has changed since it was read.'
+    default_code = 'precondition_failed'
+
+
+class EditConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'The bug report changed while it was being updated; try again.'
+    default_code = 'edit_conflict'
+
+
+IF_MATCH = OpenApiParameter(
+    'If-Match', str, OpenApiParameter.HEADER,
+    description='ETag of the version being edited, as returned by a read or an earlier update.',
+)
+
+
 @extend_schema_view(
     list=extend_schema(
         tags=['Bug Reports'],
         summary='List all bug reports',
-        description='Retrieve a list of bug reports created by the authenticated user. '
+        description='Retrieve a list of bug reports created by, assigned to or watched by '
+                    'the authenticated user, or filed under one of their projects. '
                     'Supports filtering by severity and status, searching in title and description, '
                     'and ordering by various fields.'
     ),
@@ -56,46 +137,86 @@ class UserRegistrationView(generics.CreateAPIView):
     retrieve=extend_schema(
         tags=['Bug Reports'],
         summary='Retrieve a bug report',
-        description='Get details of a specific bug report owned by the authenticated user.'
+        description='Get details of a specific bug report visible to the authenticated user.'
     ),
     update=extend_schema(
         tags=['Bug Reports'],
         summary='Update a bug report',
-        description='Fully update a bug report owned by the authenticated user.'
+        description='Fully update a bug report visible to the authenticated user. '
+                    'Send the ETag it was read with as `If-Match` to update it only if '
+                    'nobody changed it since; otherwise the response is 412.',
+        parameters=[IF_MATCH],
     ),
     partial_update=extend_schema(
         tags=['Bug Reports'],
         summary='Partially update a bug report',
-        description='Partially update a bug report owned by the authenticated user.'
+        description='Partially update a bug report visible to the authenticated user. '
+                    '`If-Match` works as for a full update.',
+        parameters=[IF_MATCH],
     ),
     destroy=extend_schema(
         tags=['Bug Reports'],
         summary='Delete a bug report',
         description='Delete a bug report owned by the authenticated user.'
     ),
+    batch=extend_schema(
+        tags=['Bug Reports'],
+        summary='Retrieve many bug reports by id',
+        description='Fetch up to BUG_BATCH_MAX_IDS bug reports in one request, passed as '
+                    'comma-separated `ids` or, for long lists, POSTed as `{"ids": [...]}`. '
+                    'Results follow the requested order; ids that do not exist or are not '
+                    'visible come back as `{"id": ..., "error": "not_found"}`.',
+        parameters=[OpenApiParameter('ids', str, description='Comma-separated bug report ids.')],
+        request=BugBatchSerializer,
+    ),
+    transition=extend_schema(
+        tags=['Bug Reports'],
+        summary='Change the status of many bug reports',
+        description='Move the bug reports you may edit, selected by `ids` or by `filters` '
+                    '(the `/api/bugs/` filter parameters), to `status` with one update. '
+                    'Bug reports whose current status cannot move to `status` are left '
+                    'alone. Returns how many changed.',
+        request=BugTransitionSerializer,
+        responses=inline_serializer('BugTransitionResult', {'updated': serializers.IntegerField()}),
+    ),
 )
-class BugReportViewSet(viewsets.ModelViewSet):
+class BugReportViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for viewing and editing bug reports.
     
     Only authenticated users can access this endpoint.
-    Users can only view and modify their own bug reports.
+    Users can view and modify their own bug reports, those filed under their
+    projects and those assigned to them, but only delete their own. Watchers
+    can view a bug report.
     """
-    permission_classes = [IsAuthenticated, IsOwner]
+    permission_classes = [IsAuthenticated, IsOwnerOrCollaborator]
+    pagination_class = ApproximateCountPagination
     filterset_class = BugReportFilter
     filter_backends = [
+        DjangoFilterBackend,
         SearchFilter,
         OrderingFilter,
     ]
-    search_fields = ['title', 'description']
-    ordering_fields = ['created_at', 'updated_at', 'severity', 'status', 'title']
-    ordering = ['-created_at']
+    search_fields = SEARCH_FIELDS
+    ordering_fields = ORDERING_FIELDS
+    ordering = [DEFAULT_ORDERING]
+    replica_actions = ('list', 'retrieve', 'batch')
 
     def get_queryset(self):
-        """Return only bug reports belonging to the current user."""
+        """Return the bug reports the current user can see."""
         if getattr(self, 'swagger_fake_view', False):
             return BugReport.objects.none()
-        return BugReport.objects.filter(created_by=self.request.user)
+        return with_serialized_relations(visible_bugs(self.request))
+
+    def get_throttle_scope(self, request):
+        """Searches and batches draw more of the request budget than other calls."""
+        if self.action == 'batch':
+            return 'bugs_batch'
+        if self.action == 'transition':
+            return 'bugs_transition'
+        if request.query_params.get('search'):
+            return 'bugs_search'
+        return 'bugs'
 
     def get_serializer_class(self):
         """Use different serializers for different actions."""
@@ -106,6 +227,22 @@ class BugReportViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         """Set the created_by field to the current user."""
         serializer.save(created_by=self.request.user)
+        publish_bug_event('bug.created', serializer.instance.pk)
+
+    def perform_update(self, serializer):
+        serializer.save()
+        instance = serializer.instance
+        publish_bug_event('bug.updated', instance.pk)
+
+    def perform_destroy(self, instance):
+        bug_id = instance.pk
+        # Who could see the bug report is only known before it is gone.
+        audiences = bug_audiences([bug_id])
+        has_attachments = instance.attachments.exists()
+        instance.delete()
+        publish_bug_event('bug.deleted', bug_id, audiences)
+        if has_attachments:
+            purge_orphan_blobs.enqueue()
 
     def create(self, request, *args, **kwargs):
         """Create a new bug report and return full details."""
@@ -115,23 +252,379 @@ class BugReportViewSet(viewsets.ModelViewSet):
         
         # Return full bug report data with nested user info
         bug_report = BugReport.objects.get(pk=serializer.instance.pk)
-        response_serializer = BugReportSerializer(bug_report)
+        response_serializer = BugReportSerializer(bug_report, context=self.get_serializer_context())
         
         return Response(
             response_serializer.data,
-            status=status.HTTP_201_CREATED
+            status=status.HTTP_201_CREATED,
+            headers={'ETag': bug_etag(bug_report)}
         )
 
+    def retrieve(self, request, *args, **kwargs):
+        """Return a bug report with its ETag, for use in If-Match."""
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data, headers={'ETag': bug_etag(instance)})
+
     def update(self, request, *args, **kwargs):
-        """Update a bug report and return full details."""
+        """
+        Update a bug report and return full details.
+
+        With ``If-Match``, the update only applies to the version the client
+        read, and 412 means someone else changed the bug report first.
+        Without it, the update applies to the version read here, and 409
+        means a concurrent write slipped in between.
+        """
         partial = kwargs.pop('partial', False)
         instance = self.get_object()
+        if_match = request.headers.get('If-Match')
+        if if_match is not None and not etag_matches(if_match, instance):
+            raise PreconditionFailed()
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
-        self.perform_update(serializer)
-        
-        # Return full bug report data with nested user info
-        instance.refresh_from_db()
-        response_serializer = BugReportSerializer(instance)
-        
-        return Response(response_serializer.data)
+        try:
+            self.perform_update(serializer)
+        except VersionConflict:
+            raise PreconditionFailed() if if_match is not None else EditConflict()
+
+        # The serializer updated the instance in place, so it is not read again.
+        response_serializer = BugReportSerializer(instance, context=self.get_serializer_context())
+        return Response(response_serializer.data, headers={'ETag': bug_etag(instance)})
+
+    @action(detail=False, methods=['get', 'post'])
+    def batch(self, request):
+        """
+        Return the requested bug reports in request order.
+
+        All ids are fetched with one ``id = ANY(...)`` query on the visible
+        queryset, so access is enforced in SQL rather than per object.
+        """
+        if request.method == 'POST':
+            source = request.data
+        else:
+            source = {'ids': [i for i in request.query_params.get('ids', '').split(',') if i]}
+        params = BugBatchSerializer(data=source)
+        params.is_valid(raise_exception=True)
+        ids = params.validated_data['ids']
+
+        bugs = list(self.get_queryset().filter(pk__any=ids).order_by())
+        serializer = BugReportSerializer(bugs, many=True, context=self.get_serializer_context())
+        found = {bug.pk: data for bug, data in zip(bugs, serializer.data)}
+        return Response({
+            'results': [found.get(pk) or {'id': pk, 'error': 'not_found'} for pk in ids],
+        })
+
+    @action(detail=False, methods=['post'])
+    def transition(self, request):
+        """
+        Change the status of many bug reports with one set-based ``UPDATE``.
+
+        The bug reports come from ``editable_bugs`` narrowed by the ids or
+        filters, so ownership is enforced in SQL rather than per object.
+        """
+        params = BugTransitionSerializer(data=request.data, context=self.get_serializer_context())
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        queryset = editable_bugs(request)
+        if 'ids' in data:
+            queryset = queryset.filter(pk__any=data['ids'])
+        else:
+            queryset = BugReportFilter(data=data['filters'], queryset=queryset, request=request).qs
+        changed = apply_transition(queryset, data['status'])
+        publish_bug_events('bug.updated', changed)
+        return Response({'updated': len(changed)})
+
+
+@extend_schema_view(
+    list=extend_schema(tags=['Saved Queries'], summary='List your saved queries'),
+    create=extend_schema(
+        tags=['Saved Queries'],
+        summary='Save a query',
+        description='Save `/api/bugs/` parameters (filters, `search` and `ordering`) under a name. '
+                    'The matching bug reports are computed straight away.',
+    ),
+    retrieve=extend_schema(
+        tags=['Saved Queries'],
+        summary='Bug reports matching a saved query',
+        # A many=True response would otherwise be named like the list operation.
+        operation_id='bugs_saved_results',
+        description='The stored results of a saved query, refreshed in the background once they '
+                    'are older than SAVED_QUERY_REFRESH_SECONDS. `Last-Modified` tells when they '
+                    'were computed.',
+        responses=BugReportSerializer(many=True),
+    ),
+    update=extend_schema(tags=['Saved Queries'], summary='Update a saved query'),
+    partial_update=extend_schema(tags=['Saved Queries'], summary='Partially update a saved query'),
+    destroy=extend_schema(tags=['Saved Queries'], summary='Delete a saved query'),
+)
+class SavedQueryViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
+    """
+    Bug report queries the user runs often, answered from stored results.
+
+    Retrieving a saved query lists its bug reports rather than the query
+    itself, reading the stored results through their index.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = SavedQuerySerializer
+    lookup_value_regex = '[0-9]+'
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return SavedQuery.objects.none()
+        return SavedQuery.objects.filter(owner=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(owner=self.request.user)
+        refresh(serializer.instance)
+
+    def perform_update(self, serializer):
+        serializer.save()
+        if 'params' in serializer.validated_data:
+            refresh(serializer.instance)
+
+    def retrieve(self, request, *args, **kwargs):
+        saved_query = self.get_object()
+        refresh_if_stale(saved_query)
+        # Visibility is checked again, in case the user lost access since the refresh.
+        bugs = visible_bugs(request).filter(
+            saved_query_results__saved_query=saved_query
+        ).order_by('saved_query_results__position')
+        page = self.paginate_queryset(with_serialized_relations(bugs))
+        serializer = BugReportSerializer(page, many=True, context=self.get_serializer_context())
+        response = self.get_paginated_response(serializer.data)
+        if saved_query.refreshed_at:
+            response['Last-Modified'] = http_date(saved_query.refreshed_at.timestamp())
+        return response
+
+
+@extend_schema_view(
+    list=extend_schema(
+        tags=['Tags'],
+        summary='List or autocomplete your tags',
+        description='Tags used in your bug reports, most used first, with how many bug reports '
+                    'carry each. `q` keeps the tags that start with it.',
+        parameters=[OpenApiParameter('q', str, description='Tag prefix to complete.')],
+    ),
+)
+class TagViewSet(ReplicaReadMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    The tags of the user's bug reports, from the tag catalog.
+
+    Counts are kept up to date on write, so listing and completing tags
+    reads the catalog's index rather than every bug report's tags.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = TagSerializer
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return Tag.objects.none()
+        tags = Tag.objects.filter(owner=self.request.user)
+        prefix = self.request.query_params.get('q', '').strip().lower()
+        if prefix:
+            tags = tags.filter(name__startswith=prefix)
+        return tags
+
+
+@extend_schema_view(
+    list=extend_schema(tags=['Projects'], summary='List your projects'),
+    retrieve=extend_schema(tags=['Projects'], summary='Retrieve a project'),
+)
+class ProjectViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Projects the authenticated user belongs to, directly or through a team.
+
+    Memberships are managed in the admin.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = ProjectSerializer
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return Project.objects.none()
+        return Project.objects.filter(pk__in=visible_project_ids(self.request))
+
+
+class PayloadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Attachment exceeds the maximum upload size.'
+    default_code = 'payload_too_large'
+
+
+class BugChildViewMixin:
+    """Resources nested under a bug report the user can see."""
+
+    def get_bug(self):
+        if not hasattr(self, '_bug'):
+            self._bug = get_object_or_404(visible_bugs(self.request), pk=self.kwargs['bug_pk'])
+        return self._bug
+
+    def get_editable_bug(self):
+        """The bug report, if the user may add to it; watchers may only read."""
+        bug = self.get_bug()
+        if not IsOwnerOrCollaborator().has_object_permission(self.request, self, bug):
+            self.permission_denied(
+                self.request, message='Only the owner, assignees and project members can add to this bug report.'
+            )
+        return bug
+
+
+@extend_schema_view(
+    list=extend_schema(tags=['Comments'], summary='List comments on a bug report'),
+    create=extend_schema(tags=['Comments'], summary='Comment on a bug report'),
+    destroy=extend_schema(tags=['Comments'], summary='Delete your comment'),
+)
+class CommentViewSet(
+    ReplicaReadMixin,
+    BugChildViewMixin,
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet
+):
+    """
+    Comments on a bug report, oldest first.
+
+    Lists use keyset pagination: follow the ``next`` cursor link.
+    """
+    permission_classes = [IsAuthenticated, IsAuthorOrReadOnly]
+    serializer_class = CommentSerializer
+    pagination_class = CreatedCursorPagination
+    lookup_value_regex = '[0-9]+'
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return Comment.objects.none()
+        return Comment.objects.filter(bug=self.get_bug()).select_related('author')
+
+    def create(self, request, *args, **kwargs):
+        self.get_editable_bug()
+        return super().create(request, *args, **kwargs)
+
+    def perform_create(self, serializer):
+        serializer.save(bug=self.get_bug(), author=self.request.user)
+
+
+@extend_schema_view(
+    list=extend_schema(tags=['Attachments'], summary='List attachments of a bug report'),
+    create=extend_schema(tags=['Attachments'], summary='Upload an attachment'),
+    retrieve=extend_schema(tags=['Attachments'], summary='Retrieve attachment details'),
+    destroy=extend_schema(tags=['Attachments'], summary='Delete an attachment'),
+    download=extend_schema(tags=['Attachments'], summary='Download an attachment'),
+)
+class AttachmentViewSet(
+    ReplicaReadMixin,
+    BugChildViewMixin,
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet
+):
+    """
+    Files attached to a bug report.
+
+    Upload with a multipart ``file`` field. Identical content is stored once.
+    """
+    permission_classes = [IsAuthenticated, IsUploaderOrBugOwner]
+    serializer_class = AttachmentSerializer
+    pagination_class = CreatedCursorPagination
+    lookup_value_regex = '[0-9a-f-]{36}'
+    replica_actions = ('list', 'retrieve', 'download')
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return Attachment.objects.none()
+        return Attachment.objects.filter(
+            bug=self.get_bug()
+        ).select_related('blob', 'uploaded_by')
+
+    def create(self, request, *args, **kwargs):
+        """Stream the upload to disk and attach it, reusing identical stored content."""
+        bug = self.get_editable_bug()
+        limit = settings.ATTACHMENT_MAX_SIZE
+        # Refuse oversized bodies before reading them; allow for multipart framing.
+        if int(request.META.get('CONTENT_LENGTH') or 0) > limit + 64 * 1024:
+            raise PayloadTooLarge()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data['file']
+        if upload.size > limit:
+            raise PayloadTooLarge()
+        attachment = create_attachment(bug, upload, request.user)
+        return Response(self.get_serializer(attachment).data, status=status.HTTP_201_CREATED)
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        purge_orphan_blobs.enqueue()
+
+    @action(detail=True)
+    def download(self, request, *args, **kwargs):
+        """Send the file content; conditional requests on the content hash get 304."""
+        attachment = self.get_object()
+        etag = f'"{attachment.blob_id}"'
+        if request.headers.get('If-None-Match') == etag:
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
+        return serve_attachment(attachment)
+
+
+def _authenticate_stream(request):
+    """
+    Resolve the user for an event stream request.
+
+    Browsers' ``EventSource`` cannot send an Authorization header, so the
+    access token may also be passed as the ``token`` query parameter.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        raw_token = request.GET.get('token')
+    if not raw_token:
+        return None
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+async def _event_stream(subscription, heartbeat):
+    """Yield Server-Sent Events for a subscription until the client goes away."""
+    try:
+        yield 'retry: 5000\n\n'
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def bug_event_stream(request):
+    """
+    Stream create/update/delete events for the bug reports the user can see.
+
+    Served best by an ASGI server, where each open stream costs a coroutine
+    rather than a worker thread.
+    """
+    user = await sync_to_async(_authenticate_stream)(request)
+    if user is None or not user.is_active:
+        return JsonResponse(
+            {'detail': 'Authentication credentials were not provided or are invalid.'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+    ensure_listener()
+    subscription = broker.subscribe(user.pk)
+    response = StreamingHttpResponse(
+        _event_stream(subscription, getattr(settings, 'BUG_EVENTS_HEARTBEAT', 15)),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
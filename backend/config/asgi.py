@@ -9,3 +9,16 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_asgi_application()
+
+# Load the common-password list before workers fork, not on the first registration.
+from bugs.password_validation import preload_common_passwords  # noqa: E402
+
+preload_common_passwords()
+
+# Load the prebuilt OpenAPI schema, if there is one, before workers fork.
+from django.conf import settings  # noqa: E402
+
+if settings.SERVES_SCHEMA and settings.OPENAPI_SCHEMA_FILE:
+    from bugs.schema import preload_schema
+
+    preload_schema()
@@ -6,6 +6,7 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -21,11 +22,27 @@ DEBUG = os.getenv('DJANGO_DEBUG', 'True').lower() in ('true', '1', 'yes')
 
 ALLOWED_HOSTS = os.getenv('DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
 
-# Application definition
-INSTALLED_APPS = [
-    'django.contrib.admin',
+# Process role: which apps and URLs this process loads.
+#   'all'    - everything (the default, and what migrations and tests use)
+#   'api'    - the REST API, without the admin or the OpenAPI schema views
+#   'worker' - models and management commands only, for run_worker
+#   'schema' - the REST API plus the OpenAPI schema and docs
+PROCESS_ROLES = ('all', 'api', 'worker', 'schema')
+PROCESS_ROLE = os.getenv('DJANGO_PROCESS_ROLE', 'all')
+if PROCESS_ROLE not in PROCESS_ROLES:
+    raise ImproperlyConfigured(
+        f"DJANGO_PROCESS_ROLE must be one of {', '.join(PROCESS_ROLES)}, not {PROCESS_ROLE!r}."
+    )
+SERVES_ADMIN = PROCESS_ROLE == 'all'
+SERVES_API = PROCESS_ROLE != 'worker'
+SERVES_SCHEMA = PROCESS_ROLE in ('all', 'schema')
+
+# Application definition. Roles only load the apps they use.
+CORE_APPS = [
     'django.contrib.auth',
     'django.contrib.contenttypes',
+]
+WEB_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
@@ -34,12 +51,21 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     'corsheaders',
     'django_filters',
-    'drf_spectacular',
-    # Local apps
-    'bugs',
 ]
+INSTALLED_APPS = (
+    (['django.contrib.admin'] if SERVES_ADMIN else [])
+    + CORE_APPS
+    + (WEB_APPS if SERVES_API else [])
+    + (['drf_spectacular'] if SERVES_SCHEMA else [])
+    # Local apps
+    + ['bugs']
+)
 
 MIDDLEWARE = [
+    'bugs.middleware.RequestMetricsMiddleware',
+    'bugs.middleware.QueryDetectorMiddleware',
+    'bugs.middleware.ConcurrencyLimitMiddleware',
+    'bugs.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -82,6 +108,36 @@ DATABASES = {
     }
 }
 
+# Read replicas: a comma-separated list of host[:port], each with the
+# primary's database name and credentials. Views opt in to reading from them
+# (see bugs/replicas.py); a user's reads stay on the primary for
+# REPLICA_STICKY_SECONDS after they write, and a replica is skipped while its
+# replay lag exceeds REPLICA_MAX_LAG_SECONDS.
+READ_REPLICAS = []
+for _index, _address in enumerate(filter(None, os.getenv('POSTGRES_REPLICAS', '').split(','))):
+    _host, _, _port = _address.strip().partition(':')
+    DATABASES[f'replica_{_index}'] = {
+        **DATABASES['default'],
+        'HOST': _host,
+        'PORT': _port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    READ_REPLICAS.append(f'replica_{_index}')
+DATABASE_ROUTERS = ['bugs.replicas.ReplicaRouter']
+REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', '5'))
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv('REPLICA_LAG_CHECK_INTERVAL', '2'))
+REPLICA_STICKY_SECONDS = float(os.getenv('REPLICA_STICKY_SECONDS', '10'))
+
+# Cache, used for read-your-writes markers. The default is per process; use a
+# shared backend (e.g. django.core.cache.backends.redis.RedisCache) when
+# several processes serve the API.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -91,13 +147,37 @@ AUTH_PASSWORD_VALIDATORS = [
         'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
     },
     {
-        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+        'NAME': 'bugs.password_validation.CompactCommonPasswordValidator',
     },
     {
         'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
     },
 ]
 
+# Password hashing. The first hasher hashes new passwords; the others only
+# verify existing hashes, which are upgraded on the user's next login.
+PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'argon2')
+_PASSWORD_HASHERS = {
+    'argon2': 'bugs.hashers.TunableArgon2PasswordHasher',
+    'scrypt': 'bugs.hashers.TunableScryptPasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+if PASSWORD_HASHER not in _PASSWORD_HASHERS:
+    raise ImproperlyConfigured(
+        f"PASSWORD_HASHER must be one of {', '.join(_PASSWORD_HASHERS)}, not {PASSWORD_HASHER!r}."
+    )
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    hasher for name, hasher in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
+# Argon2id costs default to the OWASP recommendation (19 MiB, 2 passes).
+ARGON2_TIME_COST = int(os.getenv('ARGON2_TIME_COST', '2'))
+ARGON2_MEMORY_COST = int(os.getenv('ARGON2_MEMORY_COST', '19456'))
+ARGON2_PARALLELISM = int(os.getenv('ARGON2_PARALLELISM', '1'))
+SCRYPT_WORK_FACTOR = int(os.getenv('SCRYPT_WORK_FACTOR', str(2 ** 15)))
+SCRYPT_BLOCK_SIZE = int(os.getenv('SCRYPT_BLOCK_SIZE', '8'))
+SCRYPT_PARALLELISM = int(os.getenv('SCRYPT_PARALLELISM', '1'))
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -108,6 +188,13 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Uploaded files (attachments). Media is only served through the API.
+MEDIA_URL = 'media/'
+MEDIA_ROOT = Path(os.getenv('MEDIA_ROOT', BASE_DIR / 'media'))
+
+# Stream every upload to a temporary file, hashing it on the way in.
+FILE_UPLOAD_HANDLERS = ['bugs.attachments.HashingFileUploadHandler']
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -119,14 +206,42 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'bugs.renderers.MessagePackRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        'bugs.renderers.MessagePackParser',
+    ),
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ),
+    'DEFAULT_THROTTLE_CLASSES': (
+        'bugs.throttling.UserTokenBucketThrottle',
+        'bugs.throttling.IPTokenBucketThrottle',
+    ),
+    'DEFAULT_THROTTLE_RATES': {
+        'user': os.getenv('THROTTLE_RATE_USER', '600/min'),
+        'ip': os.getenv('THROTTLE_RATE_IP', '1200/min'),
+        'auth': os.getenv('THROTTLE_RATE_AUTH', '30/min'),
+    },
+    # Trusted proxies in front of the app. Per-IP throttles take the client
+    # address this many hops back in X-Forwarded-For; with 0 they use
+    # REMOTE_ADDR and ignore the header, which clients can set to anything.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '0')),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
-    'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Only roles that serve the schema pay for importing drf-spectacular's generator.
+    'DEFAULT_SCHEMA_CLASS': (
+        'drf_spectacular.openapi.AutoSchema' if SERVES_SCHEMA
+        else 'rest_framework.schemas.openapi.AutoSchema'
+    ),
 }
 
 # Simple JWT
@@ -155,3 +270,99 @@ SPECTACULAR_SETTINGS = {
     'SERVE_INCLUDE_SCHEMA': False,
     'COMPONENT_SPLIT_REQUEST': True,
 }
+
+# Prebuilt OpenAPI schema written by `manage.py build_schema`. When set, the
+# schema is loaded from this file at startup; otherwise it is generated on the
+# first request. Either way it is generated at most once per process.
+OPENAPI_SCHEMA_FILE = os.getenv('OPENAPI_SCHEMA_FILE', '')
+
+# Bug event push (Server-Sent Events)
+# 'local' fans out within one process; 'postgres' relays through LISTEN/NOTIFY
+# so every worker process can serve any user's streams.
+BUG_EVENTS_BACKEND = os.getenv('BUG_EVENTS_BACKEND', 'local')
+BUG_EVENTS_HEARTBEAT = int(os.getenv('BUG_EVENTS_HEARTBEAT', '15'))
+
+# Background tasks: a claimed task is left to its worker for this many
+# seconds; after that another worker may claim it again.
+TASK_CLAIM_TIMEOUT = int(os.getenv('TASK_CLAIM_TIMEOUT', '600'))
+# Seconds between a worker's checks that every periodic task has a pending run.
+TASK_SCHEDULE_INTERVAL = int(os.getenv('TASK_SCHEDULE_INTERVAL', '60'))
+
+# Request metrics (Server-Timing headers and Prometheus /metrics endpoint)
+REQUEST_METRICS_ENABLED = os.getenv('REQUEST_METRICS_ENABLED', 'False').lower() in ('true', '1', 'yes')
+REQUEST_METRICS_SERVER_TIMING = os.getenv('REQUEST_METRICS_SERVER_TIMING', 'True').lower() in ('true', '1', 'yes')
+# /metrics answers only scrapers from these addresses, or those sending
+# "Authorization: Bearer <REQUEST_METRICS_TOKEN>" when a token is set.
+REQUEST_METRICS_ALLOWED_IPS = [
+    address for address in os.getenv('REQUEST_METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if address
+]
+REQUEST_METRICS_TOKEN = os.getenv('REQUEST_METRICS_TOKEN', '')
+
+# N+1 and slow query detection. Problems are logged; with QUERY_DETECTOR_RAISE
+# (enabled by the test suite) the request fails instead.
+QUERY_DETECTOR_ENABLED = os.getenv('QUERY_DETECTOR_ENABLED', 'True').lower() in ('true', '1', 'yes')
+QUERY_DETECTOR_REPEAT_THRESHOLD = int(os.getenv('QUERY_DETECTOR_REPEAT_THRESHOLD', '5'))
+QUERY_DETECTOR_SLOW_MS = float(os.getenv('QUERY_DETECTOR_SLOW_MS', '200'))
+QUERY_DETECTOR_EXPLAIN_RATE = float(os.getenv('QUERY_DETECTOR_EXPLAIN_RATE', '0.05'))
+QUERY_DETECTOR_MAX_QUERIES = None
+QUERY_DETECTOR_RAISE = False
+
+# Throttling: token buckets shared through the database ('database') or kept
+# per process ('local'). Scopes not listed cost one token per request.
+THROTTLE_STORE = os.getenv('THROTTLE_STORE', 'database')
+# Local buckets kept per process before the least recently used are dropped.
+THROTTLE_LOCAL_MAX_BUCKETS = int(os.getenv('THROTTLE_LOCAL_MAX_BUCKETS', '10000'))
+# Seconds between purges of database buckets that have refilled to capacity.
+THROTTLE_PURGE_INTERVAL = int(os.getenv('THROTTLE_PURGE_INTERVAL', '3600'))
+THROTTLE_COSTS = {
+    'bugs_search': 5,
+    'bugs_batch': 5,
+    'bugs_transition': 10,
+}
+
+# Largest number of ids accepted by /api/bugs/batch/.
+BUG_BATCH_MAX_IDS = int(os.getenv('BUG_BATCH_MAX_IDS', '100'))
+
+# Largest number of ids accepted by /api/bugs/transition/; larger changes
+# select their bug reports with filters.
+BUG_TRANSITION_MAX_IDS = int(os.getenv('BUG_TRANSITION_MAX_IDS', '1000'))
+
+# Bug report lists count exactly up to this many results; larger counts are
+# planner estimates, cached for APPROXIMATE_COUNT_CACHE_SECONDS.
+APPROXIMATE_COUNT_THRESHOLD = int(os.getenv('APPROXIMATE_COUNT_THRESHOLD', '10000'))
+APPROXIMATE_COUNT_CACHE_SECONDS = int(os.getenv('APPROXIMATE_COUNT_CACHE_SECONDS', '60'))
+
+# Saved queries store their first SAVED_QUERY_MAX_RESULTS matches, refreshed
+# when read more than SAVED_QUERY_REFRESH_SECONDS after the last refresh.
+SAVED_QUERY_MAX_RESULTS = int(os.getenv('SAVED_QUERY_MAX_RESULTS', '1000'))
+SAVED_QUERY_REFRESH_SECONDS = int(os.getenv('SAVED_QUERY_REFRESH_SECONDS', '300'))
+
+# Load shedding: reject requests with 429 once this many are in flight in
+# one process (0 disables it).
+MAX_CONCURRENT_REQUESTS = int(os.getenv('MAX_CONCURRENT_REQUESTS', '0'))
+LOAD_SHED_RETRY_AFTER = int(os.getenv('LOAD_SHED_RETRY_AFTER', '1'))
+
+# Attachments: maximum upload size in bytes, and optionally a header that
+# hands downloads to the front-end server ('X-Accel-Redirect' for nginx,
+# 'X-Sendfile' for Apache) with the internal location prefix of MEDIA_ROOT.
+ATTACHMENT_MAX_SIZE = int(os.getenv('ATTACHMENT_MAX_SIZE', str(50 * 1024 * 1024)))
+ATTACHMENT_SENDFILE_HEADER = os.getenv('ATTACHMENT_SENDFILE_HEADER', '')
+ATTACHMENT_SENDFILE_PREFIX = os.getenv('ATTACHMENT_SENDFILE_PREFIX', '/protected-media/')
+
+# Response compression: encodings in order of preference (zstd and br need
+# the optional zstandard and brotli packages), per-encoding levels for
+# dynamic responses, and the smallest body worth compressing. HTML is left
+# out: admin pages carry CSRF tokens next to reflected input, which
+# compression would expose to BREACH-style length attacks.
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'True').lower() in ('true', '1', 'yes')
+COMPRESSION_ENCODINGS = os.getenv('COMPRESSION_ENCODINGS', 'zstd,br,gzip').split(',')
+COMPRESSION_LEVELS = {'gzip': 6, 'br': 4, 'zstd': 3}
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_CONTENT_TYPES = [
+    'application/json',
+    'application/msgpack',
+    'application/x-ndjson',
+    'application/vnd.oai.openapi',
+    'application/vnd.oai.openapi+json',
+    'text/csv',
+]
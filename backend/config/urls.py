@@ -1,15 +1,44 @@
 """
 URL configuration for Bug Tracker project.
+
+Only the views of the process role (``DJANGO_PROCESS_ROLE``) are imported,
+so a worker never loads DRF or the admin, and the API role skips the admin
+and the schema views.
 """
 
-from django.contrib import admin
+from django.conf import settings
 from django.urls import include, path
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
-
-urlpatterns = [
-    path('admin/', admin.site.urls),
-    path('api/', include('bugs.urls')),
-    # OpenAPI Schema and Documentation
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
-]
+
+urlpatterns = []
+
+if settings.SERVES_ADMIN:
+    from django.contrib import admin
+
+    urlpatterns.append(path('admin/', admin.site.urls))
+
+if settings.SERVES_API:
+    from bugs.metrics import metrics_view
+
+    urlpatterns += [
+        path('api/', include('bugs.urls')),
+        # Prometheus metrics (enabled with REQUEST_METRICS_ENABLED)
+        path('metrics', metrics_view, name='metrics'),
+    ]
+
+if settings.SERVES_SCHEMA:
+    from drf_spectacular.views import SpectacularSwaggerView
+
+    from bugs.schema import schema_view
+
+    urlpatterns += [
+        # OpenAPI Schema (generated once per process) and Documentation. The
+        # docs page is static, so it skips authentication and throttling.
+        path('api/schema/', schema_view, name='schema'),
+        path(
+            'api/docs/',
+            SpectacularSwaggerView.as_view(
+                url_name='schema', authentication_classes=[], throttle_classes=[]
+            ),
+            name='swagger-ui',
+        ),
+    ]
@@ -3,10 +3,16 @@
 import os
 import sys
 
+# Commands that only need the models run with the lighter worker app set,
+# unless DJANGO_PROCESS_ROLE says otherwise.
+WORKER_COMMANDS = {'run_worker', 'seed_bugs'}
+
 
 def main():
     """Run administrative tasks."""
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    if len(sys.argv) > 1 and sys.argv[1] in WORKER_COMMANDS:
+        os.environ.setdefault('DJANGO_PROCESS_ROLE', 'worker')
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
@@ -1,11 +1,33 @@
 import pytest
 from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
 
+from bugs import events
 from bugs.models import BugReport, Severity, Status
 
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def query_budget(request, settings):
+    """
+    Fail any request that repeats a query shape or exceeds its query budget.
+
+    Tests can adjust the budget with ``@pytest.mark.query_budget(...)``,
+    passing ``repeat_threshold`` or ``max_queries``.
+    """
+    settings.QUERY_DETECTOR_ENABLED = True
+    settings.QUERY_DETECTOR_RAISE = True
+    settings.QUERY_DETECTOR_SLOW_MS = 1000
+    settings.QUERY_DETECTOR_EXPLAIN_RATE = 0
+    marker = request.node.get_closest_marker('query_budget')
+    if marker:
+        settings.QUERY_DETECTOR_REPEAT_THRESHOLD = marker.kwargs.get(
+            'repeat_threshold', settings.QUERY_DETECTOR_REPEAT_THRESHOLD
+        )
+        settings.QUERY_DETECTOR_MAX_QUERIES = marker.kwargs.get('max_queries')
+
+
 @pytest.fixture
 def user(db):
     """Create a test user."""
@@ -36,3 +58,55 @@ def bug_report(user):
         status=Status.OPEN,
         created_by=user
     )
+
+
+@pytest.fixture
+def make_bug(db):
+    """
+    Return a function that creates a bug report owned by ``owner``.
+
+    Fields not given keep the model defaults. ``created_at`` is written after
+    the insert, which would otherwise stamp the current time.
+    """
+    def make(owner, title='Test Bug Report', created_at=None, **fields):
+        fields.setdefault('description', 'This is a test bug description.')
+        fields['tags'] = list(fields.get('tags', ()))
+        bug = BugReport.objects.create(title=title, created_by=owner, **fields)
+        if created_at is not None:
+            BugReport.objects.filter(pk=bug.pk).update(created_at=created_at)
+            bug.created_at = created_at
+        return bug
+    return make
+
+
+@pytest.fixture
+def api_client():
+    """Return an unauthenticated API client."""
+    return APIClient()
+
+
+@pytest.fixture
+def client_for():
+    """Return a function that gives an API client authenticated as a user."""
+    def make(user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+    return make
+
+
+@pytest.fixture
+def authenticated_client(client_for, user):
+    """Return an API client authenticated as ``user``."""
+    return client_for(user)
+
+
+@pytest.fixture
+def published(monkeypatch):
+    """Record messages handed to the broker."""
+    messages = []
+    monkeypatch.setattr(
+        events.broker, 'publish',
+        lambda user_id, message: messages.append((user_id, message))
+    )
+    return messages
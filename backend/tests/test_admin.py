@@ -0,0 +1,140 @@
+import datetime
+
+import pytest
+from django.contrib.admin.sites import site
+from django.utils import timezone
+
+from bugs import pagination
+from bugs.models import BugReport, Status
+
+CHANGELIST = '/admin/bugs/bugreport/'
+
+
+def at(*args):
+    return timezone.make_aware(datetime.datetime(*args))
+
+
+@pytest.fixture
+def model_admin():
+    return site._registry[BugReport]
+
+
+@pytest.mark.django_db
+class TestBugReportChangelist:
+    """Tests for the bug report admin changelist."""
+
+    def test_queries_do_not_grow_with_rows(self, admin_client, user, django_assert_max_num_queries, make_bug):
+        """Test that authors are joined rather than loaded row by row."""
+        for n in range(30):
+            make_bug(user, f'Changelist row {n}')
+
+        with django_assert_max_num_queries(10):
+            response = admin_client.get(CHANGELIST)
+
+        assert response.status_code == 200
+        assert response.context['cl'].result_count == 30
+
+    def test_search(self, admin_client, user, make_bug):
+        """Test that search matches word prefixes in the text, and tags."""
+        make_bug(user, 'Checkout crashes on submit')
+        make_bug(user, 'Slow dashboard', description='Rendering the charts takes a minute.')
+        make_bug(user, 'Unrelated report', tags=['payments'])
+        make_bug(user, 'Another unrelated report')
+
+        def titles(term):
+            response = admin_client.get(CHANGELIST, {'q': term})
+            return sorted(bug.title for bug in response.context['cl'].result_list)
+
+        assert titles('checkout crash') == ['Checkout crashes on submit']
+        assert titles('chart') == ['Slow dashboard']
+        assert titles('Payments') == ['Unrelated report']
+        assert titles('checkout dashboard') == []
+        assert titles('%') == sorted(BugReport.objects.values_list('title', flat=True))
+
+    def test_date_drill_down(self, admin_client, user, make_bug):
+        """Test that each level of the date hierarchy lists the periods with rows."""
+        make_bug(user, 'Filed last year', created_at=at(2024, 11, 5, 12))
+        make_bug(user, 'Filed in March', created_at=at(2025, 3, 9, 8))
+        make_bug(user, 'Filed later in March', created_at=at(2025, 3, 21, 8))
+        make_bug(user, 'Filed in June', created_at=at(2025, 6, 1, 23))
+
+        def choices(params):
+            response = admin_client.get(CHANGELIST, params)
+            return [choice['title'] for choice in response.context['choices']]
+
+        assert choices({}) == ['2024', '2025']
+        assert choices({'created_at__year': '2025'}) == ['March 2025', 'June 2025']
+        days = choices({'created_at__year': '2025', 'created_at__month': '3'})
+        assert days == ['March 9', 'March 21']
+
+
+@pytest.mark.django_db
+class TestDrillDownQuerySet:
+    """Tests for the period probes behind the date hierarchy."""
+
+    @pytest.mark.parametrize('kind', ['year', 'month', 'day'])
+    def test_matches_distinct_datetimes(self, model_admin, user, kind, make_bug):
+        """Test that probing gives the same periods as SELECT DISTINCT."""
+        for created_at in [at(2024, 12, 31, 23), at(2025, 1, 1, 0), at(2025, 1, 3, 5), at(2025, 2, 2)]:
+            make_bug(user, 'Dated bug report', created_at=created_at)
+        queryset = model_admin.get_queryset(None)
+
+        probed = queryset.datetimes('created_at', kind, order='DESC')
+
+        assert probed == list(BugReport.objects.datetimes('created_at', kind, order='DESC'))
+
+    def test_two_queries(self, model_admin, user, django_assert_num_queries, make_bug):
+        """Test that all periods are probed in one statement after the range."""
+        for day in range(1, 29):
+            make_bug(user, 'Dated bug report', created_at=at(2025, 2, day))
+        queryset = model_admin.get_queryset(None).filter(created_at__year=2025)
+
+        with django_assert_num_queries(2):
+            assert len(queryset.datetimes('created_at', 'day')) == 28
+
+    def test_empty(self, model_admin):
+        """Test that an empty selection has no periods."""
+        assert model_admin.get_queryset(None).datetimes('created_at', 'year') == []
+
+
+@pytest.mark.django_db
+class TestEstimatedCount:
+    """Tests for counts that stop being exact on large tables."""
+
+    def test_exact_below_limit(self, user, make_bug):
+        """Test that small results are counted exactly."""
+        for n in range(3):
+            make_bug(user, f'Counted bug {n}')
+
+        assert pagination.estimated_count(BugReport.objects.all(), 10) == (3, True)
+        filtered = BugReport.objects.filter(title='Counted bug 1')
+        assert pagination.estimated_count(filtered, 10) == (1, True)
+
+    def test_table_estimate_for_unfiltered(self, user, monkeypatch):
+        """Test that a large table is not counted when nothing filters it."""
+        monkeypatch.setattr(pagination, 'table_estimate', lambda model, using: 5_000_000)
+
+        assert pagination.estimated_count(BugReport.objects.all(), 10) == (5_000_000, False)
+
+    def test_planner_estimate_for_filtered(self, user, monkeypatch):
+        """Test that a large filtered result takes the planner's estimate."""
+        monkeypatch.setattr(pagination, 'planner_estimate', lambda queryset: 40_000)
+
+        filtered = BugReport.objects.filter(status=Status.OPEN)
+        assert pagination.estimated_count(filtered, 10) == (40_000, False)
+
+    def test_underestimate_is_capped(self, user, monkeypatch, make_bug):
+        """Test that a planner underestimate costs at most a capped count."""
+        for n in range(5):
+            make_bug(user, f'Counted bug {n}')
+        monkeypatch.setattr(pagination, 'planner_estimate', lambda queryset: 1)
+
+        filtered = BugReport.objects.filter(status=Status.OPEN)
+        assert pagination.estimated_count(filtered, 3) == (4, False)
+
+    def test_never_analysed_table(self, user, monkeypatch, make_bug):
+        """Test that a table without statistics is counted."""
+        make_bug(user, 'Counted bug')
+        monkeypatch.setattr(pagination, 'table_estimate', lambda model, using: None)
+
+        assert pagination.estimated_count(BugReport.objects.all(), 10) == (1, True)
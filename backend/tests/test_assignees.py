@@ -0,0 +1,118 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from bugs.models import Project, ProjectMembership
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestAssigneesAndWatchers:
+    """Tests for the assignee and watcher relations."""
+
+    def test_create_with_assignees_and_watchers(self, client_for, user, other_user):
+        response = client_for(user).post(reverse('bug-list'), {
+            'title': 'Checkout total is wrong',
+            'description': 'Discounts are applied twice.',
+            'assignees': [other_user.pk],
+            'watchers': [user.pk, other_user.pk],
+        }, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [u['username'] for u in response.data['assignees']] == ['otheruser']
+        assert {u['username'] for u in response.data['watchers']} == {'testuser', 'otheruser'}
+
+    def test_assignee_can_see_and_edit(self, client_for, user, other_user, make_bug):
+        """Test that assignees can work on bugs they do not own."""
+        bug = make_bug(other_user)
+        bug.assignees.add(user)
+        url = reverse('bug-detail', kwargs={'pk': bug.pk})
+
+        response = client_for(user).patch(url, {'status': 'in_progress'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert client_for(user).delete(url).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_watcher_can_only_view(self, client_for, user, other_user, make_bug):
+        bug = make_bug(other_user)
+        bug.watchers.add(user)
+        url = reverse('bug-detail', kwargs={'pk': bug.pk})
+
+        assert client_for(user).get(url).status_code == status.HTTP_200_OK
+        assert client_for(user).patch(url, {'status': 'closed'}).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_only_owner_can_add_outsiders(self, client_for, user, other_user, make_bug):
+        """Test that an assignee cannot share the bug report with someone outside it."""
+        outsider = User.objects.create_user('outsider', 'outsider@example.com', 'testpass123')
+        bug = make_bug(other_user)
+        bug.assignees.add(user)
+        url = reverse('bug-detail', kwargs={'pk': bug.pk})
+
+        response = client_for(user).patch(url, {'watchers': [outsider.pk]}, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'watchers' in response.data
+        assert client_for(outsider).get(url).status_code == status.HTTP_404_NOT_FOUND
+        response = client_for(other_user).patch(url, {'watchers': [outsider.pk]}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_members_can_add_project_members(self, client_for, user, other_user, make_bug):
+        """Test that people on the bug report's project can be assigned by any member."""
+        project = Project.objects.create(name='Checkout')
+        colleague = User.objects.create_user('colleague', 'colleague@example.com', 'testpass123')
+        ProjectMembership.objects.bulk_create([
+            ProjectMembership(project=project, user=member) for member in (user, colleague)
+        ])
+        bug = make_bug(other_user, project=project)
+        url = reverse('bug-detail', kwargs={'pk': bug.pk})
+
+        response = client_for(user).patch(url, {'assignees': [colleague.pk]}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert list(bug.assignees.all()) == [colleague]
+
+    def test_filter_by_assignee_and_watcher(self, client_for, user, other_user, make_bug):
+        assigned, watched, untouched = [make_bug(user) for _ in range(3)]
+        assigned.assignees.add(other_user)
+        watched.watchers.add(user)
+        client = client_for(user)
+
+        response = client.get(reverse('bug-list'), {'assignee': other_user.pk})
+        assert [b['id'] for b in response.data['results']] == [str(assigned.pk)]
+
+        response = client.get(reverse('bug-list'), {'watched_by': 'me'})
+        assert [b['id'] for b in response.data['results']] == [str(watched.pk)]
+
+    @pytest.mark.parametrize('value', ['²', '٣', 'someone'])
+    def test_non_numeric_user_matches_nothing(self, authenticated_client, user, make_bug, value):
+        """Test that user ids other than ASCII digits match nothing rather than failing."""
+        make_bug(user).assignees.add(user)
+
+        response = authenticated_client.get(reverse('bug-list'), {'assignee': value})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'] == []
+
+    def test_list_query_count_is_constant(self, client_for, user, other_user, make_bug):
+        """Test that a page of bugs costs the same queries as a single bug."""
+        client = client_for(user)
+
+        def list_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(reverse('bug-list'))
+            assert response.status_code == status.HTTP_200_OK
+            return len(queries)
+
+        make_bug(user).assignees.add(other_user)
+        baseline = list_queries()
+
+        extra = User.objects.create_user('thirduser', 'third@example.com', 'ThirdPass123!')
+        for bug in [make_bug(user, f'Bug report {n}') for n in range(60)]:
+            bug.assignees.add(other_user, extra)
+            bug.watchers.add(user)
+
+        assert list_queries() == baseline
@@ -0,0 +1,171 @@
+import hashlib
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework import status
+
+from bugs.attachments import purge_orphan_blobs
+from bugs.models import Attachment, Blob, BugReport, Comment
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def upload(client, bug, content, name='app.log', content_type='text/plain'):
+    return client.post(
+        reverse('bug-attachment-list', kwargs={'bug_pk': bug.pk}),
+        {'file': SimpleUploadedFile(name, content, content_type=content_type)},
+        format='multipart'
+    )
+
+
+@pytest.mark.django_db
+class TestComments:
+    """Tests for comments on bug reports."""
+
+    def test_create_and_list(self, authenticated_client, bug_report):
+        url = reverse('bug-comment-list', kwargs={'bug_pk': bug_report.pk})
+
+        response = authenticated_client.post(url, {'body': 'Reproduced on staging.'})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['author']['username'] == 'testuser'
+        assert authenticated_client.get(url).data['results'][0]['body'] == 'Reproduced on staging.'
+
+    def test_keyset_pagination_walks_all_comments(self, authenticated_client, user, bug_report):
+        """Test that following the cursor returns every comment once, in order."""
+        Comment.objects.bulk_create(
+            [Comment(bug=bug_report, author=user, body=f'Comment {n}') for n in range(7)]
+        )
+        url = reverse('bug-comment-list', kwargs={'bug_pk': bug_report.pk})
+        bodies = []
+        response = authenticated_client.get(url, {'page_size': 3})
+        while True:
+            bodies.extend(comment['body'] for comment in response.data['results'])
+            if not response.data['next']:
+                break
+            response = authenticated_client.get(response.data['next'])
+
+        assert bodies == [f'Comment {n}' for n in range(7)]
+        assert 'count' not in response.data
+
+    def test_invisible_bug_is_404(self, authenticated_client, other_user):
+        bug = BugReport.objects.create(
+            title='Someone else', description='Not visible to testuser.', created_by=other_user
+        )
+
+        response = authenticated_client.get(reverse('bug-comment-list', kwargs={'bug_pk': bug.pk}))
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_watchers_cannot_comment(self, authenticated_client, user, other_user):
+        """Test that watching a bug report allows reading its comments but not adding one."""
+        bug = BugReport.objects.create(
+            title='Someone else', description='Watched by testuser.', created_by=other_user
+        )
+        bug.watchers.add(user)
+        url = reverse('bug-comment-list', kwargs={'bug_pk': bug.pk})
+
+        assert authenticated_client.get(url).status_code == status.HTTP_200_OK
+        assert authenticated_client.post(url, {'body': 'Drive-by'}).status_code == status.HTTP_403_FORBIDDEN
+        bug.assignees.add(user)
+        assert authenticated_client.post(url, {'body': 'On it.'}).status_code == status.HTTP_201_CREATED
+
+    def test_only_author_can_delete(self, authenticated_client, other_user, bug_report):
+        comment = Comment.objects.create(bug=bug_report, author=other_user, body='Mine')
+
+        response = authenticated_client.delete(
+            reverse('bug-comment-detail', kwargs={'bug_pk': bug_report.pk, 'pk': comment.pk})
+        )
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestAttachments:
+    """Tests for attachment upload, deduplication and download."""
+
+    def test_upload_records_hash_and_size(self, authenticated_client, bug_report):
+        content = b'Traceback (most recent call last):\n' * 100
+
+        response = upload(authenticated_client, bug_report, content)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['filename'] == 'app.log'
+        assert response.data['size'] == len(content)
+        assert response.data['sha256'] == hashlib.sha256(content).hexdigest()
+
+    def test_watchers_cannot_upload(self, authenticated_client, user, other_user):
+        bug = BugReport.objects.create(
+            title='Someone else', description='Watched by testuser.', created_by=other_user
+        )
+        bug.watchers.add(user)
+
+        response = upload(authenticated_client, bug, b'log line')
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert not Attachment.objects.exists()
+
+    def test_identical_content_is_stored_once(self, authenticated_client, bug_report, media_root):
+        """Test that two uploads of the same file share one blob on disk."""
+        upload(authenticated_client, bug_report, b'same bytes', name='first.log')
+        upload(authenticated_client, bug_report, b'same bytes', name='second.log')
+
+        assert Attachment.objects.count() == 2
+        assert Blob.objects.count() == 1
+        assert len([p for p in media_root.rglob('*') if p.is_file()]) == 1
+
+    def test_download_streams_file(self, authenticated_client, bug_report):
+        content = b'\x89PNG' + bytes(range(256)) * 1000
+        data = upload(
+            authenticated_client, bug_report, content, name='shot.png', content_type='image/png'
+        ).data
+
+        response = authenticated_client.get(data['download_url'])
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert b''.join(response.streaming_content) == content
+        assert response['Content-Type'] == 'image/png'
+        assert 'filename="shot.png"' in response['Content-Disposition']
+
+        cached = authenticated_client.get(data['download_url'], HTTP_IF_NONE_MATCH=response['ETag'])
+        assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_sendfile_header(self, authenticated_client, settings, bug_report):
+        """Test that downloads can be delegated to the front-end server."""
+        settings.ATTACHMENT_SENDFILE_HEADER = 'X-Accel-Redirect'
+        data = upload(authenticated_client, bug_report, b'log line').data
+
+        response = authenticated_client.get(data['download_url'])
+
+        assert response['X-Accel-Redirect'] == f"/protected-media/blobs/{data['sha256'][:2]}/{data['sha256']}"
+        assert response.content == b''
+
+    def test_rejects_oversized_upload(self, authenticated_client, settings, bug_report):
+        settings.ATTACHMENT_MAX_SIZE = 10
+
+        response = upload(authenticated_client, bug_report, b'x' * 100)
+
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        assert not Blob.objects.exists()
+
+    def test_deleting_last_reference_purges_blob(self, authenticated_client, bug_report, media_root,
+                                                  django_capture_on_commit_callbacks):
+        data = upload(authenticated_client, bug_report, b'only copy').data
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = authenticated_client.delete(
+                reverse('bug-attachment-detail', kwargs={'bug_pk': bug_report.pk, 'pk': data['id']})
+            )
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        with django_capture_on_commit_callbacks(execute=True):
+            purge_orphan_blobs([{}])
+
+        assert not Blob.objects.exists()
+        assert not [p for p in media_root.rglob('*') if p.is_file()]
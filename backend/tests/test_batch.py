@@ -0,0 +1,70 @@
+import uuid
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from bugs.models import BugReport
+
+
+@pytest.fixture
+def bugs(user):
+    return BugReport.objects.bulk_create([
+        BugReport(title=f'Batch bug {n}', description='Fetched in a batch.', created_by=user)
+        for n in range(5)
+    ])
+
+
+@pytest.mark.django_db
+class TestBatchRetrieve:
+    """Tests for retrieving many bug reports by id."""
+
+    def test_returns_results_in_request_order(self, authenticated_client, bugs):
+        ids = [bugs[3].pk, bugs[0].pk, bugs[4].pk]
+
+        response = authenticated_client.get(reverse('bug-batch'), {'ids': ','.join(map(str, ids))})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [bug['id'] for bug in response.data['results']] == [str(pk) for pk in ids]
+
+    def test_marks_missing_and_invisible_ids(self, authenticated_client, bugs, other_user):
+        hidden = BugReport.objects.create(
+            title='Not yours', description='Owned by another user.', created_by=other_user
+        )
+        missing = uuid.uuid4()
+
+        ids = f'{missing},{bugs[1].pk},{hidden.pk}'
+        response = authenticated_client.get(reverse('bug-batch'), {'ids': ids})
+
+        results = response.data['results']
+        assert results[0] == {'id': missing, 'error': 'not_found'}
+        assert results[1]['title'] == 'Batch bug 1'
+        assert results[2] == {'id': hidden.pk, 'error': 'not_found'}
+
+    def test_post_for_long_lists(self, authenticated_client, bugs):
+        ids = [str(bug.pk) for bug in bugs] * 2
+
+        response = authenticated_client.post(reverse('bug-batch'), {'ids': ids}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [bug['id'] for bug in response.data['results']] == ids[:5]
+
+    def test_query_count_does_not_depend_on_batch_size(self, authenticated_client, bugs):
+        def batch_queries(ids):
+            with CaptureQueriesContext(connection) as queries:
+                authenticated_client.get(reverse('bug-batch'), {'ids': ','.join(map(str, ids))})
+            return len(queries)
+
+        assert batch_queries([bugs[0].pk]) == batch_queries([bug.pk for bug in bugs])
+
+    def test_validates_ids(self, authenticated_client, settings, bugs):
+        settings.BUG_BATCH_MAX_IDS = 2
+
+        assert authenticated_client.get(reverse('bug-batch'), {'ids': 'not-a-uuid'}).status_code == 400
+        assert authenticated_client.get(reverse('bug-batch')).status_code == 400
+        ids = ','.join(str(bug.pk) for bug in bugs)
+        response = authenticated_client.get(reverse('bug-batch'), {'ids': ids})
+        assert response.status_code == 400
+        assert 'ids' in response.data
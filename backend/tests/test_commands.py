@@ -0,0 +1,53 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count
+
+from bugs.models import BugReport, Severity, Status
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestSeedBugsCommand:
+    """Tests for the synthetic data generator."""
+
+    def test_seeds_users_and_bugs(self):
+        """Test that the requested number of users and bugs are created."""
+        call_command('seed_bugs', users=5, bugs=500, batch_size=200, stdout=StringIO())
+
+        assert User.objects.filter(username__startswith='bench_user_').count() == 5
+        assert BugReport.objects.count() == 500
+        bug = BugReport.objects.first()
+        assert bug.severity in Severity.values
+        assert bug.status in Status.values
+        assert len(bug.description) >= 10
+        assert all(tag == tag.lower() for tag in bug.tags)
+
+    def test_owner_distribution_is_skewed(self):
+        """Test that the first user owns the largest backlog."""
+        call_command('seed_bugs', users=10, bugs=1000, stdout=StringIO())
+
+        counts = list(
+            BugReport.objects.values('created_by__username')
+            .annotate(n=Count('id'))
+            .order_by('-n')
+            .values_list('created_by__username', flat=True)
+        )
+        assert counts[0] == 'bench_user_00000'
+
+    def test_seeded_user_can_log_in(self):
+        """Test that seeded users share the documented benchmark password."""
+        call_command('seed_bugs', users=1, bugs=1, stdout=StringIO())
+
+        assert User.objects.get(username='bench_user_00000').check_password('BenchmarkPass123!')
+
+    def test_rerun_reuses_users(self):
+        """Test that seeding twice adds bugs without duplicating users."""
+        call_command('seed_bugs', users=2, bugs=10, stdout=StringIO())
+        call_command('seed_bugs', users=2, bugs=10, seed=1, stdout=StringIO())
+
+        assert User.objects.filter(username__startswith='bench_user_').count() == 2
+        assert BugReport.objects.count() == 20
@@ -0,0 +1,110 @@
+import gzip
+import json
+
+import pytest
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+
+from bugs.compression import choose_encoding, precompress
+from bugs.middleware import CompressionMiddleware
+from bugs.models import BugReport
+
+PAYLOAD = {'results': [{'title': f'Checkout fails for order {n}', 'status': 'open'} for n in range(200)]}
+
+
+def run(response, accept_encoding='gzip'):
+    request = RequestFactory().get('/api/bugs/', HTTP_ACCEPT_ENCODING=accept_encoding)
+    return CompressionMiddleware(lambda request: response)(request)
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('gzip', 'gzip'),
+    ('gzip, br, zstd', 'zstd'),
+    ('br;q=1.0, zstd;q=0.5, gzip;q=0.8', 'br'),
+    ('*', 'zstd'),
+    ('*, zstd;q=0', 'br'),
+    ('identity', None),
+    ('gzip;q=0', None),
+    ('', None),
+])
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header, ['zstd', 'br', 'gzip']) == expected
+
+
+class TestCompressionMiddleware:
+    """Tests for response compression."""
+
+    def test_compresses_json_with_gzip(self):
+        response = run(JsonResponse(PAYLOAD))
+
+        assert response['Content-Encoding'] == 'gzip'
+        assert response['Vary'] == 'Accept-Encoding'
+        assert int(response['Content-Length']) == len(response.content)
+        assert json.loads(gzip.decompress(response.content)) == PAYLOAD
+
+    def test_prefers_zstd_and_brotli(self):
+        zstandard = pytest.importorskip('zstandard')
+        brotli = pytest.importorskip('brotli')
+
+        response = run(JsonResponse(PAYLOAD), 'gzip, br, zstd')
+        assert response['Content-Encoding'] == 'zstd'
+        assert json.loads(zstandard.ZstdDecompressor().decompressobj().decompress(response.content)) == PAYLOAD
+
+        response = run(JsonResponse(PAYLOAD), 'gzip, br')
+        assert response['Content-Encoding'] == 'br'
+        assert json.loads(brotli.decompress(response.content)) == PAYLOAD
+
+    def test_leaves_small_and_unlisted_responses_alone(self):
+        assert not run(JsonResponse({'ok': True})).has_header('Content-Encoding')
+        assert not run(HttpResponse(b'x' * 5000, content_type='image/png')).has_header('Content-Encoding')
+        assert not run(JsonResponse(PAYLOAD), 'identity').has_header('Content-Encoding')
+
+    def test_leaves_html_alone(self):
+        """Test that HTML pages, which carry CSRF tokens, are never compressed."""
+        response = run(HttpResponse(b'<p>csrf</p>' * 500, content_type='text/html; charset=utf-8'))
+
+        assert not response.has_header('Content-Encoding')
+
+    def test_streaming_is_flushed_per_chunk(self):
+        """Test that each streamed row is decodable as soon as it arrives."""
+        rows = [json.dumps(row).encode() + b'\n' for row in PAYLOAD['results']]
+        response = run(StreamingHttpResponse(iter(rows), content_type='application/x-ndjson'))
+
+        assert response['Content-Encoding'] == 'gzip'
+        chunks = list(response.streaming_content)
+        assert len(chunks) == len(rows) + 1
+        assert gzip.decompress(b''.join(chunks)) == b''.join(rows)
+
+    def test_uses_precompressed_variant(self):
+        content = json.dumps(PAYLOAD).encode()
+        response = HttpResponse(content, content_type='application/json')
+        response.precompressed = precompress(content, ['gzip'])
+        response['ETag'] = '"abc"'
+
+        response = run(response)
+
+        assert response.content == response.precompressed['gzip']
+        assert response['ETag'] == 'W/"abc"'
+
+    def test_skips_file_responses(self, tmp_path):
+        path = tmp_path / 'export.json'
+        path.write_text(json.dumps(PAYLOAD))
+
+        with path.open('rb') as file:
+            response = run(FileResponse(file, content_type='application/json'))
+
+        assert not response.has_header('Content-Encoding')
+
+
+@pytest.mark.django_db
+def test_api_list_is_compressed(authenticated_client, user):
+    BugReport.objects.bulk_create([
+        BugReport(title=f'Bug report {n}', description='A reasonably long description. ' * 10,
+                  created_by=user)
+        for n in range(20)
+    ])
+    response = authenticated_client.get(reverse('bug-list'), HTTP_ACCEPT_ENCODING='gzip')
+
+    assert response['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(response.content))['count'] == 20
@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+
+from bugs import events
+from bugs.models import BugReport, Project, ProjectMembership, Team, TeamMembership
+from bugs.events import Broker
+from bugs.views import _event_stream
+
+User = get_user_model()
+
+
+class TestBroker:
+    """Tests for the in-process event broker."""
+
+    def test_publish_reaches_only_the_users_subscriptions(self):
+        """Test that events fan out to every tab of one user only."""
+        async def scenario():
+            broker = Broker()
+            first_tab = broker.subscribe(1)
+            second_tab = broker.subscribe(1)
+            other_user = broker.subscribe(2)
+            delivered = broker.publish(1, {'type': 'bug.created', 'id': 'x'})
+            await asyncio.sleep(0)
+            return delivered, first_tab, second_tab, other_user
+
+        delivered, first_tab, second_tab, other_user = asyncio.run(scenario())
+
+        assert delivered == 2
+        assert first_tab.queue.qsize() == 1
+        assert second_tab.queue.qsize() == 1
+        assert other_user.queue.empty()
+
+    def test_unsubscribe(self):
+        """Test that closed streams stop receiving events."""
+        async def scenario():
+            broker = Broker()
+            subscription = broker.subscribe(1)
+            broker.unsubscribe(subscription)
+            return broker.publish(1, {'type': 'bug.created'}), broker.subscriber_count()
+
+        assert asyncio.run(scenario()) == (0, 0)
+
+    def test_slow_client_keeps_latest_messages(self):
+        """Test that a full queue drops the oldest message."""
+        async def scenario():
+            broker = Broker(queue_size=2)
+            subscription = broker.subscribe(1)
+            for n in range(3):
+                broker.publish(1, {'n': n})
+            await asyncio.sleep(0)
+            return [subscription.queue.get_nowait()['n'] for _ in range(2)]
+
+        assert asyncio.run(scenario()) == [1, 2]
+
+    def test_event_stream_format(self):
+        """Test the Server-Sent Events framing of a message."""
+        async def scenario():
+            subscription = events.broker.subscribe(1)
+            stream = _event_stream(subscription, heartbeat=1)
+            chunks = [await stream.__anext__()]
+            events.broker.publish(1, {'type': 'bug.updated', 'id': 'abc'})
+            chunks.append(await stream.__anext__())
+            await stream.aclose()
+            return chunks
+
+        retry, message = asyncio.run(scenario())
+
+        assert retry == 'retry: 5000\n\n'
+        assert message == 'event: bug.updated\ndata: {"type": "bug.updated", "id": "abc"}\n\n'
+        assert events.broker.subscriber_count() == 0
+
+
+@pytest.mark.django_db
+class TestBugEventPublishing:
+    """Tests for events published by the bug report endpoints."""
+
+    def test_create_publishes_event(
+        self, authenticated_client, user, published, django_capture_on_commit_callbacks
+    ):
+        """Test that creating a bug notifies the owner."""
+        data = {'title': 'New Bug Report', 'description': 'This is a new bug description.'}
+        with django_capture_on_commit_callbacks(execute=True):
+            response = authenticated_client.post(reverse('bug-list'), data, format='json')
+
+        assert published == [(user.pk, {'type': 'bug.created', 'id': response.data['id']})]
+
+    def test_update_and_delete_publish_events(
+        self, authenticated_client, user, bug_report, published,
+        django_capture_on_commit_callbacks
+    ):
+        """Test that updates and deletes notify the owner."""
+        url = reverse('bug-detail', kwargs={'pk': bug_report.id})
+        with django_capture_on_commit_callbacks(execute=True):
+            authenticated_client.patch(url, {'status': 'resolved'}, format='json')
+            authenticated_client.delete(url)
+
+        assert [message['type'] for _, message in published] == ['bug.updated', 'bug.deleted']
+        assert all(user_id == user.pk for user_id, _ in published)
+
+    def test_everyone_who_can_see_the_bug_is_notified(
+        self, authenticated_client, user, other_user, bug_report, published,
+        django_capture_on_commit_callbacks
+    ):
+        """Test that assignees, watchers and project members get updates and deletes."""
+        people = [User.objects.create_user(f'person{n}') for n in range(4)]
+        assignee, watcher, member, team_member = people
+        team = Team.objects.create(name='Payments')
+        TeamMembership.objects.create(team=team, user=team_member)
+        project = Project.objects.create(name='Checkout', team=team)
+        ProjectMembership.objects.create(project=project, user=member)
+        BugReport.objects.filter(pk=bug_report.pk).update(project=project)
+        bug_report.assignees.add(assignee)
+        bug_report.watchers.add(watcher)
+        url = reverse('bug-detail', kwargs={'pk': bug_report.id})
+
+        with django_capture_on_commit_callbacks(execute=True):
+            authenticated_client.patch(url, {'status': 'resolved'}, format='json')
+            authenticated_client.delete(url)
+
+        everyone = {user.pk, *(person.pk for person in people)}
+        for event_type in ('bug.updated', 'bug.deleted'):
+            assert {user_id for user_id, message in published if message['type'] == event_type} == everyone
+        assert other_user.pk not in {user_id for user_id, _ in published}
+
+    def test_no_event_before_commit(self, authenticated_client, bug_report, published):
+        """Test that events wait for the transaction to commit."""
+        authenticated_client.patch(
+            reverse('bug-detail', kwargs={'pk': bug_report.id}),
+            {'status': 'resolved'},
+            format='json'
+        )
+
+        assert published == []
+
+    def test_postgres_notifies_in_one_statement(self, settings):
+        """Test that many events go through pg_notify with a single statement."""
+        settings.BUG_EVENTS_BACKEND = 'postgres'
+        messages = [(user_id, {'type': 'bug.updated', 'id': str(user_id)}) for user_id in range(10)]
+
+        with CaptureQueriesContext(connection) as queries:
+            events._send(messages)
+
+        assert len(queries) == 1
+
+    def test_stream_requires_authentication(self, client):
+        """Test that the event stream rejects anonymous clients."""
+        response = client.get(reverse('bug-events'))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_stream_rejects_invalid_token(self, client):
+        """Test that the event stream rejects invalid query tokens."""
+        response = client.get(reverse('bug-events'), {'token': 'not-a-token'})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
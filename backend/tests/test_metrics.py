@@ -0,0 +1,86 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from bugs import metrics
+
+
+@pytest.fixture
+def metrics_enabled(settings):
+    settings.REQUEST_METRICS_ENABLED = True
+    for histogram in metrics.HISTOGRAMS:
+        histogram.clear()
+    yield
+    for histogram in metrics.HISTOGRAMS:
+        histogram.clear()
+
+
+class TestHistogram:
+    """Tests for the Prometheus histogram."""
+
+    def test_render_cumulative_buckets(self):
+        """Test that buckets are rendered cumulatively with sum and count."""
+        histogram = metrics.Histogram('latency', 'Latency.', ('endpoint',), (0.1, 1.0))
+        histogram.observe(('bug-list',), 0.05)
+        histogram.observe(('bug-list',), 0.5)
+        histogram.observe(('bug-list',), 5)
+
+        assert histogram.render() == [
+            '# HELP latency Latency.',
+            '# TYPE latency histogram',
+            'latency_bucket{endpoint="bug-list",le="0.1"} 1',
+            'latency_bucket{endpoint="bug-list",le="1.0"} 2',
+            'latency_bucket{endpoint="bug-list",le="+Inf"} 3',
+            'latency_sum{endpoint="bug-list"} 5.55',
+            'latency_count{endpoint="bug-list"} 3',
+        ]
+
+
+@pytest.mark.django_db
+class TestRequestMetrics:
+    """Tests for the request metrics middleware and endpoint."""
+
+    def test_server_timing_header(self, metrics_enabled, authenticated_client, bug_report):
+        """Test that responses report total, database and serializer time."""
+        response = authenticated_client.get(reverse('bug-list'))
+
+        timing = response['Server-Timing']
+        assert timing.startswith('total;dur=')
+        assert 'db;dur=' in timing
+        assert 'ser;dur=' in timing
+
+    def test_metrics_labelled_by_viewset_action(
+        self, metrics_enabled, authenticated_client, bug_report
+    ):
+        """Test that histograms are labelled with endpoint and action."""
+        authenticated_client.get(reverse('bug-detail', kwargs={'pk': bug_report.id}))
+
+        response = authenticated_client.get(reverse('metrics'))
+        body = response.content.decode()
+
+        assert response.status_code == status.HTTP_200_OK
+        labels = 'endpoint="bug-detail",action="retrieve",method="GET",status="200"'
+        assert f'http_request_duration_seconds_count{{{labels}}} 1' in body
+        assert f'http_request_db_queries_count{{{labels}}} 1' in body
+        assert f'http_response_size_bytes_count{{{labels}}} 1' in body
+
+    def test_scrapers_are_restricted(self, metrics_enabled, client, settings):
+        """Test that only allowed addresses or the metrics token may scrape."""
+        settings.REQUEST_METRICS_TOKEN = 'scrape-secret'
+        url = reverse('metrics')
+        outside = {'REMOTE_ADDR': '203.0.113.7'}
+
+        assert client.get(url).status_code == status.HTTP_200_OK
+        assert client.get(url, **outside).status_code == status.HTTP_403_FORBIDDEN
+        wrong = client.get(url, HTTP_AUTHORIZATION='Bearer guess', **outside)
+        assert wrong.status_code == status.HTTP_403_FORBIDDEN
+        right = client.get(url, HTTP_AUTHORIZATION='Bearer scrape-secret', **outside)
+        assert right.status_code == status.HTTP_200_OK
+
+    def test_disabled_by_default(self, authenticated_client, bug_report):
+        """Test that nothing is recorded or exposed when disabled."""
+        response = authenticated_client.get(reverse('bug-list'))
+        assert 'Server-Timing' not in response
+
+        response = authenticated_client.get(reverse('metrics'))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
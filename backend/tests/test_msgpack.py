@@ -0,0 +1,61 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from bugs.models import BugReport
+from bugs.renderers import packb, unpackb
+
+MSGPACK = 'application/msgpack'
+
+
+def test_round_trips_uuids_and_datetimes():
+    value = {'id': uuid.uuid4(), 'at': datetime.fromisoformat('2024-05-01T12:30:00.123456+00:00')}
+
+    assert unpackb(packb(value)) == value
+    # 16 bytes plus ext header, against 36 characters as a string.
+    assert len(packb(value['id'])) == 18
+
+
+@pytest.mark.django_db
+class TestMessagePackApi:
+    """Tests for the MessagePack renderer and parser."""
+
+    def test_list_in_msgpack(self, authenticated_client, bug_report):
+        response = authenticated_client.get(reverse('bug-list'), HTTP_ACCEPT=MSGPACK)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == MSGPACK
+        bug = unpackb(response.content)['results'][0]
+        assert bug['id'] == bug_report.pk
+        assert bug['created_at'] == bug_report.created_at
+        assert bug['created_by']['username'] == 'testuser'
+
+    def test_json_stays_the_default(self, authenticated_client, bug_report):
+        response = authenticated_client.get(reverse('bug-list'))
+
+        assert response['Content-Type'] == 'application/json'
+        assert response.json()['results'][0]['id'] == str(bug_report.pk)
+
+    def test_create_from_msgpack_body(self, authenticated_client):
+        body = packb({
+            'title': 'Binary client bug',
+            'description': 'Sent by an internal service.',
+            'tags': ['ingest'],
+        })
+
+        response = authenticated_client.post(
+            reverse('bug-list'), body, content_type=MSGPACK, HTTP_ACCEPT=MSGPACK
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        created = unpackb(response.content)
+        assert isinstance(created['id'], uuid.UUID)
+        assert BugReport.objects.get(pk=created['id']).tags == ['ingest']
+
+    def test_malformed_body_is_400(self, authenticated_client):
+        response = authenticated_client.post(reverse('bug-list'), b'\xc1', content_type=MSGPACK)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,126 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from bugs import pagination
+from bugs.models import BugReport, Severity, Status
+
+
+@pytest.fixture
+def bugs(user):
+    return BugReport.objects.bulk_create([
+        BugReport(
+            title=f'Paginated bug {n}', description='Found while paging through results.',
+            severity=Severity.LOW, status=Status.OPEN, created_by=user,
+        )
+        for n in range(5)
+    ])
+
+
+@pytest.fixture(autouse=True)
+def small_pages(settings, monkeypatch):
+    monkeypatch.setattr(pagination.ApproximateCountPagination, 'page_size', 2)
+    settings.APPROXIMATE_COUNT_THRESHOLD = 3
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def estimates(monkeypatch):
+    """Make the planner estimate 1000 rows, counting the estimates."""
+    calls = []
+
+    def estimate(queryset):
+        calls.append(1)
+        return 1000
+
+    monkeypatch.setattr(pagination, 'planner_estimate', estimate)
+    return calls
+
+
+@pytest.mark.django_db
+class TestApproximateCountPagination:
+    """Tests for bug report lists with approximate counts."""
+
+    def test_exact_below_threshold(self, authenticated_client, bugs, settings):
+        """Test that results within the threshold are counted exactly."""
+        settings.APPROXIMATE_COUNT_THRESHOLD = 10
+
+        response = authenticated_client.get('/api/bugs/')
+
+        assert response.data['count'] == 5
+        assert response.data['approximate'] is False
+        assert len(response.data['results']) == 2
+
+    def test_estimate_above_threshold(self, authenticated_client, bugs, estimates):
+        """Test that large results take the planner's estimate."""
+        response = authenticated_client.get('/api/bugs/')
+
+        assert response.data['count'] == 1000
+        assert response.data['approximate'] is True
+
+    def test_estimate_never_below_counted(self, authenticated_client, bugs, monkeypatch):
+        """Test that a planner underestimate gives way to the rows already counted."""
+        monkeypatch.setattr(pagination, 'planner_estimate', lambda queryset: 2)
+
+        response = authenticated_client.get('/api/bugs/')
+
+        assert response.data['count'] == 4
+        assert response.data['approximate'] is True
+
+    def test_overestimate_is_not_used(self, authenticated_client, bugs, settings, estimates):
+        """Test that small results are counted whatever the planner thinks."""
+        settings.APPROXIMATE_COUNT_THRESHOLD = 10
+
+        assert authenticated_client.get('/api/bugs/').data['count'] == 5
+        assert estimates == []
+
+    def test_estimate_is_cached(self, authenticated_client, bugs, estimates):
+        """Test that paging through the same results estimates once."""
+        authenticated_client.get('/api/bugs/')
+        authenticated_client.get('/api/bugs/?page=2')
+        authenticated_client.get('/api/bugs/?ordering=title')
+        authenticated_client.get('/api/bugs/?severity=low')
+
+        assert len(estimates) == 2
+
+    def test_skip_count(self, authenticated_client, bugs):
+        """Test that count=false runs no count and still links the pages."""
+        with CaptureQueriesContext(connection) as queries:
+            response = authenticated_client.get('/api/bugs/?count=false')
+
+        assert 'count' not in response.data
+        assert 'approximate' not in response.data
+        assert not any('COUNT(' in query['sql'] or 'EXPLAIN' in query['sql'] for query in queries)
+        assert 'count=false' in response.data['next']
+
+    def test_links_without_count(self, authenticated_client, bugs):
+        """Test that next and previous follow the rows, not the count."""
+        pages = [authenticated_client.get(f'/api/bugs/?count=false&page={n}').data for n in (1, 2, 3)]
+
+        assert [len(page['results']) for page in pages] == [2, 2, 1]
+        assert pages[0]['previous'] is None
+        assert pages[1]['next'] and pages[1]['previous']
+        assert pages[2]['next'] is None
+
+    @pytest.mark.parametrize('page', ['4', '0', 'last', 'x'])
+    def test_invalid_page(self, authenticated_client, bugs, page):
+        """Test that pages past the results or not numbers are 404s."""
+        assert authenticated_client.get(f'/api/bugs/?page={page}').status_code == 404
+
+    def test_empty_results(self, authenticated_client):
+        """Test that an empty list is still a page."""
+        response = authenticated_client.get('/api/bugs/')
+
+        assert response.status_code == 200
+        assert response.data['count'] == 0
+        assert response.data['results'] == []
+
+    def test_filter_that_matches_nothing(self, authenticated_client, bugs):
+        """Test that a filter resolving to no query at all counts as zero."""
+        response = authenticated_client.get('/api/bugs/', {'assignee': 'nobody'})
+
+        assert response.status_code == 200
+        assert response.data['count'] == 0
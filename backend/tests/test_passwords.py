@@ -0,0 +1,84 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+from rest_framework import status
+
+from bugs.password_validation import CompactCommonPasswordValidator, CompactPasswordSet
+
+User = get_user_model()
+
+
+class TestCompactPasswordSet:
+    """Tests for the digest-based common password list."""
+
+    def test_membership(self):
+        passwords = CompactPasswordSet(['password', 'letmein'])
+        assert 'password' in passwords
+        assert 'letmein' in passwords
+        assert 'correct-horse-battery' not in passwords
+        assert len(passwords) == 2
+
+    def test_validator_shares_one_list(self):
+        """Test that validators reuse the list loaded for the process."""
+        first = CompactCommonPasswordValidator()
+        second = CompactCommonPasswordValidator()
+        assert first.passwords is second.passwords
+        assert len(first.passwords) > 10000
+
+    def test_rejects_common_password(self):
+        with pytest.raises(ValidationError, match='too common'):
+            validate_password('password123')
+
+    def test_accepts_uncommon_password(self):
+        validate_password('Correct-Horse-Battery-42')
+
+
+@pytest.mark.django_db
+class TestPasswordHashing:
+    """Tests for the tunable hashers and rehash on login."""
+
+    def test_new_passwords_use_preferred_hasher(self, user):
+        """Test that new passwords are hashed with Argon2id by default."""
+        assert identify_hasher(user.password).algorithm == 'argon2'
+        assert 'm=19456,t=2,p=1' in user.password
+
+    def test_legacy_hash_upgraded_on_login(self, api_client, user):
+        """Test that a PBKDF2 hash is replaced on the next successful login."""
+        user.password = make_password('testpass123', hasher='pbkdf2_sha256')
+        user.save(update_fields=['password'])
+
+        response = api_client.post(
+            reverse('token-obtain-pair'),
+            {'username': 'testuser', 'password': 'testpass123'}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        user.refresh_from_db()
+        assert identify_hasher(user.password).algorithm == 'argon2'
+
+    def test_cost_change_rehashes_on_login(self, settings, api_client, user):
+        """Test that raising the configured cost upgrades stored hashes."""
+        settings.ARGON2_TIME_COST = 3
+        # Hashers are cached per process; changing the hasher list resets them.
+        settings.PASSWORD_HASHERS = list(settings.PASSWORD_HASHERS)
+
+        api_client.post(
+            reverse('token-obtain-pair'),
+            {'username': 'testuser', 'password': 'testpass123'}
+        )
+
+        user.refresh_from_db()
+        assert 't=3' in user.password
+
+    def test_scrypt_option(self, settings):
+        """Test that scrypt works with a work factor above OpenSSL's default memory cap."""
+        settings.SCRYPT_WORK_FACTOR = 2 ** 15
+        settings.PASSWORD_HASHERS = ['bugs.hashers.TunableScryptPasswordHasher']
+
+        user = User.objects.create_user('scryptuser', 'scrypt@example.com', 'testpass123')
+
+        assert user.password.startswith('scrypt$32768$')
+        assert user.check_password('testpass123')
@@ -0,0 +1,134 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from bugs.models import BugReport, Project, ProjectMembership, Team, TeamMembership
+
+User = get_user_model()
+
+
+@pytest.fixture
+def project(user, other_user):
+    """A project shared by both test users."""
+    project = Project.objects.create(name='Checkout')
+    ProjectMembership.objects.bulk_create([
+        ProjectMembership(project=project, user=user),
+        ProjectMembership(project=project, user=other_user),
+    ])
+    return project
+
+
+@pytest.mark.django_db
+class TestProjectVisibility:
+    """Tests for project and team scoped access to bug reports."""
+
+    def test_members_see_project_bugs(self, client_for, user, other_user, project, make_bug):
+        """Test that a project member sees bugs other members filed."""
+        shared = make_bug(other_user, project=project)
+        make_bug(other_user, title='Private bug report')
+
+        response = client_for(user).get(reverse('bug-list'))
+
+        assert [bug['id'] for bug in response.data['results']] == [str(shared.pk)]
+
+    def test_team_members_see_team_projects(self, client_for, user, other_user, make_bug):
+        """Test that team membership grants access to the team's projects."""
+        team = Team.objects.create(name='Payments')
+        TeamMembership.objects.create(team=team, user=user)
+        bug = make_bug(other_user, project=Project.objects.create(name='Billing', team=team))
+
+        response = client_for(user).get(reverse('bug-detail', kwargs={'pk': bug.pk}))
+
+        assert response.status_code == status.HTTP_200_OK
+        projects = client_for(user).get(reverse('project-list')).data['results']
+        assert [p['name'] for p in projects] == ['Billing']
+
+    def test_non_members_get_404(self, client_for, user, other_user, make_bug):
+        bug = make_bug(other_user, project=Project.objects.create(name='Internal'))
+
+        response = client_for(user).get(reverse('bug-detail', kwargs={'pk': bug.pk}))
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_members_can_edit_but_not_delete(self, client_for, user, other_user, project, make_bug):
+        """Test that only the owner may delete a shared bug report."""
+        bug = make_bug(other_user, project=project)
+        client = client_for(user)
+        url = reverse('bug-detail', kwargs={'pk': bug.pk})
+
+        assert client.patch(url, {'status': 'in_progress'}).status_code == status.HTTP_200_OK
+        assert client.delete(url).status_code == status.HTTP_403_FORBIDDEN
+        assert BugReport.objects.filter(pk=bug.pk).exists()
+
+    def test_only_owner_can_detach_from_project(self, client_for, user, other_user, project, make_bug):
+        """Test that a member cannot hide a shared bug report by removing its project."""
+        bug = make_bug(other_user, project=project)
+        url = reverse('bug-detail', kwargs={'pk': bug.pk})
+
+        response = client_for(user).patch(url, {'project': None}, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'project' in response.data
+        response = client_for(other_user).patch(url, {'project': None}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        bug.refresh_from_db()
+        assert bug.project_id is None
+
+    def test_only_owner_can_move_into_project(self, client_for, user, other_user, project, make_bug):
+        """Test that an assignee cannot share a private bug report with their project."""
+        colleague = User.objects.create_user('colleague', 'colleague@example.com', 'testpass123')
+        ProjectMembership.objects.create(project=project, user=colleague)
+        bug = make_bug(other_user)
+        bug.assignees.add(user)
+        url = reverse('bug-detail', kwargs={'pk': bug.pk})
+
+        response = client_for(user).patch(url, {'project': project.pk}, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'project' in response.data
+        assert client_for(colleague).get(url).status_code == status.HTTP_404_NOT_FOUND
+
+    def test_cannot_file_into_foreign_project(self, client_for, user):
+        foreign = Project.objects.create(name='Someone else')
+
+        response = client_for(user).post(reverse('bug-list'), {
+            'title': 'Sneaky bug report',
+            'description': 'Filed into a project I am not part of.',
+            'project': foreign.pk,
+        })
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'project' in response.data
+
+    def test_filter_by_project(self, client_for, user, project, make_bug):
+        make_bug(user, project=project)
+        make_bug(user, title='Private bug report')
+
+        response = client_for(user).get(reverse('bug-list'), {'project': project.pk})
+
+        assert response.data['count'] == 1
+
+    def test_query_count_does_not_grow_with_projects(self, client_for, user, other_user, make_bug):
+        """Test that listing costs the same queries for one project or many."""
+        projects = Project.objects.bulk_create([Project(name=f'P{n}') for n in range(50)])
+        client = client_for(user)
+
+        def list_queries():
+            with CaptureQueriesContext(connection) as queries:
+                client.get(reverse('bug-list'))
+            return len(queries)
+
+        ProjectMembership.objects.create(project=projects[0], user=user)
+        make_bug(other_user, project=projects[0])
+        baseline = list_queries()
+        ProjectMembership.objects.bulk_create(
+            [ProjectMembership(project=p, user=user) for p in projects[1:]]
+        )
+        for p in projects[1:10]:
+            make_bug(other_user, project=p)
+
+        assert list_queries() == baseline
+        assert client.get(reverse('bug-list')).data['count'] == 10
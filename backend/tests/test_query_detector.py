@@ -0,0 +1,68 @@
+import logging
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from bugs.models import BugReport
+from bugs.query_detector import QueryBudgetExceeded, QueryDetector, query_shape
+from bugs.views import BugReportViewSet
+
+
+@pytest.fixture
+def many_bugs(user):
+    return BugReport.objects.bulk_create([
+        BugReport(title=f'Bug number {n}', description='A bug description.', created_by=user)
+        for n in range(10)
+    ])
+
+
+class TestQueryShape:
+    """Tests for query shape normalisation."""
+
+    def test_placeholder_lists_collapse(self):
+        """Test that IN lists of any length share one shape."""
+        assert query_shape('SELECT 1 WHERE id IN (%s, %s)') == query_shape(
+            'SELECT 1 WHERE id IN (%s, %s, %s, %s)'
+        )
+
+    def test_whitespace_collapses(self):
+        assert query_shape('SELECT  1\n  FROM t') == 'SELECT 1 FROM t'
+
+
+@pytest.mark.django_db
+class TestQueryDetector:
+    """Tests for N+1 and slow query detection."""
+
+    def test_list_has_no_repeated_queries(self, authenticated_client, many_bugs):
+        """Test that listing many bugs loads their owners in one query."""
+        response = authenticated_client.get(reverse('bug-list'))
+        assert len(response.data['results']) == 10
+
+    def test_n_plus_one_fails_request(self, authenticated_client, many_bugs, monkeypatch):
+        """Test that a lazily loaded relation per row breaks the budget."""
+        monkeypatch.setattr(
+            BugReportViewSet, 'get_queryset',
+            lambda view: BugReport.objects.filter(created_by=view.request.user)
+        )
+        with pytest.raises(QueryBudgetExceeded, match='Possible N\\+1'):
+            authenticated_client.get(reverse('bug-list'))
+
+    @pytest.mark.query_budget(max_queries=1)
+    def test_max_queries_budget(self, authenticated_client, many_bugs):
+        """Test that a total query budget can be set per test."""
+        with pytest.raises(QueryBudgetExceeded, match='exceed the budget of 1'):
+            authenticated_client.get(reverse('bug-list'))
+
+    def test_slow_query_is_explained(self, settings, user, caplog):
+        """Test that sampled slow queries log their plan without raising."""
+        settings.QUERY_DETECTOR_RAISE = False
+        detector = QueryDetector(repeat_threshold=5, slow_ms=0, explain_rate=1)
+        with caplog.at_level(logging.WARNING, logger='bugs.query_detector'):
+            with connection.execute_wrapper(detector):
+                list(BugReport.objects.filter(created_by=user))
+            detector.check('test')
+
+        assert detector.query_count == 1
+        assert any('Plan for slow query' in message for message in caplog.messages)
+        assert any('Slow query' in message for message in caplog.messages)
@@ -0,0 +1,169 @@
+import time
+
+import pytest
+from django.conf import settings as django_settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connections
+
+from bugs import replicas
+from bugs.models import BugReport, Severity, Status
+
+User = get_user_model()
+
+REPLICA = 'replica'
+
+
+@pytest.fixture(scope='module')
+def replica_db(django_db_setup, django_db_blocker):
+    """
+    A second local test database standing in for a read replica.
+
+    It has the same schema as the primary but never receives its writes, so
+    a test can tell from the data which database served a read.
+    """
+    # The primary's settings already name its test database.
+    primary = django_settings.DATABASES['default']
+    config = {**primary, 'TEST': {'NAME': f"{primary['NAME']}_replica"}}
+    django_settings.DATABASES[REPLICA] = config
+    connections.settings[REPLICA] = connections.configure_settings(
+        {'default': primary, REPLICA: config}
+    )[REPLICA]
+    with django_db_blocker.unblock():
+        old_name = connections[REPLICA].creation.create_test_db(verbosity=0, autoclobber=True)
+    yield REPLICA
+    with django_db_blocker.unblock():
+        connections[REPLICA].creation.destroy_test_db(old_name, verbosity=0)
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    # connections.settings is usually settings.DATABASES itself.
+    connections.settings.pop(REPLICA, None)
+    django_settings.DATABASES.pop(REPLICA, None)
+
+
+@pytest.fixture
+def routed(replica_db, settings):
+    settings.READ_REPLICAS = [replica_db]
+    settings.REPLICA_LAG_CHECK_INTERVAL = 60
+    replicas.reset_health()
+    yield replica_db
+    replicas.reset_health()
+    replicas.cache.clear()
+
+
+def replicate(*objects):
+    """Copy rows to the stand-in replica, as replication would."""
+    for obj in objects:
+        obj.save(using=REPLICA)
+
+
+databases = pytest.mark.django_db(databases=['default', REPLICA])
+
+
+@databases
+class TestReplicaRouting:
+    """Tests for sending safe reads to read replicas."""
+
+    def test_list_reads_from_replica(self, routed, authenticated_client, user, bug_report):
+        """Test that list and retrieve only see what has reached the replica."""
+        assert authenticated_client.get('/api/bugs/').data['count'] == 0
+
+        replicate(user, bug_report)
+
+        assert authenticated_client.get('/api/bugs/').data['count'] == 1
+        assert authenticated_client.get(f'/api/bugs/{bug_report.pk}/').status_code == 200
+
+    def test_no_replicas_reads_primary(self, replica_db, authenticated_client, bug_report):
+        """Test that without READ_REPLICAS every read goes to the primary."""
+        assert authenticated_client.get('/api/bugs/').data['count'] == 1
+
+    def test_writes_go_to_primary(self, routed, authenticated_client):
+        """Test that a create lands on the primary only."""
+        response = authenticated_client.post('/api/bugs/', {
+            'title': 'Written to the primary',
+            'description': 'This bug report must not appear on the replica.',
+        }, format='json')
+
+        assert response.status_code == 201
+        assert BugReport.objects.using('default').filter(pk=response.data['id']).exists()
+        assert not BugReport.objects.using(REPLICA).filter(pk=response.data['id']).exists()
+
+    def test_read_your_writes(self, routed, authenticated_client, client_for, user, other_user):
+        """Test that a user who just wrote reads from the primary, others do not."""
+        replicate(user, other_user)
+        authenticated_client.post('/api/bugs/', {
+            'title': 'Fresh bug report',
+            'description': 'Visible to its author straight away.',
+        }, format='json')
+
+        assert authenticated_client.get('/api/bugs/').data['count'] == 1
+        client_for(other_user).get('/api/bugs/')
+        assert replicas.is_pinned(other_user) is False
+
+    def test_sticky_window_expires(self, routed, user, settings):
+        """Test that the pin only lasts REPLICA_STICKY_SECONDS."""
+        settings.REPLICA_STICKY_SECONDS = 0.05
+        replicas.pin_to_primary(user)
+        assert replicas.is_pinned(user) is True
+
+        time.sleep(0.1)
+
+        assert replicas.is_pinned(user) is False
+
+    def test_lagging_replica_is_skipped(
+        self, routed, authenticated_client, bug_report, monkeypatch, settings
+    ):
+        """Test that reads fall back to the primary while the replica lags."""
+        settings.REPLICA_MAX_LAG_SECONDS = 5
+        monkeypatch.setattr(replicas, 'replica_lag', lambda alias: 30.0)
+
+        assert authenticated_client.get('/api/bugs/').data['count'] == 1
+
+    def test_unreachable_replica_is_skipped(self, routed, authenticated_client, bug_report, monkeypatch):
+        """Test that reads fall back to the primary when the replica is down."""
+        def unreachable(alias):
+            raise DatabaseError('connection refused')
+
+        monkeypatch.setattr(replicas, 'replica_lag', unreachable)
+
+        assert authenticated_client.get('/api/bugs/').data['count'] == 1
+
+    def test_health_is_cached(self, routed, monkeypatch):
+        """Test that lag is checked at most once per interval."""
+        checks = []
+        monkeypatch.setattr(replicas, 'replica_lag', lambda alias: checks.append(alias) or 0.0)
+
+        for _ in range(3):
+            assert replicas.choose_replica() == REPLICA
+
+        assert checks == [REPLICA]
+
+    def test_replica_lag_query(self, routed):
+        """Test the lag query against a server that is not in recovery."""
+        assert replicas.replica_lag(REPLICA) == 0.0
+
+    def test_routing_is_request_scoped(self, routed, authenticated_client):
+        """Test that the replica choice does not leak past the request."""
+        authenticated_client.get('/api/bugs/')
+
+        assert replicas.read_alias.get() is None
+        assert BugReport.objects.db == 'default'
+
+
+class TestReplicaRouter:
+    """Tests for the router outside of requests."""
+
+    def test_reads_default_without_request(self):
+        """Test that code outside opted-in views is not routed."""
+        router = replicas.ReplicaRouter()
+
+        assert router.db_for_read(BugReport) is None
+        assert router.db_for_write(BugReport) is None
+
+    def test_allows_relations_across_replicas(self, settings):
+        """Test that objects read from a replica relate to primary objects."""
+        settings.READ_REPLICAS = ['replica_0']
+        bug = BugReport(title='x', severity=Severity.LOW, status=Status.OPEN)
+        user = User(username='x')
+        bug._state.db, user._state.db = 'replica_0', 'default'
+
+        assert replicas.ReplicaRouter().allow_relation(bug, user) is True
@@ -0,0 +1,185 @@
+import functools
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from bugs import saved_queries, tasks
+from bugs.models import SavedQuery, SavedQueryResult, Severity, Status, Task
+
+
+TRIAGE = {'severity': 'critical', 'status': 'open', 'tags': 'payments', 'ordering': 'title'}
+
+
+@pytest.fixture
+def make_bug(make_bug):
+    """Bug reports that match ``TRIAGE`` unless told otherwise."""
+    return functools.partial(
+        make_bug, description='Card payments fail at checkout.',
+        severity=Severity.CRITICAL, status=Status.OPEN, tags=['payments'],
+    )
+
+
+def save(client, params=TRIAGE, name='Payments triage'):
+    return client.post('/api/bugs/saved/', {'name': name, 'params': params}, format='json')
+
+
+def result_titles(client, saved_id, **params):
+    response = client.get(f'/api/bugs/saved/{saved_id}/', params)
+    assert response.status_code == 200
+    return [bug['title'] for bug in response.data['results']]
+
+
+@pytest.mark.django_db
+class TestSavedQueries:
+    """Tests for saved queries served from stored results."""
+
+    def test_results_computed_on_save(self, authenticated_client, user, make_bug):
+        """Test that saving runs the query and stores its results in order."""
+        make_bug(user, 'Refund fails')
+        make_bug(user, 'Capture fails')
+        make_bug(user, 'Minor typo', severity=Severity.LOW)
+        make_bug(user, 'Old outage', status=Status.CLOSED)
+
+        response = save(authenticated_client)
+
+        assert response.status_code == 201
+        assert response.data['result_count'] == 2
+        assert result_titles(authenticated_client, response.data['id']) == ['Capture fails', 'Refund fails']
+
+    @pytest.mark.parametrize('params', [
+        {'ordering': '-severity,title'},
+        {'search': 'fails,refund'},
+        {'tags': 'payments', 'ordering': '-created_at'},
+        {'watched_by': 'me'},
+    ])
+    def test_matches_bug_list(self, authenticated_client, user, other_user, params, make_bug):
+        """Test that a saved query finds what /api/bugs/ finds with the same parameters."""
+        for n, severity in enumerate([Severity.LOW, Severity.HIGH, Severity.CRITICAL] * 2):
+            make_bug(user, f'Refund fails {n}', severity=severity, tags=['payments'] if n % 2 else [])
+        watched = make_bug(other_user, 'Watched refund')
+        watched.watchers.add(user)
+
+        saved_id = save(authenticated_client, params).data['id']
+
+        listed = authenticated_client.get('/api/bugs/', params).data['results']
+        assert result_titles(authenticated_client, saved_id) == [bug['title'] for bug in listed]
+
+    def test_reads_do_not_run_the_query(
+        self, authenticated_client, user, django_assert_max_num_queries, make_bug
+    ):
+        """Test that fresh results are read as stored, without running the query."""
+        make_bug(user, 'Refund fails')
+        saved_id = save(authenticated_client).data['id']
+        make_bug(user, 'Filed after saving')
+
+        with django_assert_max_num_queries(12):
+            response = authenticated_client.get(f'/api/bugs/saved/{saved_id}/')
+
+        assert [bug['title'] for bug in response.data['results']] == ['Refund fails']
+        assert 'Last-Modified' in response
+        assert not Task.objects.exists()
+
+    def test_stale_results_queue_one_refresh(
+        self, authenticated_client, user, django_capture_on_commit_callbacks, make_bug
+    ):
+        """Test that reading stale results queues a single refresh that picks up new bugs."""
+        make_bug(user, 'Refund fails')
+        saved_id = save(authenticated_client).data['id']
+        make_bug(user, 'Filed after saving')
+        SavedQuery.objects.filter(pk=saved_id).update(refreshed_at=timezone.now() - timedelta(hours=1))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            assert result_titles(authenticated_client, saved_id) == ['Refund fails']
+            assert result_titles(authenticated_client, saved_id) == ['Refund fails']
+
+        assert Task.objects.filter(name='bugs.refresh_saved_queries').count() == 1
+        tasks.run_pending()
+        assert result_titles(authenticated_client, saved_id) == ['Filed after saving', 'Refund fails']
+        assert SavedQuery.objects.get(pk=saved_id).refresh_requested_at is None
+
+    def test_lost_refresh_is_requeued(self, user):
+        """Test that a refresh requested long ago is taken to have failed."""
+        saved_query = SavedQuery.objects.create(owner=user, name='Triage', params=TRIAGE)
+        long_ago = timezone.now() - timedelta(hours=1)
+        SavedQuery.objects.filter(pk=saved_query.pk).update(refresh_requested_at=long_ago)
+
+        assert saved_queries.refresh_if_stale(saved_query) is True
+        assert saved_queries.refresh_if_stale(saved_query) is False
+
+    def test_visibility_checked_on_read(self, authenticated_client, user, other_user, make_bug):
+        """Test that bugs the user can no longer see drop out before the next refresh."""
+        bug = make_bug(other_user, 'Watched refund')
+        bug.watchers.add(user)
+        saved_id = save(authenticated_client, {'watched_by': 'me'}).data['id']
+
+        bug.watchers.remove(user)
+
+        assert result_titles(authenticated_client, saved_id) == []
+
+    def test_result_limit(self, authenticated_client, user, settings, make_bug):
+        """Test that only the first SAVED_QUERY_MAX_RESULTS matches are stored."""
+        settings.SAVED_QUERY_MAX_RESULTS = 3
+        for n in range(5):
+            make_bug(user, f'Refund fails {n}')
+
+        response = save(authenticated_client)
+
+        assert response.data['result_count'] == 3
+        assert SavedQueryResult.objects.count() == 3
+
+    def test_update_params_refreshes(self, authenticated_client, user, make_bug):
+        """Test that changing the parameters recomputes the results, renaming does not."""
+        make_bug(user, 'Refund fails')
+        make_bug(user, 'Minor typo', severity=Severity.LOW)
+        saved_id = save(authenticated_client).data['id']
+        refreshed_at = SavedQuery.objects.get(pk=saved_id).refreshed_at
+
+        authenticated_client.patch(f'/api/bugs/saved/{saved_id}/', {'name': 'Renamed'}, format='json')
+        assert SavedQuery.objects.get(pk=saved_id).refreshed_at == refreshed_at
+
+        authenticated_client.patch(
+            f'/api/bugs/saved/{saved_id}/', {'params': {'severity': 'low'}}, format='json'
+        )
+        assert result_titles(authenticated_client, saved_id) == ['Minor typo']
+
+    def test_own_queries_only(self, authenticated_client, other_user):
+        """Test that other users' saved queries are not listed or readable."""
+        other = SavedQuery.objects.create(owner=other_user, name='Theirs')
+
+        assert authenticated_client.get('/api/bugs/saved/').data['results'] == []
+        assert authenticated_client.get(f'/api/bugs/saved/{other.pk}/').status_code == 404
+
+    def test_me_is_stored_as_user_id(self, authenticated_client, user):
+        """Test that 'me' is resolved when saving, as results are computed outside the request."""
+        response = save(authenticated_client, {'assignee': 'me'})
+
+        assert response.data['params'] == {'assignee': str(user.pk)}
+
+    def test_ordering_is_normalised(self, authenticated_client):
+        """Test that stray commas and spaces in the ordering are dropped before saving."""
+        response = save(authenticated_client, {'ordering': ' -severity , ,title,'})
+
+        assert response.status_code == 201
+        assert response.data['params'] == {'ordering': '-severity,title'}
+        assert response.data['result_count'] == 0
+
+    @pytest.mark.parametrize('params', [
+        {'owner': '1'},
+        {'ordering': 'description'},
+        {'created_after': 'yesterday'},
+        {'severity': ['high']},
+        ['severity'],
+    ])
+    def test_invalid_params(self, authenticated_client, params):
+        """Test that parameters /api/bugs/ would not accept are refused."""
+        assert save(authenticated_client, params).status_code == 400
+
+    def test_duplicate_name(self, authenticated_client):
+        """Test that a user's saved query names are unique."""
+        save(authenticated_client)
+
+        response = save(authenticated_client)
+
+        assert response.status_code == 400
+        assert 'name' in response.data
@@ -0,0 +1,137 @@
+import gzip
+import json
+from io import StringIO
+
+import pytest
+import yaml
+from django.core.management import call_command
+
+from bugs import schema
+
+
+@pytest.fixture(autouse=True)
+def fresh_document():
+    schema.reset_document()
+    yield
+    schema.reset_document()
+
+
+@pytest.fixture
+def generations(monkeypatch):
+    """Count schema generations."""
+    calls = []
+    generate = schema.generate_schema
+
+    def counting_generate():
+        calls.append(1)
+        return generate()
+
+    monkeypatch.setattr(schema, 'generate_schema', counting_generate)
+    return calls
+
+
+@pytest.mark.django_db
+class TestSchemaView:
+    """Tests for the precomputed OpenAPI schema endpoint."""
+
+    def test_yaml_by_default(self, api_client):
+        """Test that the schema is served as YAML unless JSON is asked for."""
+        response = api_client.get('/api/schema/')
+
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/vnd.oai.openapi'
+        document = yaml.safe_load(response.content)
+        assert '/api/bugs/' in document['paths']
+
+    @pytest.mark.parametrize('kwargs', [
+        {'data': {'format': 'json'}},
+        {'HTTP_ACCEPT': 'application/json'},
+        {'HTTP_ACCEPT': 'application/vnd.oai.openapi+json'},
+    ])
+    def test_json_on_request(self, api_client, kwargs):
+        """Test that JSON is chosen by ?format= or the Accept header."""
+        response = api_client.get('/api/schema/', **kwargs)
+
+        assert response['Content-Type'] == 'application/vnd.oai.openapi+json'
+        assert json.loads(response.content)['info']['version'] == '1.0.0'
+
+    def test_unacceptable_type(self, api_client):
+        """Test that a request for neither YAML nor JSON gets 406."""
+        response = api_client.get('/api/schema/', HTTP_ACCEPT='text/csv')
+
+        assert response.status_code == 406
+
+    def test_generated_once(self, api_client, generations):
+        """Test that repeated requests in either format reuse one generation."""
+        api_client.get('/api/schema/')
+        api_client.get('/api/schema/?format=json')
+        api_client.get('/api/schema/')
+
+        assert len(generations) == 1
+
+    def test_no_queries(self, api_client, django_assert_num_queries):
+        """Test that serving the schema and the docs touches no database."""
+        api_client.get('/api/schema/')
+
+        with django_assert_num_queries(0):
+            assert api_client.get('/api/schema/').status_code == 200
+            assert api_client.get('/api/docs/').status_code == 200
+
+    def test_conditional_request(self, api_client):
+        """Test that a matching If-None-Match gets 304, weak or strong."""
+        etag = api_client.get('/api/schema/')['ETag']
+
+        assert api_client.get('/api/schema/', HTTP_IF_NONE_MATCH=etag).status_code == 304
+        weak = api_client.get('/api/schema/', HTTP_IF_NONE_MATCH=f'W/{etag}')
+        assert weak.status_code == 304
+        other = api_client.get('/api/schema/?format=json', HTTP_IF_NONE_MATCH=etag)
+        assert other.status_code == 200
+
+    def test_precompressed(self, api_client, settings):
+        """Test that compressed responses use the variant built once."""
+        settings.COMPRESSION_ENCODINGS = ['gzip']
+        response = api_client.get('/api/schema/', HTTP_ACCEPT_ENCODING='gzip')
+
+        assert response['Content-Encoding'] == 'gzip'
+        assert response['ETag'].startswith('W/"')
+        body = schema.get_document().bodies['yaml']
+        assert response.content == schema.get_document().precompressed('yaml')['gzip']
+        assert gzip.decompress(response.content) == body
+
+
+@pytest.mark.django_db
+class TestSchemaArtefact:
+    """Tests for the prebuilt schema file."""
+
+    def test_build_schema_command(self, tmp_path):
+        """Test that build_schema writes a versioned JSON schema."""
+        out = StringIO()
+        path = tmp_path / 'openapi.json'
+
+        call_command('build_schema', output=str(path), stdout=out)
+
+        assert json.loads(path.read_bytes())['info']['version'] == '1.0.0'
+        assert 'Wrote OpenAPI schema 1.0.0' in out.getvalue()
+
+    def test_served_from_artefact(self, api_client, settings, tmp_path, generations):
+        """Test that a process with a schema file never generates the schema."""
+        path = tmp_path / 'openapi.json'
+        schema.write_artefact(path)
+        generations.clear()
+        settings.OPENAPI_SCHEMA_FILE = str(path)
+
+        response = api_client.get('/api/schema/?format=json')
+
+        assert response.content == path.read_bytes()
+        assert generations == []
+
+    def test_stale_artefact_is_ignored(self, api_client, settings, tmp_path, generations):
+        """Test that a file built for another API version is regenerated."""
+        path = tmp_path / 'openapi.json'
+        path.write_text(json.dumps({'openapi': '3.0.3', 'info': {'version': '0.9.0'}, 'paths': {}}))
+        settings.OPENAPI_SCHEMA_FILE = str(path)
+
+        response = api_client.get('/api/schema/?format=json')
+
+        assert json.loads(response.content)['info']['version'] == '1.0.0'
+        assert len(generations) == 1
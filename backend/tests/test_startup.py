@@ -0,0 +1,113 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Packages only the web roles need; a worker that imports them has regressed.
+WEB_ONLY = ('rest_framework', 'drf_spectacular', 'corsheaders', 'django_filters', 'django.contrib.admin')
+
+
+def run_python(role, code, *args):
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'config.settings', 'DJANGO_PROCESS_ROLE': role}
+    return subprocess.run(
+        [sys.executable, *args, '-c', code],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+
+
+def parse_importtime(report):
+    return {
+        line.split('|')[2].strip()
+        for line in report.splitlines()
+        if line.startswith('import time:') and 'self [us]' not in line
+    }
+
+
+def imported_modules(role, code):
+    """Modules imported while running ``code``, from a ``-X importtime`` report."""
+    completed = run_python(role, code, '-X', 'importtime')
+    assert completed.returncode == 0, completed.stderr
+    return parse_importtime(completed.stderr)
+
+
+def url_prefixes(role):
+    completed = run_python(role, (
+        'import django\n'
+        'django.setup()\n'
+        'from django.urls import get_resolver\n'
+        "print(' '.join(str(p.pattern) for p in get_resolver().url_patterns))\n"
+    ))
+    assert completed.returncode == 0, completed.stderr
+    return completed.stdout.split()
+
+
+class TestProcessRoles:
+    """Tests for the per-role app and URL sets."""
+
+    def test_worker_skips_web_stack(self):
+        """Test that a worker boots without DRF, the admin or the schema generator."""
+        modules = imported_modules('worker', (
+            'import django\n'
+            'django.setup()\n'
+            'from django.core.management import load_command_class\n'
+            "load_command_class('bugs', 'run_worker')\n"
+        ))
+
+        assert 'bugs.tasks' in modules
+        assert 'bugs.attachments' in modules
+        loaded = [name for name in modules if name.startswith(WEB_ONLY)]
+        assert loaded == []
+
+    def test_api_skips_schema_generator(self):
+        """Test that the API role serves the API without drf-spectacular's generator."""
+        modules = imported_modules('api', (
+            'from config.wsgi import application\n'
+            'from django.urls import get_resolver\n'
+            'get_resolver().url_patterns\n'
+        ))
+
+        assert 'bugs.views' in modules
+        assert 'drf_spectacular.openapi' not in modules
+        assert 'drf_spectacular.views' not in modules
+
+    @pytest.mark.parametrize('role, expected', [
+        ('all', ['admin/', 'api/', 'metrics', 'api/schema/', 'api/docs/']),
+        ('api', ['api/', 'metrics']),
+        ('schema', ['api/', 'metrics', 'api/schema/', 'api/docs/']),
+        ('worker', []),
+    ])
+    def test_urls_per_role(self, role, expected):
+        """Test that each role only routes its own URLs."""
+        assert url_prefixes(role) == expected
+
+    def test_unknown_role_is_rejected(self):
+        """Test that a typo in DJANGO_PROCESS_ROLE fails at startup."""
+        completed = run_python('wroker', 'import django; django.setup()')
+
+        assert completed.returncode != 0
+        assert 'DJANGO_PROCESS_ROLE must be one of' in completed.stderr
+
+    def test_unknown_password_hasher_is_rejected(self, monkeypatch):
+        """Test that a typo in PASSWORD_HASHER fails at startup."""
+        monkeypatch.setenv('PASSWORD_HASHER', 'argon')
+        completed = run_python('all', 'import django; django.setup()')
+
+        assert completed.returncode != 0
+        assert 'PASSWORD_HASHER must be one of' in completed.stderr
+
+    def test_model_commands_default_to_worker_role(self):
+        """Test that manage.py runs seed_bugs without loading the web stack."""
+        env = {key: value for key, value in os.environ.items() if key != 'DJANGO_PROCESS_ROLE'}
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', 'manage.py', 'seed_bugs', '--help'],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+        )
+
+        assert completed.returncode == 0, completed.stderr
+        modules = parse_importtime(completed.stderr)
+        assert 'bugs.attachments' in modules
+        assert 'rest_framework' not in modules
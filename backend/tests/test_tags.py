@@ -0,0 +1,141 @@
+import random
+
+import pytest
+from django.db import connection
+
+from bugs.models import BugReport, Status, Tag
+
+
+def catalog(owner):
+    return dict(Tag.objects.filter(owner=owner).values_list('name', 'bug_count'))
+
+
+def counted_from_bugs():
+    """Tag counts worked out from the bug reports themselves."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT created_by_id, tag, count(DISTINCT id) FROM bugs_bugreport, unnest(tags) AS tag '
+            'GROUP BY created_by_id, tag'
+        )
+        return {(owner_id, tag): count for owner_id, tag, count in cursor.fetchall()}
+
+
+@pytest.mark.django_db
+class TestTagCatalog:
+    """Tests for the tag counts kept by the bugs_bugreport triggers."""
+
+    def test_counts_follow_writes(self, user, make_bug):
+        """Test that inserts, tag edits and deletes keep the counts, dropping unused tags."""
+        first = make_bug(user, tags=['payments', 'ui'])
+        make_bug(user, tags=['payments'])
+        assert catalog(user) == {'payments': 2, 'ui': 1}
+
+        first.tags = ['ui', 'checkout']
+        first.save()
+        assert catalog(user) == {'payments': 1, 'ui': 1, 'checkout': 1}
+
+        first.delete()
+        assert catalog(user) == {'payments': 1}
+
+    def test_bulk_writes(self, user, other_user):
+        """Test that bulk creates, queryset updates and owner changes are counted."""
+        BugReport.objects.bulk_create([
+            BugReport(title='Bulk', description='Bulk created.', tags=['api'], created_by=user)
+            for _ in range(3)
+        ])
+        assert catalog(user) == {'api': 3}
+
+        BugReport.objects.filter(created_by=user).update(tags=['api', 'backend'])
+        assert catalog(user) == {'api': 3, 'backend': 3}
+
+        BugReport.objects.filter(pk=BugReport.objects.first().pk).update(created_by=other_user)
+        assert catalog(user) == {'api': 2, 'backend': 2}
+        assert catalog(other_user) == {'api': 1, 'backend': 1}
+
+    def test_other_updates_leave_counts(self, user, make_bug):
+        """Test that edits that do not touch tags do not change the counts."""
+        bug = make_bug(user, tags=['ui'])
+
+        bug.status = Status.CLOSED
+        bug.save()
+
+        assert catalog(user) == {'ui': 1}
+
+    def test_repeated_tag_counts_once(self, user, make_bug):
+        """Test that a tag repeated in one bug report counts that report once."""
+        make_bug(user, tags=['ui', 'ui'])
+
+        assert catalog(user) == {'ui': 1}
+
+    def test_matches_bug_reports(self, user, other_user, make_bug):
+        """Test that after a mix of writes the catalog matches the bug reports' tags."""
+        rng = random.Random(7)
+        vocabulary = ['api', 'ui', 'payments', 'crash', 'login']
+        bugs = []
+        for _ in range(40):
+            action = rng.random()
+            if action < 0.5 or not bugs:
+                tags = rng.sample(vocabulary, rng.randint(0, 3))
+                bugs.append(make_bug(rng.choice([user, other_user]), tags=tags))
+            elif action < 0.8:
+                bug = rng.choice(bugs)
+                bug.tags = rng.sample(vocabulary, rng.randint(0, 3))
+                bug.save()
+            else:
+                bugs.pop(rng.randrange(len(bugs))).delete()
+
+        stored = {(tag.owner_id, tag.name): tag.bug_count for tag in Tag.objects.all()}
+        assert stored == counted_from_bugs()
+
+
+@pytest.mark.django_db
+class TestTagEndpoint:
+    """Tests for listing and completing tags."""
+
+    def test_list_most_used_first(self, authenticated_client, user, make_bug):
+        """Test that tags come with counts, most used first."""
+        make_bug(user, tags=['ui', 'api'])
+        make_bug(user, tags=['ui'])
+
+        response = authenticated_client.get('/api/tags/')
+
+        assert response.status_code == 200
+        assert response.data['results'] == [
+            {'name': 'ui', 'bug_count': 2},
+            {'name': 'api', 'bug_count': 1},
+        ]
+
+    def test_autocomplete(self, authenticated_client, user, make_bug):
+        """Test that q keeps the tags starting with it, ignoring case."""
+        make_bug(user, tags=['payments', 'performance', 'api', 'pay_later'])
+
+        response = authenticated_client.get('/api/tags/', {'q': ' PA '})
+
+        assert [tag['name'] for tag in response.data['results']] == ['pay_later', 'payments']
+
+    def test_like_wildcards_are_literal(self, authenticated_client, user, make_bug):
+        """Test that % and _ in q match themselves."""
+        make_bug(user, tags=['pay_later', 'payments'])
+
+        response = authenticated_client.get('/api/tags/', {'q': 'pay_'})
+
+        assert [tag['name'] for tag in response.data['results']] == ['pay_later']
+
+    def test_own_tags_only(self, authenticated_client, other_user, make_bug):
+        """Test that other users' tags are not listed."""
+        make_bug(other_user, tags=['secret'])
+
+        assert authenticated_client.get('/api/tags/').data['results'] == []
+
+    def test_bug_tags_unchanged(self, authenticated_client):
+        """Test that bug reports still take and return tags as strings."""
+        response = authenticated_client.post('/api/bugs/', {
+            'title': 'Tags stay strings',
+            'description': 'The tags field keeps its shape.',
+            'tags': ['UI', 'api'],
+        }, format='json')
+
+        assert response.status_code == 201
+        assert authenticated_client.get(f"/api/bugs/{response.data['id']}/").data['tags'] == ['ui', 'api']
+        tags = authenticated_client.get('/api/tags/').data['results']
+        assert [tag['name'] for tag in tags] == ['api', 'ui']
@@ -0,0 +1,240 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.utils import timezone
+
+from bugs import tasks
+from bugs.models import Task, TaskStatus
+
+
+@pytest.fixture
+def calls():
+    """Register throwaway tasks that record their calls."""
+    recorded = []
+
+    @tasks.task('test.record')
+    def record(**payload):
+        if payload.get('fail'):
+            raise RuntimeError('boom')
+        recorded.append(payload)
+
+    @tasks.task('test.batch', batch=True)
+    def batch(payloads):
+        recorded.append(payloads)
+
+    @tasks.task('test.flaky', max_attempts=2)
+    def flaky(**payload):
+        raise RuntimeError('still broken')
+
+    yield recorded
+    for name in ('test.record', 'test.batch', 'test.flaky'):
+        tasks.registry.pop(name)
+
+
+@pytest.mark.django_db
+class TestTaskQueue:
+    """Tests for the Postgres-backed task queue."""
+
+    def test_enqueue_waits_for_commit(self, calls, django_capture_on_commit_callbacks):
+        """Test that tasks are only inserted once the transaction commits."""
+        with django_capture_on_commit_callbacks() as callbacks:
+            tasks.enqueue('test.record', {'bug_id': 'abc'})
+            assert not Task.objects.exists()
+        for callback in callbacks:
+            callback()
+
+        task = Task.objects.get()
+        assert task.name == 'test.record'
+        assert task.payload == {'bug_id': 'abc'}
+
+    def test_rolled_back_enqueue_is_dropped(self, calls, django_capture_on_commit_callbacks):
+        """Test that work queued by a failed transaction never runs."""
+        with django_capture_on_commit_callbacks(execute=True):
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    tasks.enqueue('test.record', {'bug_id': 'abc'})
+                    raise RuntimeError
+
+        assert not Task.objects.exists()
+
+    def test_payload_is_passed_whole(self, calls, django_capture_on_commit_callbacks):
+        """Test that payload keys named like enqueue's arguments stay in the payload."""
+        with django_capture_on_commit_callbacks(execute=True):
+            tasks.enqueue('test.record', {'name': 'x', 'delay': 5})
+
+        assert Task.objects.get().payload == {'name': 'x', 'delay': 5}
+
+    def test_enqueue_unknown_task(self):
+        with pytest.raises(ValueError):
+            tasks.enqueue('test.missing')
+
+    def test_run_pending_runs_and_deletes(self, calls):
+        """Test that successful tasks run once and are removed."""
+        Task.objects.create(name='test.record', payload={'n': 1})
+        Task.objects.create(name='test.record', payload={'n': 2})
+
+        assert tasks.run_pending() == 2
+        assert calls == [{'n': 1}, {'n': 2}]
+        assert not Task.objects.exists()
+
+    def test_batch_task_receives_all_payloads(self, calls):
+        """Test that batch tasks are called once per claimed batch."""
+        for n in range(3):
+            Task.objects.create(name='test.batch', payload={'n': n})
+
+        tasks.run_pending()
+
+        assert calls == [[{'n': 0}, {'n': 1}, {'n': 2}]]
+
+    def test_failure_is_retried_with_backoff(self, calls):
+        """Test that a failing payload is rescheduled without blocking the others."""
+        Task.objects.create(name='test.record', payload={'fail': True})
+        Task.objects.create(name='test.record', payload={'n': 1})
+
+        tasks.run_pending()
+
+        assert calls == [{'n': 1}]
+        failed = Task.objects.get()
+        assert failed.status == TaskStatus.PENDING
+        assert failed.attempts == 1
+        assert failed.run_after > timezone.now()
+        assert 'boom' in failed.last_error
+        # Not due yet, so nothing is claimed.
+        assert tasks.run_pending() == 0
+
+    def test_gives_up_after_max_attempts(self, calls):
+        """Test that tasks are marked failed once attempts run out."""
+        task = Task.objects.create(name='test.flaky', max_attempts=2)
+        tasks.run_pending()
+        Task.objects.filter(pk=task.pk).update(run_after=timezone.now())
+        tasks.run_pending()
+
+        task.refresh_from_db()
+        assert task.status == TaskStatus.FAILED
+        assert task.attempts == 2
+        assert tasks.run_pending() == 0
+
+    def test_lost_lease_on_last_attempt_fails(self, calls):
+        """Test that a task whose worker died on its last attempt is given up."""
+        task = Task.objects.create(name='test.flaky', max_attempts=2, attempts=2)
+
+        assert tasks.run_pending() == 1
+
+        task.refresh_from_db()
+        assert task.status == TaskStatus.FAILED
+        assert 'lost' in task.last_error
+
+    def test_run_worker_once(self, calls):
+        """Test that the worker command drains due tasks and exits."""
+        Task.objects.create(name='test.record', payload={'n': 1})
+        out = StringIO()
+
+        call_command('run_worker', once=True, stdout=out)
+
+        assert calls == [{'n': 1}]
+        assert 'after 1 tasks' in out.getvalue()
+
+    def test_periodic_task_is_scheduled_once_and_repeats(self, calls, django_capture_on_commit_callbacks):
+        """Test that a periodic task is queued at startup and requeues itself."""
+        @tasks.task('test.periodic', batch=True, interval=60)
+        def periodic(payloads):
+            calls.append(payloads)
+
+        try:
+            assert 'test.periodic' in tasks.schedule_periodic()
+            assert 'test.periodic' not in tasks.schedule_periodic()
+            Task.objects.exclude(name='test.periodic').delete()
+
+            with django_capture_on_commit_callbacks(execute=True):
+                tasks.run_pending()
+
+            follow_up = Task.objects.get()
+            assert calls == [[{}]]
+            assert follow_up.name == 'test.periodic'
+            assert follow_up.run_after > timezone.now() + timedelta(seconds=50)
+        finally:
+            tasks.registry.pop('test.periodic')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_locked_tasks_are_skipped(calls):
+    """Test that a task claimed by another worker is skipped, not waited on."""
+    task = Task.objects.create(name='test.record', payload={'n': 1})
+    locked = threading.Event()
+    release = threading.Event()
+
+    def other_worker():
+        with transaction.atomic():
+            Task.objects.select_for_update().get(pk=task.pk)
+            locked.set()
+            release.wait(5)
+        connection.close()
+
+    thread = threading.Thread(target=other_worker)
+    thread.start()
+    locked.wait(5)
+    try:
+        assert tasks.run_pending() == 0
+    finally:
+        release.set()
+        thread.join()
+
+    assert tasks.run_pending() == 1
+    assert calls == [{'n': 1}]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_handlers_run_after_the_claim_commits():
+    """Test that handlers run outside a transaction and see their task claimed."""
+    seen = []
+
+    @tasks.task('test.inspect')
+    def inspect():
+        task = Task.objects.get()
+        seen.append((connection.in_atomic_block, task.attempts, task.claimed_at is not None,
+                     task.run_after > timezone.now()))
+
+    try:
+        Task.objects.create(name='test.inspect')
+        tasks.run_pending()
+    finally:
+        tasks.registry.pop('test.inspect')
+
+    assert seen == [(False, 1, True, True)]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_worker_requeues_failed_periodic_task(settings, monkeypatch):
+    """Test that a periodic task that runs out of attempts is queued again."""
+    from bugs.management.commands.run_worker import Command
+
+    settings.TASK_SCHEDULE_INTERVAL = 0
+    idle = []
+
+    def wait(command, timeout):
+        idle.append(timeout)
+        command.stopping = len(idle) == 2
+
+    monkeypatch.setattr(Command, 'wait', wait)
+    runs = []
+
+    @tasks.task('test.periodic', batch=True, max_attempts=1, interval=60)
+    def periodic(payloads):
+        runs.append(payloads)
+        if len(runs) == 1:
+            raise RuntimeError('broken')
+
+    try:
+        call_command('run_worker', stdout=StringIO())
+    finally:
+        tasks.registry.pop('test.periodic')
+
+    assert len(runs) == 2
+    periodic_runs = Task.objects.filter(name='test.periodic').order_by('pk')
+    assert list(periodic_runs.values_list('status', flat=True)) == [
+        TaskStatus.FAILED, TaskStatus.PENDING
+    ]
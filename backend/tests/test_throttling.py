@@ -0,0 +1,191 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from bugs.buckets import purge_full_buckets
+from bugs.middleware import ConcurrencyLimitMiddleware
+from bugs.models import ThrottleBucket
+from bugs.throttling import DatabaseBucketStore, LocalBucketStore, bucket_key, parse_rate
+
+
+@pytest.fixture
+def rates(settings):
+    """Set throttle rates for one test."""
+    def apply(**scopes):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {'user': None, 'ip': None, 'auth': None, **scopes},
+        }
+    return apply
+
+
+def test_parse_rate():
+    assert parse_rate('120/min') == (120, 2.0)
+    assert parse_rate('10/s') == (10, 10.0)
+    assert parse_rate(None) == (None, None)
+
+
+@pytest.mark.parametrize('store_class', [LocalBucketStore, DatabaseBucketStore])
+@pytest.mark.django_db
+class TestBucketStores:
+    """Tests for the token bucket stores."""
+
+    def test_drains_then_refuses(self, store_class):
+        """Test that a bucket allows its capacity and then refuses."""
+        store = store_class()
+        results = [store.consume('k', capacity=3, refill_rate=0.001, cost=1)[0] for _ in range(4)]
+        assert results == [True, True, True, False]
+
+    def test_refused_requests_cost_nothing(self, store_class):
+        """Test that a refusal leaves the remaining tokens untouched."""
+        store = store_class()
+        store.consume('k', capacity=5, refill_rate=0.001, cost=4)
+        allowed, tokens = store.consume('k', capacity=5, refill_rate=0.001, cost=4)
+        assert not allowed
+        allowed, tokens = store.consume('k', capacity=5, refill_rate=0.001, cost=1)
+        assert allowed
+        assert tokens == pytest.approx(0, abs=0.01)
+
+    def test_refills_over_time(self, store_class):
+        """Test that tokens come back at the configured rate."""
+        store = store_class()
+        store.consume('k', capacity=1, refill_rate=100, cost=1)
+        assert not store.consume('k', capacity=1, refill_rate=0.001, cost=1)[0]
+        time.sleep(0.05)
+
+        assert store.consume('k', capacity=1, refill_rate=100, cost=1)[0]
+
+
+def test_bucket_keys_fit_the_table():
+    assert bucket_key('ip', '10.0.0.1') == 'ip:10.0.0.1'
+    key = bucket_key('ip', '10.0.0.1, ' * 100)
+    assert key.startswith('ip:') and len(key) == 67
+
+
+def test_local_store_drops_least_recently_used():
+    """Test that the local store keeps a bounded number of buckets."""
+    store = LocalBucketStore(max_buckets=2)
+    store.consume('a', capacity=1, refill_rate=0.001, cost=1)
+    store.consume('b', capacity=1, refill_rate=0.001, cost=1)
+    store.consume('a', capacity=1, refill_rate=0.001, cost=1)
+    store.consume('c', capacity=1, refill_rate=0.001, cost=1)
+
+    assert list(store._buckets) == ['a', 'c']
+
+
+@pytest.mark.django_db
+def test_purge_deletes_only_full_buckets(rates):
+    """Test that refilled buckets are purged and partly drained ones are kept."""
+    rates(user='60/min', ip='3600/h')
+    store = DatabaseBucketStore()
+    store.consume('user:1', capacity=60, refill_rate=1.0, cost=1)
+    store.consume('user:2', capacity=60, refill_rate=1.0, cost=1)
+    store.consume('ip:10.0.0.1', capacity=3600, refill_rate=1.0, cost=5)
+    ThrottleBucket.objects.filter(key__in=['user:1', 'ip:10.0.0.1']).update(
+        updated_at=timezone.now() - timedelta(seconds=2)
+    )
+
+    assert purge_full_buckets() == 1
+    assert set(ThrottleBucket.objects.values_list('key', flat=True)) == {'user:2', 'ip:10.0.0.1'}
+
+
+@pytest.mark.django_db
+class TestApiThrottling:
+    """Tests for throttling on the API views."""
+
+    def test_user_budget_returns_429_with_retry_after(self, rates, authenticated_client):
+        """Test that exhausting the user budget is reported with Retry-After."""
+        rates(user='2/min')
+        assert authenticated_client.get(reverse('bug-list')).status_code == status.HTTP_200_OK
+        assert authenticated_client.get(reverse('bug-list')).status_code == status.HTTP_200_OK
+
+        response = authenticated_client.get(reverse('bug-list'))
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(response['Retry-After']) > 0
+
+    def test_search_costs_more(self, rates, authenticated_client):
+        """Test that searches drain the budget five times faster."""
+        rates(user='10/min')
+        for _ in range(2):
+            response = authenticated_client.get(reverse('bug-list'), {'search': 'login'})
+            assert response.status_code == status.HTTP_200_OK
+
+        response = authenticated_client.get(reverse('bug-list'), {'search': 'login'})
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    def test_budgets_are_per_user(self, rates, client_for, user, other_user):
+        rates(user='1/min')
+        first, second = client_for(user), client_for(other_user)
+
+        assert first.get(reverse('bug-list')).status_code == status.HTTP_200_OK
+        assert second.get(reverse('bug-list')).status_code == status.HTTP_200_OK
+        assert first.get(reverse('bug-list')).status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    def test_ip_budget_spans_accounts(self, rates, client_for, user, other_user):
+        """Test that one client IP cannot multiply its budget with more accounts."""
+        rates(ip='2/min')
+        for account in (user, other_user):
+            client_for(account).get(reverse('bug-list'))
+
+        assert client_for(user).get(reverse('bug-list')).status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    def test_forwarded_for_is_ignored_without_proxies(self, rates, api_client, user):
+        """Test that clients cannot pick their throttle identity, or break it, with X-Forwarded-For."""
+        rates(auth='2/min')
+        credentials = {'username': 'testuser', 'password': 'wrong-password'}
+        for n in range(2):
+            response = api_client.post(
+                reverse('token-obtain-pair'), credentials, HTTP_X_FORWARDED_FOR=f'10.0.{n}.1, ' * 100
+            )
+            assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        response = api_client.post(reverse('token-obtain-pair'), credentials, HTTP_X_FORWARDED_FOR='10.9.9.9')
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    def test_long_forwarded_for_behind_a_proxy(self, rates, settings, api_client, user):
+        rates(auth='2/min')
+        settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}
+        credentials = {'username': 'testuser', 'password': 'wrong-password'}
+
+        response = api_client.post(reverse('token-obtain-pair'), credentials, HTTP_X_FORWARDED_FOR='x' * 300)
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_login_is_throttled_per_ip(self, rates, api_client, user):
+        rates(auth='2/min')
+        credentials = {'username': 'testuser', 'password': 'wrong-password'}
+        for _ in range(2):
+            api_client.post(reverse('token-obtain-pair'), credentials)
+
+        response = api_client.post(reverse('token-obtain-pair'), credentials)
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+class TestConcurrencyLimit:
+    """Tests for the load shedding middleware."""
+
+    def test_sheds_requests_over_the_limit(self, settings):
+        """Test that requests beyond the in-flight limit get 429."""
+        settings.MAX_CONCURRENT_REQUESTS = 1
+        request = RequestFactory().get('/api/bugs/')
+        inner = []
+
+        def get_response(request):
+            # A second request arrives while the first is still running.
+            inner.append(middleware(request))
+            return HttpResponse('ok')
+
+        middleware = ConcurrencyLimitMiddleware(get_response)
+        response = middleware(request)
+
+        assert response.status_code == 200
+        assert inner[0].status_code == 429
+        assert inner[0]['Retry-After'] == '1'
+        assert middleware.in_flight == 0
@@ -0,0 +1,150 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from bugs.models import BugReport, Project, ProjectMembership, Status
+from bugs.transitions import STATUS_TRANSITIONS, source_statuses
+
+URL = '/api/bugs/transition/'
+
+
+def statuses(*bugs):
+    return [BugReport.objects.get(pk=bug.pk).status for bug in bugs]
+
+
+class TestStatusTransitions:
+    """Tests for the allowed status transitions."""
+
+    def test_sources(self):
+        """Test that closed bug reports can only be reopened."""
+        assert source_statuses(Status.OPEN) == [Status.CLOSED, Status.IN_PROGRESS, Status.RESOLVED]
+        assert source_statuses(Status.RESOLVED) == [Status.IN_PROGRESS, Status.OPEN]
+        assert STATUS_TRANSITIONS[Status.CLOSED] == {Status.OPEN}
+
+    def test_every_status_has_transitions(self):
+        """Test that the map covers every status and never maps a status to itself."""
+        assert set(STATUS_TRANSITIONS) == set(Status)
+        assert all(status not in targets for status, targets in STATUS_TRANSITIONS.items())
+
+
+@pytest.mark.django_db
+class TestTransitionEndpoint:
+    """Tests for changing the status of many bug reports at once."""
+
+    def test_by_ids(self, authenticated_client, user, make_bug):
+        """Test that the listed bug reports change and are counted."""
+        first, second, untouched = make_bug(user), make_bug(user), make_bug(user)
+
+        response = authenticated_client.post(
+            URL, {'ids': [first.pk, second.pk], 'status': 'resolved'}, format='json'
+        )
+
+        assert response.status_code == 200
+        assert response.data == {'updated': 2}
+        assert statuses(first, second, untouched) == ['resolved', 'resolved', 'open']
+        first.refresh_from_db()
+        assert first.version == 2 and first.updated_at > first.created_at
+
+    def test_by_filters(self, authenticated_client, user, make_bug):
+        """Test that filters select bug reports as on /api/bugs/."""
+        release = make_bug(user, status=Status.RESOLVED, tags=['release-1.2'])
+        still_open = make_bug(user, status=Status.OPEN, tags=['release-1.2'])
+        other_release = make_bug(user, status=Status.RESOLVED, tags=['release-1.3'])
+
+        response = authenticated_client.post(URL, {
+            'filters': {'tags': 'release-1.2', 'status': 'resolved'},
+            'status': 'closed',
+        }, format='json')
+
+        assert response.data == {'updated': 1}
+        assert statuses(release, still_open, other_release) == ['closed', 'open', 'resolved']
+
+    def test_filter_matching_nothing(self, authenticated_client, user, make_bug):
+        """Test that an assignee id other than ASCII digits selects nothing."""
+        bug = make_bug(user)
+        bug.assignees.add(user)
+
+        response = authenticated_client.post(
+            URL, {'filters': {'assignee': '²'}, 'status': 'resolved'}, format='json'
+        )
+
+        assert response.data == {'updated': 0}
+        assert statuses(bug) == ['open']
+
+    def test_only_allowed_transitions(self, authenticated_client, user, make_bug):
+        """Test that bug reports whose status cannot move to the target are left alone."""
+        bugs = [make_bug(user, status=status) for status in (Status.OPEN, Status.RESOLVED, Status.CLOSED)]
+
+        response = authenticated_client.post(
+            URL, {'ids': [bug.pk for bug in bugs], 'status': 'resolved'}, format='json'
+        )
+
+        assert response.data == {'updated': 1}
+        assert statuses(*bugs) == ['resolved', 'resolved', 'closed']
+
+    def test_only_editable_bugs(self, authenticated_client, user, other_user, make_bug):
+        """Test that watched and foreign bug reports do not change, assigned and project ones do."""
+        project = Project.objects.create(name='Checkout')
+        ProjectMembership.objects.create(project=project, user=user)
+        in_project = make_bug(other_user, project=project)
+        assigned = make_bug(other_user)
+        assigned.assignees.add(user)
+        watched = make_bug(other_user)
+        watched.watchers.add(user)
+        foreign = make_bug(other_user)
+        bugs = [in_project, assigned, watched, foreign]
+
+        response = authenticated_client.post(
+            URL, {'ids': [bug.pk for bug in bugs], 'status': 'in_progress'}, format='json'
+        )
+
+        assert response.data == {'updated': 2}
+        assert statuses(*bugs) == ['in_progress', 'in_progress', 'open', 'open']
+
+    def test_one_update(self, authenticated_client, user, make_bug):
+        """Test that any number of bug reports change with a single UPDATE."""
+        bugs = [make_bug(user) for _ in range(20)]
+
+        with CaptureQueriesContext(connection) as queries:
+            authenticated_client.post(
+                URL, {'ids': [bug.pk for bug in bugs], 'status': 'closed'}, format='json'
+            )
+
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE bugs_bugreport')]
+        assert len(updates) == 1
+
+    def test_publishes_events(
+        self, authenticated_client, user, published, django_capture_on_commit_callbacks, make_bug
+    ):
+        """Test that each changed bug report notifies its owner."""
+        changed, unchanged = make_bug(user), make_bug(user, status=Status.CLOSED)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            authenticated_client.post(
+                URL, {'ids': [changed.pk, unchanged.pk], 'status': 'resolved'}, format='json'
+            )
+
+        assert published == [(user.pk, {'type': 'bug.updated', 'id': str(changed.pk)})]
+
+    @pytest.mark.parametrize('body', [
+        {'status': 'closed'},
+        {'status': 'closed', 'ids': ['00000000-0000-0000-0000-000000000001'], 'filters': {'tags': 'x'}},
+        {'status': 'closed', 'filters': {}},
+        {'status': 'closed', 'filters': {'search': 'crash'}},
+        {'status': 'closed', 'filters': {'tags': ['x']}},
+        {'status': 'done', 'filters': {'tags': 'x'}},
+        {'status': 'closed', 'ids': []},
+    ])
+    def test_invalid_requests(self, authenticated_client, body):
+        """Test that the request needs a valid status and either ids or non-empty filters."""
+        assert authenticated_client.post(URL, body, format='json').status_code == 400
+
+    def test_too_many_ids(self, authenticated_client, settings):
+        """Test that ids are limited to BUG_TRANSITION_MAX_IDS."""
+        settings.BUG_TRANSITION_MAX_IDS = 2
+        ids = [f'00000000-0000-0000-0000-00000000000{n}' for n in range(3)]
+
+        response = authenticated_client.post(URL, {'ids': ids, 'status': 'closed'}, format='json')
+
+        assert response.status_code == 400
+        assert 'filters' in str(response.data['ids'][0])
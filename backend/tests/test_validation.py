@@ -0,0 +1,48 @@
+import pytest
+from django.core.exceptions import ValidationError
+
+from bugs.serializers import BugReportCreateUpdateSerializer
+from bugs.validation import clean_bug, clean_severity, clean_tags
+
+
+class TestValidation:
+    """Tests for the shared bug report validation layer."""
+
+    def test_tags_are_normalised_and_deduplicated_in_order(self):
+        assert clean_tags(['  UI ', 'api', 'ui', '', 'API', 'crash']) == ['ui', 'api', 'crash']
+
+    def test_rejects_bad_tags(self):
+        with pytest.raises(ValidationError, match='must be strings'):
+            clean_tags(['ui', 3])
+        with pytest.raises(ValidationError, match='exceeds 50 characters'):
+            clean_tags(['x' * 51])
+
+    def test_rejects_unknown_choice(self):
+        with pytest.raises(ValidationError) as exc:
+            clean_severity('urgent')
+        assert exc.value.messages == ['Invalid severity. Choose from: low, medium, high, critical']
+
+    def test_clean_bug_reports_every_invalid_field(self):
+        with pytest.raises(ValidationError) as exc:
+            clean_bug({'title': 'Bug', 'status': 'gone', 'tags': ['A', 'a']})
+
+        assert set(exc.value.message_dict) == {'title', 'description', 'status'}
+
+    def test_clean_bug_returns_cleaned_copy(self):
+        row = {'title': 'Import row', 'description': 'Imported from CSV.', 'tags': ['Ops', 'ops']}
+
+        cleaned = clean_bug(row)
+
+        assert cleaned['tags'] == ['ops']
+        assert row['tags'] == ['Ops', 'ops']
+
+    def test_serializer_reports_errors_per_field(self):
+        serializer = BugReportCreateUpdateSerializer(data={
+            'title': 'Bug',
+            'description': 'Long enough description.',
+            'tags': ['Dup', 'dup'],
+        })
+
+        assert not serializer.is_valid()
+        assert serializer.errors['title'] == ['Title must be at least 5 characters long.']
+        assert 'tags' not in serializer.errors
@@ -0,0 +1,170 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from bugs.models import BugReport
+from bugs.serializers import BugReportCreateUpdateSerializer, VersionConflict
+from bugs.views import BugReportViewSet
+
+
+def detail(bug):
+    return f'/api/bugs/{bug.pk}/'
+
+
+def edited_meanwhile(monkeypatch):
+    """Have someone else update the bug report right after the view reads it."""
+    get_object = BugReportViewSet.get_object
+
+    def read_then_edit(view):
+        instance = get_object(view)
+        BugReport.objects.filter(pk=instance.pk).update(title='Edited by someone else')
+        return instance
+
+    monkeypatch.setattr(BugReportViewSet, 'get_object', read_then_edit)
+
+
+@pytest.mark.django_db
+class TestVersions:
+    """Tests for bug report versions and ETags."""
+
+    def test_reads_carry_version(self, authenticated_client, bug_report):
+        """Test that a bug report is served with its version as the ETag."""
+        response = authenticated_client.get(detail(bug_report))
+
+        assert response['ETag'] == '"1"'
+        assert response.data['version'] == 1
+
+    def test_create_carries_version(self, authenticated_client):
+        """Test that a new bug report starts at version 1."""
+        response = authenticated_client.post('/api/bugs/', {
+            'title': 'Versioned from the start',
+            'description': 'A new bug report is at version one.',
+        }, format='json')
+
+        assert response['ETag'] == '"1"'
+        assert response.data['version'] == 1
+
+    def test_every_update_raises_version(self, bug_report):
+        """Test that saves and queryset updates outside the API raise the version too."""
+        bug_report.save()
+        BugReport.objects.filter(pk=bug_report.pk).update(status='closed')
+
+        bug_report.refresh_from_db()
+        assert bug_report.version == 3
+
+
+@pytest.mark.django_db
+class TestConditionalUpdate:
+    """Tests for updates with If-Match."""
+
+    def test_matching_version(self, authenticated_client, bug_report):
+        """Test that an update at the current version applies and returns the next one."""
+        response = authenticated_client.patch(detail(bug_report), {'status': 'resolved'}, format='json',
+                                              HTTP_IF_MATCH='"1"')
+
+        assert response.status_code == 200
+        assert response['ETag'] == '"2"'
+        assert response.data['status'] == 'resolved'
+        bug_report.refresh_from_db()
+        assert (bug_report.status, bug_report.version) == ('resolved', 2)
+
+    def test_stale_version(self, authenticated_client, bug_report):
+        """Test that an update to an older version gets 412 and writes nothing."""
+        BugReport.objects.filter(pk=bug_report.pk).update(title='Edited by someone else')
+
+        response = authenticated_client.patch(detail(bug_report), {'status': 'resolved'}, format='json',
+                                              HTTP_IF_MATCH='"1"')
+
+        assert response.status_code == 412
+        bug_report.refresh_from_db()
+        assert (bug_report.status, bug_report.version) == ('open', 2)
+
+    @pytest.mark.parametrize('if_match, expected', [
+        ('*', 200),
+        ('"7", "1"', 200),
+        ('W/"1"', 200),
+        ('W/"2"', 412),
+    ])
+    def test_if_match_forms(self, authenticated_client, bug_report, if_match, expected):
+        """Test that any-match, lists and weak forms of the current version match."""
+        response = authenticated_client.patch(detail(bug_report), {'status': 'resolved'}, format='json',
+                                              HTTP_IF_MATCH=if_match)
+
+        assert response.status_code == expected
+
+    def test_compressed_read_then_update(self, authenticated_client, bug_report):
+        """Test that the ETag of a gzipped read is accepted by the next update."""
+        BugReport.objects.filter(pk=bug_report.pk).update(description='Steps to reproduce. ' * 100)
+        read = authenticated_client.get(detail(bug_report), HTTP_ACCEPT_ENCODING='gzip')
+        assert read['Content-Encoding'] == 'gzip'
+        assert read['ETag'] == 'W/"2"'
+
+        response = authenticated_client.patch(detail(bug_report), {'status': 'resolved'}, format='json',
+                                              HTTP_IF_MATCH=read['ETag'])
+
+        assert response.status_code == 200
+
+    def test_edited_after_read(self, authenticated_client, bug_report, monkeypatch):
+        """Test that a write landing between the read and the update is not overwritten."""
+        edited_meanwhile(monkeypatch)
+
+        conditional = authenticated_client.patch(detail(bug_report), {'status': 'resolved'}, format='json',
+                                                 HTTP_IF_MATCH='"1"')
+        unconditional = authenticated_client.patch(detail(bug_report), {'status': 'resolved'}, format='json')
+
+        assert conditional.status_code == 412
+        assert unconditional.status_code == 409
+        bug_report.refresh_from_db()
+        assert (bug_report.title, bug_report.status) == ('Edited by someone else', 'open')
+
+
+@pytest.mark.django_db
+class TestUpdateWrites:
+    """Tests for what an update writes."""
+
+    def test_writes_changed_fields_once(self, authenticated_client, bug_report):
+        """Test that one UPDATE writes the changed fields and nothing is read back."""
+        with CaptureQueriesContext(connection) as queries:
+            authenticated_client.put(detail(bug_report), {
+                'title': bug_report.title,
+                'description': bug_report.description,
+                'severity': bug_report.severity,
+                'status': 'resolved',
+            }, format='json')
+
+        statements = [query['sql'] for query in queries.captured_queries]
+        updates = [sql for sql in statements if sql.startswith('UPDATE "bugs_bugreport"')]
+        assert len(updates) == 1
+        assert '"status"' in updates[0] and '"description"' not in updates[0]
+        after_update = statements[statements.index(updates[0]) + 1:]
+        assert not any('"bugs_bugreport"."title"' in sql for sql in after_update)
+
+    def test_unchanged_is_not_written(self, authenticated_client, bug_report):
+        """Test that an update changing nothing keeps the version."""
+        response = authenticated_client.patch(detail(bug_report), {'status': 'open'}, format='json')
+
+        assert response['ETag'] == '"1"'
+        bug_report.refresh_from_db()
+        assert bug_report.version == 1
+
+    def test_relations_raise_version(self, authenticated_client, bug_report, other_user):
+        """Test that changing only the assignees is a new version."""
+        response = authenticated_client.patch(
+            detail(bug_report), {'assignees': [other_user.pk]}, format='json', HTTP_IF_MATCH='"1"'
+        )
+
+        assert response['ETag'] == '"2"'
+        assert [user['id'] for user in response.data['assignees']] == [other_user.pk]
+
+    def test_serializer_conflict(self, user, bug_report, rf):
+        """Test that the serializer refuses to write over a newer version."""
+        request = rf.patch('/')
+        request.user = user
+        BugReport.objects.filter(pk=bug_report.pk).update(title='Edited by someone else')
+        serializer = BugReportCreateUpdateSerializer(
+            bug_report, data={'status': 'closed'}, partial=True, context={'request': request}
+        )
+        serializer.is_valid(raise_exception=True)
+
+        with pytest.raises(VersionConflict):
+            serializer.save()
@@ -14,6 +14,7 @@ export default function BugsListPage() {
     ordering: '-created_at',
   });
   const [totalCount, setTotalCount] = useState(0);
+  const [countIsApproximate, setCountIsApproximate] = useState(false);
   const [currentPage, setCurrentPage] = useState(1);
   const [hasNext, setHasNext] = useState(false);
   const [hasPrevious, setHasPrevious] = useState(false);
@@ -26,6 +27,7 @@ export default function BugsListPage() {
       const response = await apiClient.getBugs({ ...filters, page: currentPage });
       setBugs(response.results);
       setTotalCount(response.count);
+      setCountIsApproximate(!!response.approximate);
       setHasNext(!!response.next);
       setHasPrevious(!!response.previous);
     } catch (err) {
@@ -198,7 +200,7 @@ export default function BugsListPage() {
           {/* Pagination */}
           <div className="mt-6 flex items-center justify-between">
             <p className="text-sm text-gray-600">
-              Showing {bugs.length} of {totalCount} bugs
+              Showing {bugs.length} of {countIsApproximate ? 'about ' : ''}{totalCount} bugs
             </p>
             <div className="flex gap-2">
               <button